@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the command line batch tool, see :mod:`OBB.cli`.
+"""
+import sys
+
+from OBB.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
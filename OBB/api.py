@@ -1,23 +1,22 @@
 # -*- coding: utf-8 -*-
 
-from OBB.utils import eigh
+import numpy as np
+
+from OBB import core
+from OBB import extract
+from OBB import parallel
+from OBB import readers
+from OBB.core import hullMethod
+from OBB.moments import Moments
+from OBB.utils import lazy_property
 
 try:
     from maya import cmds
     from maya import OpenMaya
+    from maya.utils import executeDeferred
 except ImportError:
     pass
 
-try:
-    from scipy.spatial import ConvexHull
-
-    hullMethod = True
-except ImportError:
-    RuntimeWarning(
-        "Unable to load scipy." "The from_hull method will not be available."
-    )
-    hullMethod = False
-
 
 class OBB(object):
     """
@@ -28,85 +27,177 @@ class OBB(object):
 
     meshName = None
 
-    def __init__(self, meshName=None, method=0, selectedPoints=False):
+    # Angular standard error (radians) of axes estimated from a sample.
+    axesError = None
+
+    # OBB.cache.BoxCache looked up before fitting, None to always fit.
+    cache = None
+
+    # Build method and the mesh data it needs, per method index.
+    methods = {
+        0: ("build_from_points", ("points",)),
+        1: ("build_from_triangles", ("points", "triangles")),
+        2: ("build_from_hull", ("points",)),
+        3: ("build_from_dito", ("points",)),
+        4: ("build_from_min_volume", ("points",)),
+    }
+
+    def __init__(self, meshName=None, method=0, selectedPoints=False, **kwargs):
 
         if not meshName:
             raise RuntimeError("No mesh set in class.")
 
-        self.shapeName = self.getShape(meshName)
-        self.fnMesh = self.getMFnMesh(self.shapeName)
+        buildMethod, meshData = self.get_method(method)
 
-        # Get data we need to calculate OBB.
-        self.points = self.getPoints(self.fnMesh, selected=selectedPoints)
-        self.triangles = self.getTriangles(self.fnMesh)
+        self.method = method
+        self.selectedPoints = selectedPoints
 
-        if method == 0:
-            eigenVectors, center, obb_extents = self.build_from_points()
+        self.shapeName = self.getShape(meshName)
+        self.fnMesh = self.getMFnMesh(self.shapeName)
 
-        elif method == 1:
-            eigenVectors, center, obb_extents = self.build_from_triangles()
+        # Only extract the data this method needs, the rest stays lazy.
+        for data in meshData:
+            getattr(self, data)
 
-        elif method == 2:
-            eigenVectors, center, obb_extents = self.build_from_hull()
+        key = box = None
+        if self.cache is not None:
+            key = self.cache.key(self.geometryHash, method, kwargs)
+            box = self.cache.get(key)
 
+        if box is not None:
+            eigenVectors, center, obb_extents, self.axesError = box
         else:
-            raise RuntimeError(
-                "Method unsupported! Please use 0(from_points),"
-                " 1(from_triangles), or 2(from_hull)."
+            # Extra keyword arguments are options of the build method.
+            eigenVectors, center, obb_extents = getattr(self, buildMethod)(
+                **kwargs
             )
 
+            if key is not None:
+                self.cache.put(
+                    key, eigenVectors, center, obb_extents, self.axesError
+                )
+
         # Naturally aligned axis for x, y, z.
-        self.eigenVectors = eigenVectors
+        self._axes = eigenVectors
 
         # Center point.
-        self._center = center
+        self._center_array = center
 
         # Extents (length) of the bounding in x, y, z.
-        self._obb_extents = obb_extents
+        self._extents_array = obb_extents
+
+    @lazy_property
+    def points(self):
+        """
+        Lazy (N, 3) points of the mesh.
+        """
+        return self.getPoints(self.fnMesh, selected=self.selectedPoints)
 
-        self.boundPoints = self.get_bounding_points()
+    @lazy_property
+    def triangles(self):
+        """
+        Lazy (M, 3) triangle indices of the mesh.
+        """
+        return self.getTriangles(self.fnMesh)
 
-        self._width = (self.boundPoints[1] - self.boundPoints[0]).length()
-        self._height = (self.boundPoints[2] - self.boundPoints[0]).length()
-        self._depth = (self.boundPoints[6] - self.boundPoints[0]).length()
-        self._matrix = self.getMatrix()
+    @lazy_property
+    def geometryHash(self):
+        """
+        Content hash of the points (and triangles for the triangles
+        method), see :func:`OBB.core.geometry_hash`.
 
-    @property
+        Returns:
+            (str)
+        """
+        return core.geometry_hash(
+            self.points, self.triangles if self.method == 1 else None
+        )
+
+    @lazy_property
+    def moments(self):
+        """
+        Mergeable moment summary of the geometry, see :meth:`merge`.
+
+        Area weighted for the triangles and hull methods, point weighted
+        otherwise.
+
+        Raises:
+            `RuntimeError` if the box has no mesh attached (from_arrays,
+            from_file or progressive boxes).
+
+        Returns:
+            (OBB.moments.Moments)
+        """
+        if self.fnMesh is None:
+            raise RuntimeError(
+                "Bounding box has no geometry to build moments from, build it "
+                "from a mesh or points to merge it."
+            )
+
+        if self.method == 1:
+            return Moments.from_triangles(self.points, self.triangles)
+
+        if self.method == 2:
+            return Moments.from_triangles(*core.convex_hull(self.points))
+
+        return Moments.from_points(self.points)
+
+    @lazy_property
+    def eigenVectors(self):
+        """
+        Naturally aligned axis for x, y, z.
+
+        Returns:
+            (list of OpenMaya.MVector)
+        """
+        return [OpenMaya.MVector(*axis) for axis in self._axes.tolist()]
+
+    @lazy_property
+    def boundPoints(self):
+        """
+        Corner points of the bounding box.
+
+        Returns:
+            (list of OpenMaya.MVector)
+        """
+        return self.get_bounding_points()
+
+    @lazy_property
     def width(self):
         """
         Property width of the bounding box.
         """
-        return self._width
+        return float(self._extents_array[2] * 2.0)
 
-    @property
+    @lazy_property
     def height(self):
         """
         Property height of the bounding box.
         """
-        return self._height
+        return float(self._extents_array[0] * 2.0)
 
-    @property
+    @lazy_property
     def depth(self):
         """
         Property depth of the bounding box.
         """
-        return self._depth
+        return float(self._extents_array[1] * 2.0)
 
     @property
     def volume(self):
         """
         Property volume of bounding box.
         """
-        return self._width * self._height * self._depth
+        return self.width * self.height * self.depth
 
-    @property
+    @lazy_property
     def matrix(self):
         """
         Property matrix of the bounding box.
         """
-        return self._matrix
+        return self.getMatrix()
 
-    @property
+    @lazy_property
     def center(self):
         """
         Property center of the bounding box.
@@ -114,20 +205,566 @@ class OBB(object):
         Returns:
             (OpenMaya.MVector)
         """
-        return self._center
+        return OpenMaya.MVector(*self._center_array.tolist())
+
+    @classmethod
+    def get_method(cls, method):
+        """
+        Gets the build method name and the mesh data it needs.
+
+        :param method(int): method index.
+
+        Raises:
+            `RuntimeError` if the method is unsupported.
+
+        Returns:
+            (str) build method name.
+            (tuple of str) mesh data needed.
+        """
+        if method not in cls.methods:
+            raise RuntimeError(
+                "Method unsupported! Please use 0(from_points),"
+                " 1(from_triangles), 2(from_hull), 3(from_dito)"
+                " or 4(from_min_volume)."
+            )
+
+        return cls.methods[method]
 
     @classmethod
-    def from_points(cls, meshName=None):
+    def batch(
+        cls,
+        meshNames,
+        method=0,
+        executor=None,
+        workers=None,
+        chunkSize=None,
+        instances=True,
+    ):
+        """
+        Bounding boxes of many meshes in one call.
+
+        The points of every mesh are concatenated into one buffer and all
+        boxes are solved together, see :func:`OBB.core.batch_build`.
+        With ``executor="process"`` or ``executor="thread"`` the fitting
+        runs on a worker pool, see :func:`OBB.parallel.batch_build`. With
+        a :attr:`cache` only the meshes it misses are fit.
+
+        With instances every shape is fit once in object space and its box
+        is carried to each instance by the world matrix, see
+        :func:`OBB.core.batch_build_instances`.
+
+        :param meshNames(list of str): meshes to fit.
+        :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+            3(from_dito) or 4(from_min_volume).
+        :param executor(str): None to fit in this thread, "process" or
+            "thread".
+        :param workers(int): number of workers, defaults to the cpu count.
+        :param chunkSize(int): number of meshes per worker task.
+        :param instances(bool): fit shared shapes once.
+
+        Raises:
+            `RuntimeError` if the method or executor is unsupported.
+
+        Returns:
+            (OBB.core.BatchResult) boxes in the order of meshNames.
+        """
+        if executor not in (None, "process", "thread"):
+            raise RuntimeError(
+                "Executor unsupported! Please use None, \"process\""
+                " or \"thread\"."
+            )
+
+        if instances:
+            pointsList, trianglesList, shapeIndices, matrices = (
+                cls.get_instance_data(meshNames, method)
+            )
+        else:
+            pointsList, trianglesList = cls.get_batch_data(meshNames, method)
+
+        def build(indices):
+            if executor:
+                return parallel.batch_build(
+                    [pointsList[i] for i in indices],
+                    method=method,
+                    trianglesList=trianglesList
+                    and [trianglesList[i] for i in indices],
+                    workers=workers,
+                    chunkSize=chunkSize,
+                    executor=executor,
+                )
+
+            return core.batch_build(
+                [pointsList[i] for i in indices],
+                method=method,
+                trianglesList=trianglesList and [trianglesList[i] for i in indices],
+            )
+
+        if cls.cache is not None:
+            keys = [
+                cls.cache.key(
+                    core.geometry_hash(
+                        points, trianglesList[i] if trianglesList else None
+                    ),
+                    method,
+                    core.BATCH_OPTIONS.get(method),
+                )
+                for i, points in enumerate(pointsList)
+            ]
+            result = cls.cache.batch(keys, build)
+        else:
+            result = build(range(len(pointsList)))
+
+        if instances:
+            result = core.batch_build_instances(
+                pointsList,
+                shapeIndices,
+                matrices,
+                method=method,
+                trianglesList=trianglesList,
+                shapes=result,
+            )
+
+        result.names = list(meshNames)
+
+        return result
+
+    @classmethod
+    def batch_async(
+        cls, meshNames, method=0, callback=None, workers=None, chunkSize=None
+    ):
+        """
+        Bounding boxes of many meshes fit on a thread pool in the background.
+
+        The mesh data is extracted right away on the calling (main) thread,
+        then the fitting runs on worker threads so Maya stays interactive.
+        Once done ``callback`` is called with the
+        :class:`OBB.core.BatchResult` on Maya's main thread through
+        ``maya.utils.executeDeferred``, so it is free to edit the scene.
+
+        :param meshNames(list of str): meshes to fit.
+        :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+            3(from_dito) or 4(from_min_volume).
+        :param callback(callable): called with the result when done.
+        :param workers(int): number of threads, defaults to the cpu count.
+        :param chunkSize(int): number of meshes per worker task.
+
+        Raises:
+            `RuntimeError` if the method is unsupported.
+
+        Returns:
+            (concurrent.futures.Future) resolving to the
+            :class:`OBB.core.BatchResult` in the order of meshNames.
+        """
+        pointsList, trianglesList = cls.get_batch_data(meshNames, method)
+
+        future = parallel.batch_build_async(
+            pointsList,
+            method=method,
+            trianglesList=trianglesList,
+            workers=workers,
+            chunkSize=chunkSize,
+        )
+
+        names = list(meshNames)
+
+        def deliver(future):
+            if future.exception() is not None:
+                executeDeferred(
+                    cmds.warning, "OBB batch failed: %s" % future.exception()
+                )
+                return
+
+            result = future.result()
+            result.names = names
+
+            if callback:
+                executeDeferred(callback, result)
+
+        future.add_done_callback(deliver)
+
+        return future
+
+    @classmethod
+    def get_batch_data(cls, meshNames, method=0):
+        """
+        Extracts the mesh data a method needs for every mesh.
+
+        :param meshNames(list of str): meshes to extract.
+        :param method(int): method index.
+
+        Raises:
+            `RuntimeError` if the method is unsupported.
+
+        Returns:
+            (list of numpy.ndarray) (N_i, 3) points per mesh.
+            (list of numpy.ndarray) (M_i, 3) triangles per mesh or None.
+        """
+        buildMethod, meshData = cls.get_method(method)
+
+        pointsList = []
+        trianglesList = []
+
+        for meshName in meshNames:
+            fnMesh = cls.getMFnMesh(cls.getShape(meshName))
+
+            pointsList.append(extract.get_points(fnMesh))
+            if "triangles" in meshData:
+                trianglesList.append(extract.get_triangles(fnMesh))
+
+        if "triangles" not in meshData:
+            trianglesList = None
+
+        return pointsList, trianglesList
+
+    @classmethod
+    def get_instance_data(cls, meshNames, method=0):
+        """
+        Extracts the object space mesh data a method needs for every shape
+        and the world matrix of every mesh.
+
+        Instances of one shape share its data.
+
+        :param meshNames(list of str): meshes to extract.
+        :param method(int): method index.
+
+        Raises:
+            `RuntimeError` if the method is unsupported.
+
+        Returns:
+            (list of numpy.ndarray) (N_i, 3) object space points per shape.
+            (list of numpy.ndarray) (M_i, 3) triangles per shape or None.
+            (numpy.ndarray) (K,) shape index of every mesh.
+            (numpy.ndarray) (K, 4, 4) world matrix of every mesh.
+        """
+        buildMethod, meshData = cls.get_method(method)
+
+        shapes = {}
+        pointsList = []
+        trianglesList = []
+        shapeIndices = []
+        matrices = []
+
+        for meshName in meshNames:
+            fnMesh = cls.getMFnMesh(cls.getShape(meshName))
+            dagPath = fnMesh.dagPath()
+
+            key = extract.get_shape_key(dagPath)
+            if key not in shapes:
+                shapes[key] = len(pointsList)
+
+                pointsList.append(extract.get_points(fnMesh, worldSpace=False))
+                if "triangles" in meshData:
+                    trianglesList.append(extract.get_triangles(fnMesh))
+
+            shapeIndices.append(shapes[key])
+            matrices.append(extract.get_matrix(dagPath))
+
+        if "triangles" not in meshData:
+            trianglesList = None
+
+        return (
+            pointsList,
+            trianglesList,
+            np.array(shapeIndices, dtype=np.intp),
+            np.array(matrices, dtype=np.float64).reshape(-1, 4, 4),
+        )
+
+    @classmethod
+    def from_arrays(cls, eigenVectors, center, extents):
+        """
+        Bounding box from already solved axes, center and extents.
+
+        The instance has no mesh attached, only the box properties.
+
+        :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+        :param center(numpy.ndarray): (3,) center point.
+        :param extents(numpy.ndarray): (3,) half lengths along each axis.
+
+        Raises:
+            None
+
+        Returns:
+            (OBB Instance)
+        """
+        obb = cls.__new__(cls)
+
+        obb.method = None
+        obb.selectedPoints = False
+        obb.shapeName = None
+        obb.fnMesh = None
+
+        obb._axes = np.asarray(eigenVectors, dtype=np.float64)
+        obb._center_array = np.asarray(center, dtype=np.float64)
+        obb._extents_array = np.asarray(extents, dtype=np.float64)
+
+        return obb
+
+    @classmethod
+    def merge(cls, obbs):
+        """
+        Bounding box of a group from the boxes of its parts.
+
+        Merges the parts' moment summaries instead of revisiting their
+        points, so hierarchies can be built bottom up. The merged box keeps
+        its summary, it can be merged again.
+
+        :param obbs(list of OBB): boxes of the parts, built with methods
+            of the same kind (point or area weighted).
+
+        Raises:
+            `RuntimeError` if there is nothing to merge, a part has no
+            geometry or the parts are weighted differently.
+
+        Returns:
+            (OBB Instance)
+        """
+        moments = Moments.merge([obb.moments for obb in obbs])
+
+        obb = cls.from_arrays(*core.build_from_moments(moments))
+        obb.moments = moments
+
+        return obb
+
+    @classmethod
+    def from_file(cls, path, method=0, chunkSize=readers.CHUNK_SIZE):
+        """
+        Bounding box of a PLY, OBJ or XYZ file, without Maya.
+
+        The file is streamed in chunks so it never has to fit in memory,
+        see :func:`OBB.readers.build_from_file`.
+
+        :param path(str): geometry file.
+        :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+            3(from_dito) or 4(from_min_volume).
+        :param chunkSize(int): records read per chunk.
+
+        Raises:
+            `RuntimeError` if the file or method is unsupported.
+
+        Returns:
+            (OBB Instance)
+        """
+        obb = cls.from_arrays(
+            *readers.build_from_file(path, method=method, chunkSize=chunkSize)
+        )
+        obb.meshName = path
+        obb.method = method
+
+        return obb
+
+    @classmethod
+    def over_frames(
+        cls,
+        meshName,
+        start,
+        end,
+        step=1.0,
+        method=0,
+        worldSpace=True,
+        blockSize=None,
+        temporal=False,
+        tolerance=core.TEMPORAL_TOLERANCE,
+        detectRigid=True,
+    ):
+        """
+        Bounding boxes of a deforming mesh over a frame range.
+
+        Every frame is evaluated through a DG context instead of setting
+        the current time, and the frames are fit together with batched
+        moments and eigen solves, see :func:`OBB.core.batch_build_frames`.
+
+        With temporal the frames are fit in order instead, each solve
+        starting from and aligned to the previous frame's axes so the boxes
+        don't flip, see :class:`OBB.core.TemporalFitter`. Rigid frames are
+        aligned to the previous box too.
+
+        Frames whose object space points equal the first frame's are rigid
+        moves of it. Their shape is fit once in object space and carried to
+        each frame by its world matrix, see :class:`OBB.core.RigidFitter`.
+
+        :param meshName(str): mesh to fit.
+        :param start(float): first frame.
+        :param end(float): last frame, included.
+        :param step(float): frame step.
+        :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+            3(from_dito) or 4(from_min_volume).
+        :param worldSpace(bool): world or object space boxes.
+        :param blockSize(int): frames extracted and fit at once, bounds
+            the memory to blockSize x vertices, None for all frames.
+        :param temporal(bool): warm started, aligned fits, methods 0, 1
+            and 2 only.
+        :param tolerance(float): relative covariance change under which
+            temporal fits keep the previous frame's axes.
+        :param detectRigid(bool): fit frames that only move the first
+            frame's shape from its object space box.
+
+        Raises:
+            `RuntimeError` if the step isn't positive, the vertex count
+            changes over the range or temporal is used with method 3 or 4.
+
+        Returns:
+            (OBB.core.BatchResult) one box per frame with the frame times.
+        """
+        cls.get_method(method)
+
+        if step <= 0:
+            raise RuntimeError("The frame step must be positive.")
+
+        count = int(np.floor((end - start) / float(step) + 1e-9)) + 1
+        times = start + step * np.arange(max(count, 0))
+
+        fnMesh = cls.getMFnMesh(cls.getShape(meshName))
+        triangles = cls.getTriangles(fnMesh) if method == 1 else None
+
+        if temporal:
+            temporalFitter = core.TemporalFitter(
+                method=method, triangles=triangles, tolerance=tolerance
+            )
+
+        def build(frames):
+            return core.batch_build_frames(frames, method=method, triangles=triangles)
+
+        result = core.BatchResult(
+            np.empty((len(times), 3, 3)),
+            np.empty((len(times), 3)),
+            np.empty((len(times), 3)),
+            times=times,
+        )
+
+        def fill(indices, boxes):
+            result.axes[indices] = boxes.axes
+            result.centers[indices] = boxes.centers
+            result.extents[indices] = boxes.extents
+
+        blockSize = max(int(blockSize or len(times) or 1), 1)
+        block = np.empty((min(blockSize, len(times)), fnMesh.numVertices(), 3))
+        blockIndices = []
+
+        shape = None
+        rigidFitter = None
+        rigidIndices = []
+        rigidMatrices = []
+
+        frames = extract.iter_frame_meshes(fnMesh, times, worldSpace=worldSpace)
+        for i, (points, matrix) in enumerate(frames):
+            rigid = False
+            if detectRigid:
+                if shape is None:
+                    shape = points
+
+                rigid = np.array_equal(points, shape)
+
+            rigidMatrix = np.eye(4) if matrix is None else matrix
+
+            if temporal:
+                # In frame order, rigid boxes are aligned to the previous box
+                # and seed the next solve.
+                if rigid and i:
+                    if rigidFitter is None:
+                        rigidFitter = core.RigidFitter(
+                            shape, method=method, triangles=triangles
+                        )
+
+                    box = core.align_box(
+                        *rigidFitter.fit_matrices(rigidMatrix)[0],
+                        reference=temporalFitter.axes
+                    )
+                    temporalFitter.seed(box[0])
+                else:
+                    if matrix is not None:
+                        points = extract.transform_points(points, matrix)
+                    box = temporalFitter.fit(points)
+
+                result.axes[i], result.centers[i], result.extents[i] = box
+                continue
+
+            if rigid:
+                rigidIndices.append(i)
+                rigidMatrices.append(rigidMatrix)
+
+                # The first frame is fit both ways, rigid fits win.
+                if i:
+                    continue
+
+            if matrix is not None:
+                points = extract.transform_points(points, matrix)
+            block[len(blockIndices)] = points
+            blockIndices.append(i)
+
+            if len(blockIndices) == len(block):
+                fill(blockIndices, build(block))
+                blockIndices = []
+
+        if blockIndices:
+            fill(blockIndices, build(block[:len(blockIndices)]))
+
+        if len(rigidIndices) > 1:
+            fitter = core.RigidFitter(shape, method=method, triangles=triangles)
+            fill(rigidIndices, fitter.fit_matrices(rigidMatrices))
+
+        return result
+
+    @classmethod
+    def from_points(cls, meshName=None, sampleSize=None, seed=None):
         """
         Bounding box algorithm using vertex points.
 
+        :param sampleSize(int): estimate the axes from this many sampled
+            points instead of all of them, see axesError for the
+            confidence.
+        :param seed(int): random seed of the sampling.
+
         Raises:
             None
 
         Returns:
             (OBB Instance)
         """
-        return cls(meshName=meshName, method=0)
+        return cls(
+            meshName=meshName,
+            method=0,
+            sampleSize=sampleSize,
+            seed=seed,
+        )
+
+    @classmethod
+    def progressive(
+        cls, meshName=None, initialSize=1024, growth=4, tolerance=None, seed=None
+    ):
+        """
+        Anytime bounding boxes of increasing accuracy using vertex points.
+
+        Yields a coarse box from a small sample right away and refines it
+        from larger samples, the last box has exact extents. Stop
+        iterating when the time budget runs out, see
+        :func:`OBB.core.iter_progressive`.
+
+        :param initialSize(int): number of points of the first coarse box.
+        :param growth(int): sample growth factor per step.
+        :param tolerance(float): axes error (radians) accepted as final.
+        :param seed(int): random seed of the sampling.
+
+        Raises:
+            None
+
+        Returns:
+            (generator) of OBB Instances with axesError set.
+        """
+        fnMesh = cls.getMFnMesh(cls.getShape(meshName))
+
+        # Only the samples are moved to world space.
+        for eigenVectors, center, extents, error, exact in core.iter_progressive(
+            extract.get_points(fnMesh, worldSpace=False),
+            initialSize=initialSize,
+            growth=growth,
+            tolerance=tolerance,
+            seed=seed,
+            matrix=extract.get_matrix(fnMesh.dagPath()),
+        ):
+            obb = cls.from_arrays(eigenVectors, center, extents)
+            obb.axesError = error
+
+            yield obb
 
     @classmethod
     def from_selected_points(cls, meshName=None):
@@ -156,10 +793,13 @@ class OBB(object):
         return cls(meshName=meshName, method=1)
 
     @classmethod
-    def from_hull(cls, meshName=None):
+    def from_hull(cls, meshName=None, voxelSize=None):
         """
         Bounding box algorithm using triangles points.
 
+        :param voxelSize(float): build the hull from the per voxel extremes
+            of the points, with voxels of this size.
+
         Raises:
             None
 
@@ -172,7 +812,54 @@ class OBB(object):
                 "scipy cannot be imported."
                 "Please install it if you need it."
             )
-        return cls(meshName=meshName, method=2)
+        return cls(meshName=meshName, method=2, voxelSize=voxelSize)
+
+    @classmethod
+    def from_dito(cls, meshName=None):
+        """
+        Bounding box algorithm using the ditetrahedron (DiTO) method.
+
+        Linear time like the covariance methods and never looser than
+        from_points, much tighter on boxy or elongated meshes.
+
+        Raises:
+            None
+
+        Returns:
+            (OBB Instance)
+        """
+        return cls(meshName=meshName, method=3)
+
+    @classmethod
+    def from_min_volume(
+        cls, meshName=None, maxTime=None, maxIterations=None, edgeSearch=False
+    ):
+        """
+        Bounding box algorithm searching for the minimum volume box.
+
+        :param maxTime(float): time budget in seconds, None for no limit.
+        :param maxIterations(int): candidate axes budget, None for no limit.
+        :param edgeSearch(bool): also try the hull edge pair directions.
+
+        Raises:
+            `RuntimeError` if scipy is unavailable.
+
+        Returns:
+            (OBB Instance)
+        """
+        if not hullMethod:
+            raise RuntimeError(
+                "From min volume method unavailable because "
+                "scipy cannot be imported."
+                "Please install it if you need it."
+            )
+        return cls(
+            meshName=meshName,
+            method=4,
+            maxTime=maxTime,
+            maxIterations=maxIterations,
+            edgeSearch=edgeSearch,
+        )
 
     def create_bounding_box(self, meshName="bounding_GEO"):
         """
@@ -203,35 +890,7 @@ class OBB(object):
         Returns:
             (list of floats) Matrix
         """
-        m = [
-            (self.eigenVectors[1].x * self._obb_extents.y * 2),
-            (self.eigenVectors[1].y * self._obb_extents.y * 2),
-            (self.eigenVectors[1].z * self._obb_extents.y * 2),
-            0.0,
-            (self.eigenVectors[2].x * self._obb_extents.z * 2),
-            (self.eigenVectors[2].y * self._obb_extents.z * 2),
-            (self.eigenVectors[2].z * self._obb_extents.z * 2),
-            0.0,
-            (self.eigenVectors[0].x * self._obb_extents.x * 2),
-            (self.eigenVectors[0].y * self._obb_extents.x * 2),
-            (self.eigenVectors[0].z * self._obb_extents.x * 2),
-            0.0,
-            self._center.x,
-            self._center.y,
-            self._center.z,
-            1.0,
-        ]
-
-        # Get the scale.
-        mMat = OpenMaya.MMatrix()
-        OpenMaya.MScriptUtil.createMatrixFromList(m, mMat)
-
-        if mMat.det4x4() < 0:
-            m[8] *= -1
-            m[9] *= -1
-            m[10] *= -1
-
-        return m
+        return core.get_matrix(self._axes, self._center_array, self._extents_array)
 
     def get_bounding_points(self):
         """
@@ -243,214 +902,114 @@ class OBB(object):
         Returns:
             (list of MVectors) Bounding box points.
         """
-        boundPoints = [
-            (
-                self._center
-                - self.eigenVectors[0] * self._obb_extents.x
-                + self.eigenVectors[1] * self._obb_extents.y
-                + self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                - self.eigenVectors[0] * self._obb_extents.x
-                + self.eigenVectors[1] * self._obb_extents.y
-                - self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                + self.eigenVectors[0] * self._obb_extents.x
-                + self.eigenVectors[1] * self._obb_extents.y
-                + self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                + self.eigenVectors[0] * self._obb_extents.x
-                + self.eigenVectors[1] * self._obb_extents.y
-                - self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                + self.eigenVectors[0] * self._obb_extents.x
-                - self.eigenVectors[1] * self._obb_extents.y
-                + self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                + self.eigenVectors[0] * self._obb_extents.x
-                - self.eigenVectors[1] * self._obb_extents.y
-                - self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                - self.eigenVectors[0] * self._obb_extents.x
-                - self.eigenVectors[1] * self._obb_extents.y
-                + self.eigenVectors[2] * self._obb_extents.z
-            ),
-            (
-                self._center
-                - self.eigenVectors[0] * self._obb_extents.x
-                - self.eigenVectors[1] * self._obb_extents.y
-                - self.eigenVectors[2] * self._obb_extents.z
-            ),
-        ]
-
-        return boundPoints
-
-    def build_from_hull(self):
+        boundPoints = core.get_bounding_points(
+            self._axes, self._center_array, self._extents_array
+        )
+
+        return [OpenMaya.MVector(*pnt) for pnt in boundPoints.tolist()]
+
+    def build_from_hull(self, voxelSize=None):
         """
         Test oriented bounding box algorithm using convex hull points.
 
+        :param voxelSize(float): voxel size to decimate the points with
+            before building the hull, or None.
+
         Raises:
-            None
+            `RuntimeError` if scipy is unavailable.
 
         Returns:
-            EigenVectors(OpenMaya.MVector)
-            CenterPoint(OpenMaya.MVector)
-            BoundingExtents(OpenMaya.MVector)
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
         """
-        npPointList = [
-            [self.points[i].x, self.points[i].y, self.points[i].z]
-            for i in range(self.points.length())
-        ]
-
-        try:
-            hull = ConvexHull(npPointList)
-        except NameError:
-            raise RuntimeError(
-                "From hull method unavailable because"
-                " scipy cannot be imported."
-                "Please install it if you need it."
-            )
-
-        indices = hull.simplices
-        vertices = npPointList[indices]
-        hullPoints = list(vertices.flatten())
-        hullTriPoints = list(indices.flatten())
-
-        hullArray = OpenMaya.MVectorArray()
-        for ind in range(0, len(hullPoints), 3):
-            hullArray.append(
-                OpenMaya.MVector(
-                    hullPoints[ind], hullPoints[ind + 1], hullPoints[ind + 2]
-                )
-            )
-
-        triPoints = OpenMaya.MIntArray()
-        for tri in range(len(hullTriPoints)):
-            triPoints.append(tri)
-
-        return self.build_from_triangles(points=hullArray, triangles=triPoints)
+        return core.build_from_hull(self.points, voxelSize=voxelSize)
 
     def build_from_triangles(self, points=None, triangles=None):
         """
         Test oriented bounding box algorithm using triangles.
 
-        :param points(OpenMaya.MVectorArray): points to represent geometry.
-        :param triangles(OpenMaya.MIntArray): points to represent geometry.
+        :param points(numpy.ndarray): (N, 3) points to represent geometry.
+        :param triangles(numpy.ndarray): triangle indices into the points.
 
         Raises:
             None
 
         Returns:
-            EigenVectors(OpenMaya.MVector)
-            CenterPoint(OpenMaya.MVector)
-            BoundingExtents(OpenMaya.MVector)
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
         """
-        if not points:
+        if points is None:
             points = self.points
 
-        if not triangles:
+        if triangles is None:
             triangles = self.triangles
 
-        mu = OpenMaya.MVector(0.0, 0.0, 0.0)
-        mui = OpenMaya.MVector(0.0, 0.0, 0.0)
-
-        Am, Ai = 0.0, 0.0
-        cxx, cxy, cxz, cyy, cyz, czz = 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-
-        for tInd in range(0, triangles.length(), 3):
-
-            p = points[triangles[tInd]]
-            q = points[triangles[tInd + 1]]
-            r = points[triangles[tInd + 2]]
-
-            mui = (p + q + r) / 3.0
-            Ai = ((q - p) ^ (r - p)).length() * 0.5
+        return core.build_from_triangles(points, triangles)
 
-            mu += mui * Ai
-            Am += Ai
-
-            # these bits set the c terms to Am*E[xx], Am*E[xy], Am*E[xz]....
-            cxx += (9.0 * mui.x * mui.x + p.x * p.x + q.x * q.x + r.x * r.x) * (
-                Ai / 12.0
-            )
-            cxy += (9.0 * mui.x * mui.y + p.x * p.y + q.x * q.y + r.x * r.y) * (
-                Ai / 12.0
-            )
-            cxz += (9.0 * mui.x * mui.z + p.x * p.z + q.x * q.z + r.x * r.z) * (
-                Ai / 12.0
-            )
-            cyy += (9.0 * mui.y * mui.y + p.y * p.y + q.y * q.y + r.y * r.y) * (
-                Ai / 12.0
-            )
-            cyz += (9.0 * mui.y * mui.z + p.y * p.z + q.y * q.z + r.y * r.z) * (
-                Ai / 12.0
-            )
+    def build_from_dito(self):
+        """
+        Bounding box algorithm using the ditetrahedron (DiTO) method.
 
-        mu /= Am
+        Raises:
+            None
 
-        cxx /= Am
-        cxy /= Am
-        cxz /= Am
-        cyy /= Am
-        cyz /= Am
-        czz /= Am
+        Returns:
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
+        """
+        return core.build_from_dito(self.points)
 
-        cxx -= mu.x * mu.x
-        cxy -= mu.x * mu.y
-        cxz -= mu.x * mu.z
-        cyy -= mu.y * mu.y
-        cyz -= mu.y * mu.z
-        czz -= mu.z * mu.z
+    def build_from_min_volume(
+        self, maxTime=None, maxIterations=None, edgeSearch=False
+    ):
+        """
+        Bounding box algorithm searching for the minimum volume box.
 
-        # Covariance Matrix
-        C = [[cxx, cxy, cxz], [cxy, cyy, cyz], [cxz, cyz, czz]]
+        :param maxTime(float): time budget in seconds, None for no limit.
+        :param maxIterations(int): candidate axes budget, None for no limit.
+        :param edgeSearch(bool): also try the hull edge pair directions.
 
-        return self.build_from_covariance_matrix(cvMatrix=C)
+        Raises:
+            `RuntimeError` if scipy is unavailable.
 
-    def build_from_points(self):
+        Returns:
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
+        """
+        return core.build_from_min_volume(
+            self.points,
+            maxTime=maxTime,
+            maxIterations=maxIterations,
+            edgeSearch=edgeSearch,
+        )
+
+    def build_from_points(self, sampleSize=None, seed=None):
         """
         Bounding box algorithm using vertex points.
 
+        :param sampleSize(int): estimate the axes from this many sampled
+            points, the extents still cover all of them.
+        :param seed(int): random seed of the sampling.
+
         Raises:
             None
 
         Returns:
-            EigenVectors(OpenMaya.MVector)
-            CenterPoint(OpenMaya.MVector)
-            BoundingExtents(OpenMaya.MVector)
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
         """
-        pointSize = float(self.points.length())
-
-        mu = OpenMaya.MVector(0.0, 0.0, 0.0)
-        # Calculate the average position of points.
-        for p in range(int(pointSize)):
-            mu += self.points[p] / pointSize
-
-        cxx, cxy, cxz, cyy, cyz, czz = 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        for p in range(int(pointSize)):
-            p = self.points[p]
-            cxx += p.x * p.x - mu.x * mu.x
-            cxy += p.x * p.y - mu.x * mu.y
-            cxz += p.x * p.z - mu.x * mu.z
-            cyy += p.y * p.y - mu.y * mu.y
-            cyz += p.y * p.z - mu.y * mu.z
-            czz += p.z * p.z - mu.z * mu.z
+        if not sampleSize:
+            return core.build_from_points(self.points)
 
-        # Covariance Matrix
-        C = [[cxx, cxy, cxz], [cxy, cyy, cyz], [cxz, cyz, czz]]
+        sample = core.sample_points(self.points, sampleSize, seed=seed)
+        eigenVectors, self.axesError = core.estimate_axes(sample)
 
-        return self.build_from_covariance_matrix(cvMatrix=C)
+        return core.fit_axes(eigenVectors, self.points)
 
     def build_from_covariance_matrix(self, cvMatrix=None):
         """
@@ -462,49 +1021,11 @@ class OBB(object):
             None
 
         Returns:
-            None
+            EigenVectors(numpy.ndarray)
+            CenterPoint(numpy.ndarray)
+            BoundingExtents(numpy.ndarray)
         """
-        # Calculate the natural axes by getting the eigen vectors.
-        eigenValues, eigVec = eigh(cvMatrix)
-
-        r = OpenMaya.MVector(eigVec[0][0], eigVec[1][0], eigVec[2][0])
-        r.normalize()
-
-        u = OpenMaya.MVector(eigVec[0][1], eigVec[1][1], eigVec[2][1])
-        u.normalize()
-
-        f = OpenMaya.MVector(eigVec[0][2], eigVec[1][2], eigVec[2][2])
-        f.normalize()
-
-        minim = OpenMaya.MVector(1e10, 1e10, 1e10)
-        maxim = OpenMaya.MVector(-1e10, -1e10, -1e10)
-
-        for i in range(self.points.length()):
-            pnt = self.points[i]
-
-            p_prime = OpenMaya.MVector(r * pnt, u * pnt, f * pnt)
-
-            minim = OpenMaya.MVector(
-                min(minim.x, p_prime.x),
-                min(minim.y, p_prime.y),
-                min(minim.z, p_prime.z),
-            )
-            maxim = OpenMaya.MVector(
-                max(maxim.x, p_prime.x),
-                max(maxim.y, p_prime.y),
-                max(maxim.z, p_prime.z),
-            )
-
-        centerPoint = (maxim + minim) * 0.5
-        m_ext = (maxim - minim) * 0.5
-
-        R = OpenMaya.MVector(r.x, u.x, f.x)
-        U = OpenMaya.MVector(r.y, u.y, f.y)
-        F = OpenMaya.MVector(r.z, u.z, f.z)
-
-        m_pos = OpenMaya.MVector(R * centerPoint, U * centerPoint, F * centerPoint)
-
-        return [r, u, f], m_pos, m_ext
+        return core.build_from_covariance_matrix(cvMatrix, self.points)
 
     def getTriangles(self, fnMesh):
         """
@@ -516,56 +1037,31 @@ class OBB(object):
             None
 
         Returns:
-            (OpenMaya.MIntArray) indices of triangles.
+            (numpy.ndarray) (M, 3) indices of triangles.
         """
-        triangleCounts = OpenMaya.MIntArray()
-        triangleVertices = OpenMaya.MIntArray()
-
-        fnMesh.getTriangles(triangleCounts, triangleVertices)
+        return extract.get_triangles(fnMesh)
 
-        return triangleVertices
-
-    def getPoints(self, fnMesh, selected=False):
+    def getPoints(self, fnMesh, selected=False, worldSpace=True):
         """
         Get the points of each vertex.
 
         :param fnMesh (OpenMaya.MFnMesh): mesh function set.
         :param selected (bool): selected verts or not
+        :param worldSpace (bool): world or object space points.
 
         Raises:
             None
 
         Returns:
-            (OpenMaya.MVectorArray) list of points.
+            (numpy.ndarray) (N, 3) points.
         """
-        mVecPoints = OpenMaya.MVectorArray()
-
         if selected:
-            mSel = OpenMaya.MSelectionList()
-            OpenMaya.MGlobal.getActiveSelectionList(mSel)
-            mDagPath = OpenMaya.MDagPath()
-            mComponents = OpenMaya.MObject()
-            mSel.getDagPath(0, mDagPath, mComponents)
-            if mComponents.isNull():
-                return mVecPoints
-
-            vertIter = OpenMaya.MItMeshVertex(mDagPath, mComponents)
-            while not vertIter.isDone():
-                mVecPoints.append(
-                    OpenMaya.MVector(vertIter.position(OpenMaya.MSpace.kWorld))
-                )
-                vertIter.next()
-
-        else:
-            mPoints = OpenMaya.MPointArray()
-            fnMesh.getPoints(mPoints, OpenMaya.MSpace.kWorld)
-
-            for idx in range(mPoints.length()):
-                mVecPoints.append(OpenMaya.MVector(mPoints[idx]))
+            return extract.get_selected_points(worldSpace=worldSpace)
 
-        return mVecPoints
+        return extract.get_points(fnMesh, worldSpace=worldSpace)
 
-    def getMFnMesh(self, mesh):
+    @staticmethod
+    def getMFnMesh(mesh):
         """
         Gets the MFnMesh of the input mesh.
 
@@ -585,11 +1081,12 @@ class OBB(object):
         try:
             fnMesh = OpenMaya.MFnMesh(mDagMesh)
         except Exception:
-            raise RuntimeError("%s is not a mesh.")
+            raise RuntimeError("%s is not a mesh." % mesh)
 
         return fnMesh
 
-    def getShape(self, node):
+    @staticmethod
+    def getShape(node):
         """
         Gets the shape node from the input node.
 
@@ -601,7 +1098,8 @@ class OBB(object):
             (str) shape node name
         """
         if cmds.nodeType(node) == "transform":
-            shapes = cmds.listRelatives(node, shapes=True)
+            # Full paths, a shared shape's name is ambiguous.
+            shapes = cmds.listRelatives(node, shapes=True, fullPath=True)
 
             if not shapes:
                 raise RuntimeError("%s has no shape" % node)
@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+"""
+Compact binary files of oriented bounding boxes.
+
+A box file holds fixed width little endian records, so it memory maps
+straight into a numpy structured array without parsing. Version 1 layout:
+
+Header, 64 bytes:
+
+==========  ======  ==================================================
+offset      type    field
+==========  ======  ==================================================
+0           8s      magic ``b"OBBBOXES"``
+8           uint32  version, 1
+12          uint32  record size in bytes, 104
+16          uint64  number of records
+24          uint64  byte offset of the sources block, 0 for none
+32          uint64  byte size of the sources block
+40          24x     reserved, zeros
+==========  ======  ==================================================
+
+Records, from byte 64, :data:`RECORD_DTYPE`:
+
+==========  =============  ===========================================
+offset      type           field
+==========  =============  ===========================================
+0           float64 (3,)   ``center``
+24          float64 (4,)   ``quaternion`` (x, y, z, w) rotating the
+                           local box axes onto the world axes
+56          float64 (3,)   ``extents``, half lengths along the axes
+80          uint64         ``source``, index into the sources
+88          uint8 (16,)    ``hash``, :func:`OBB.core.geometry_hash`
+                           digest or zeros
+==========  =============  ===========================================
+
+Sources block: uint64 count, (count + 1) uint64 byte offsets into the
+utf-8 names that follow.
+
+Readers of version 1 files skip any bytes past the fields above in
+longer records, so fields can be appended without breaking them.
+"""
+import struct
+
+import numpy as np
+
+from OBB import core
+from OBB.utils import lazy_property
+
+MAGIC = b"OBBBOXES"
+VERSION = 1
+
+HEADER = struct.Struct("<8sIIQQQ24x")
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("center", "<f8", (3,)),
+        ("quaternion", "<f8", (4,)),
+        ("extents", "<f8", (3,)),
+        ("source", "<u8"),
+        ("hash", "u1", (16,)),
+    ]
+)
+
+
+class BoxFile(object):
+    """
+    :class:`BoxFile` Memory mapped box file.
+
+    ``records`` is the (K,) structured array of the file, the other
+    properties are computed from it on first access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as stream:
+            header = stream.read(HEADER.size)
+
+        if len(header) != HEADER.size:
+            raise RuntimeError("%s is not a box file." % path)
+
+        magic, version, recordSize, count, sourcesOffset, sourcesSize = (
+            HEADER.unpack(header)
+        )
+
+        if magic != MAGIC:
+            raise RuntimeError("%s is not a box file." % path)
+
+        if version != VERSION or recordSize < RECORD_DTYPE.itemsize:
+            raise RuntimeError(
+                "%s is a version %d box file, version %d is supported."
+                % (path, version, VERSION)
+            )
+
+        self.version = version
+        self._sourcesOffset = sourcesOffset
+        self._sourcesSize = sourcesSize
+
+        # Fields appended by later versions are skipped by the stride.
+        dtype = np.dtype(
+            {
+                "names": RECORD_DTYPE.names,
+                "formats": [RECORD_DTYPE[name] for name in RECORD_DTYPE.names],
+                "offsets": [
+                    RECORD_DTYPE.fields[name][1] for name in RECORD_DTYPE.names
+                ],
+                "itemsize": recordSize,
+            }
+        )
+
+        if count:
+            self.records = np.memmap(
+                path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,)
+            )
+        else:
+            self.records = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def centers(self):
+        """
+        Property (K, 3) center points.
+        """
+        return self.records["center"]
+
+    @property
+    def extents(self):
+        """
+        Property (K, 3) half lengths along each axis.
+        """
+        return self.records["extents"]
+
+    @lazy_property
+    def axes(self):
+        """
+        Property (K, 3, 3) axes as rows.
+        """
+        return axes_from_quaternions(self.records["quaternion"])
+
+    @lazy_property
+    def hashes(self):
+        """
+        Property list of geometry hashes, None where the file has zeros.
+        """
+        return [
+            digest.tobytes().hex() if digest.any() else None
+            for digest in self.records["hash"]
+        ]
+
+    @lazy_property
+    def sources(self):
+        """
+        Property list of source names, indexed by the records' source.
+        """
+        if not self._sourcesOffset:
+            return []
+
+        block = np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="r",
+            offset=self._sourcesOffset,
+            shape=(self._sourcesSize,),
+        )
+
+        count = int(block[:8].view("<u8")[0])
+        offsets = block[8:8 * (count + 2)].view("<u8")
+        names = block[8 * (count + 2):].tobytes()
+
+        return [
+            names[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)
+        ]
+
+    @property
+    def names(self):
+        """
+        Property list of the source name of every record.
+        """
+        sources = self.sources
+        if not sources:
+            return None
+
+        return [sources[source] for source in self.records["source"]]
+
+    @property
+    def matrices(self):
+        """
+        Property (K, 16) matrices of the bounding boxes.
+        """
+        return core.get_matrices(self.axes, self.centers, self.extents)
+
+    def to_result(self):
+        """
+        Loads the boxes as a batch result.
+
+        Raises:
+            None
+
+        Returns:
+            (OBB.core.BatchResult)
+        """
+        return core.BatchResult(
+            self.axes,
+            np.array(self.centers),
+            np.array(self.extents),
+            names=self.names,
+        )
+
+
+def load(path):
+    """
+    Memory maps a box file.
+
+    :param path(str): box file.
+
+    Raises:
+        `RuntimeError` if the file isn't a supported box file.
+
+    Returns:
+        (BoxFile)
+    """
+    return BoxFile(path)
+
+
+def write(path, axes, centers, extents, sources=None, sourceIds=None, hashes=None):
+    """
+    Writes boxes to a box file.
+
+    :param path(str): output file.
+    :param axes(numpy.ndarray): (K, 3, 3) axes as rows.
+    :param centers(numpy.ndarray): (K, 3) center points.
+    :param extents(numpy.ndarray): (K, 3) half lengths along each axis.
+    :param sources(list of str): source names (files, meshes).
+    :param sourceIds(numpy.ndarray): (K,) index of every box's source,
+        defaults to one source per box.
+    :param hashes(list of str): geometry hash of every box, or None.
+
+    Raises:
+        `RuntimeError` if the arrays don't match or a source id is out of
+        the sources.
+
+    Returns:
+        None
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    count = len(centers)
+
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["center"] = centers
+    records["quaternion"] = quaternions_from_axes(
+        np.asarray(axes, dtype=np.float64).reshape(count, 3, 3)
+    )
+    records["extents"] = np.asarray(extents, dtype=np.float64).reshape(count, 3)
+
+    if sourceIds is None:
+        if sources is not None and len(sources) != count:
+            raise RuntimeError("Need one source per box, or sourceIds.")
+
+        sourceIds = np.arange(count) if sources is not None else 0
+    else:
+        sourceIds = np.asarray(sourceIds).reshape(-1)
+        if len(sourceIds) != count:
+            raise RuntimeError("Need one source id per box.")
+
+        if sources is not None and count and (
+            sourceIds.min() < 0 or sourceIds.max() >= len(sources)
+        ):
+            raise RuntimeError("Source ids out of the %d sources." % len(sources))
+    records["source"] = sourceIds
+
+    if hashes is not None:
+        if len(hashes) != count:
+            raise RuntimeError("Need one hash per box.")
+
+        digests = "".join(digest or "0" * 32 for digest in hashes)
+        records["hash"] = np.frombuffer(
+            bytes.fromhex(digests), dtype=np.uint8
+        ).reshape(count, 16)
+
+    sourcesBlock = b""
+    if sources is not None:
+        names = [name.encode("utf-8") for name in sources]
+        offsets = np.zeros(len(names) + 1, dtype="<u8")
+        np.cumsum([len(name) for name in names], out=offsets[1:])
+
+        sourcesBlock = (
+            np.array([len(names)], dtype="<u8").tobytes()
+            + offsets.tobytes()
+            + b"".join(names)
+        )
+
+    sourcesOffset = HEADER.size + records.nbytes if sourcesBlock else 0
+
+    with open(path, "wb") as stream:
+        stream.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                RECORD_DTYPE.itemsize,
+                count,
+                sourcesOffset,
+                len(sourcesBlock),
+            )
+        )
+        records.tofile(stream)
+        stream.write(sourcesBlock)
+
+
+def write_batch(path, result, hashes=None):
+    """
+    Writes a batch result to a box file, its names as sources.
+
+    :param path(str): output file.
+    :param result(OBB.core.BatchResult): boxes to write.
+    :param hashes(list of str): geometry hash of every box, or None.
+
+    Raises:
+        None
+
+    Returns:
+        None
+    """
+    write(
+        path,
+        result.axes,
+        result.centers,
+        result.extents,
+        sources=result.names,
+        hashes=hashes,
+    )
+
+
+def quaternions_from_axes(axes):
+    """
+    Unit quaternions (x, y, z, w) of box axes.
+
+    Left handed axes get their last axis flipped first, which leaves the
+    box unchanged.
+
+    :param axes(numpy.ndarray): (K, 3, 3) orthonormal axes as rows.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K, 4) quaternions.
+    """
+    axes = np.array(axes, dtype=np.float64)
+
+    flip = (axes[:, 0] * np.cross(axes[:, 1], axes[:, 2])).sum(axis=1) < 0.0
+    axes[flip, 2] *= -1.0
+
+    # Rotation matrix entries, the axes are its columns.
+    m00, m10, m20 = axes[:, 0, 0], axes[:, 0, 1], axes[:, 0, 2]
+    m01, m11, m21 = axes[:, 1, 0], axes[:, 1, 1], axes[:, 1, 2]
+    m02, m12, m22 = axes[:, 2, 0], axes[:, 2, 1], axes[:, 2, 2]
+
+    traces = (
+        1.0 + m00 - m11 - m22,
+        1.0 - m00 + m11 - m22,
+        1.0 - m00 - m11 + m22,
+        1.0 + m00 + m11 + m22,
+    )
+    sums = (m01 + m10, m02 + m20, m12 + m21)
+    differences = (m21 - m12, m02 - m20, m10 - m01)
+
+    # Row i is 4 * q_i times the quaternion, solve each box from the row of
+    # its largest component to stay away from small divisors.
+    rows = (
+        (traces[0], sums[0], sums[1], differences[0]),
+        (sums[0], traces[1], sums[2], differences[1]),
+        (sums[1], sums[2], traces[2], differences[2]),
+        (differences[0], differences[1], differences[2], traces[3]),
+    )
+    largest = np.argmax(traces, axis=0)
+
+    best = np.empty((len(axes), 4))
+    for i, row in enumerate(rows):
+        mask = largest == i
+        best[mask] = np.stack([value[mask] for value in row], axis=-1)
+
+    quaternions = best / np.linalg.norm(best, axis=1)[:, None]
+
+    # One of the two signs, w >= 0.
+    quaternions[quaternions[:, 3] < 0.0] *= -1.0
+
+    return quaternions
+
+
+def axes_from_quaternions(quaternions):
+    """
+    Box axes of unit quaternions (x, y, z, w).
+
+    :param quaternions(numpy.ndarray): (K, 4) quaternions.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K, 3, 3) axes as rows.
+    """
+    q = np.asarray(quaternions, dtype=np.float64)
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    xw, yw, zw = x * w, y * w, z * w
+
+    # Rows are the columns of the rotation matrix.
+    return np.stack(
+        [
+            np.stack([1 - 2 * (yy + zz), 2 * (xy + zw), 2 * (xz - yw)], -1),
+            np.stack([2 * (xy - zw), 1 - 2 * (xx + zz), 2 * (yz + xw)], -1),
+            np.stack([2 * (xz + yw), 2 * (yz - xw), 1 - 2 * (xx + yy)], -1),
+        ],
+        axis=1,
+    )
@@ -0,0 +1,740 @@
+# -*- coding: utf-8 -*-
+"""
+Caches of solved bounding boxes keyed by geometry content.
+
+A box only depends on the geometry it is fit to, the method and the
+method's options, so unchanged geometry is looked up by its
+:func:`OBB.core.geometry_hash` instead of being fit again. Enable the
+cache for :class:`OBB.api.OBB` with::
+
+    from OBB.api import OBB
+    from OBB.cache import BoxCache
+
+    OBB.cache = BoxCache(maxSize=4096)
+
+or, to share the boxes across sessions and processes, with a
+:class:`SqliteBoxCache` on a local path. Its default write ahead log needs
+memory shared on one host, pass ``shared=True`` for a file on a network
+share read by several machines. SQLite's locking is then only as sound as
+the file system's, prefer one cache file per machine where possible.
+"""
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from OBB import __version__
+from OBB import core
+
+# Default number of boxes kept by a BoxCache.
+CACHE_SIZE = 1024
+
+# Keys per query of SqliteBoxCache.prefetch, below SQLite's variable limit.
+PREFETCH_SIZE = 900
+
+# Access times of hits are written once this many are pending...
+ACCESS_BATCH_SIZE = 256
+
+# ... or the oldest pending one is this many seconds old.
+ACCESS_INTERVAL = 30.0
+
+
+class BoxCache(object):
+    """
+    :class:`BoxCache` In memory least recently used cache of boxes.
+
+    Entries are (eigenVectors, center, extents, axesError) tuples keyed
+    by :meth:`key`. ``hits`` and ``misses`` count the lookups. Safe to
+    share between threads.
+    """
+
+    def __init__(self, maxSize=CACHE_SIZE):
+        self.maxSize = maxSize
+
+        self.hits = 0
+        self.misses = 0
+
+        self._boxes = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+    @staticmethod
+    def key(geometryHash, method=0, options=None):
+        """
+        Cache key of a fit.
+
+        Options left at None or False, the defaults of every build method,
+        are dropped, so a fit with default options has the key of a batch
+        fit of the same method.
+
+        :param geometryHash(str): see :func:`OBB.core.geometry_hash`.
+        :param method(int): method index.
+        :param options(dict): keyword options of the build method.
+
+        Raises:
+            None
+
+        Returns:
+            (tuple)
+        """
+        options = [
+            (name, value)
+            for name, value in (options or {}).items()
+            if value is not None and value is not False
+        ]
+
+        return geometryHash, method, tuple(sorted(options))
+
+    @property
+    def stats(self):
+        """
+        Property dict of the hits, misses and number of boxes.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def get(self, key):
+        """
+        Looks a box up, counting a hit or a miss.
+
+        :param key(tuple): see :meth:`key`.
+
+        Raises:
+            None
+
+        Returns:
+            (tuple) eigenVectors, center, extents and axesError, or None.
+        """
+        with self._lock:
+            box = self._boxes.get(key)
+            if box is None:
+                self.misses += 1
+                return None
+
+            self._boxes.move_to_end(key)
+            self.hits += 1
+
+            return box
+
+    def get_many(self, keys):
+        """
+        Looks many boxes up, see :meth:`get`.
+
+        :param keys(list of tuples): see :meth:`key`.
+
+        Raises:
+            None
+
+        Returns:
+            (list of tuples) boxes in the order of keys, None where missing.
+        """
+        return [self.get(key) for key in keys]
+
+    def put(self, key, eigenVectors, center, extents, axesError=None):
+        """
+        Stores a box, evicting the least recently used beyond maxSize.
+
+        The arrays are copied and made read only.
+
+        :param key(tuple): see :meth:`key`.
+        :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+        :param center(numpy.ndarray): (3,) center point.
+        :param extents(numpy.ndarray): (3,) half lengths along each axis.
+        :param axesError(float): axes error of sampled fits, or None.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        arrays = []
+        for array in (eigenVectors, center, extents):
+            array = np.array(array, dtype=np.float64)
+            array.flags.writeable = False
+            arrays.append(array)
+
+        with self._lock:
+            self._boxes[key] = tuple(arrays) + (axesError,)
+            self._boxes.move_to_end(key)
+
+            while len(self._boxes) > max(self.maxSize, 0):
+                self._boxes.popitem(last=False)
+
+    def put_many(self, entries):
+        """
+        Stores many boxes.
+
+        :param entries(list of tuples): (key, (eigenVectors, center,
+            extents)) pairs.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        for key, box in entries:
+            self.put(key, *box)
+
+    def batch(self, keys, build):
+        """
+        Boxes of many keys, building the missing ones in one call.
+
+        :param keys(list of tuples): see :meth:`key`.
+        :param build(callable): called with the indices of the missing
+            keys (the first of repeated ones), returns their
+            :class:`OBB.core.BatchResult`.
+
+        Raises:
+            None
+
+        Returns:
+            (OBB.core.BatchResult) boxes in the order of keys.
+        """
+        boxes = self.get_many(keys)
+
+        # First index of every missing key, repeated keys are built once.
+        missing = collections.OrderedDict()
+        for i, box in enumerate(boxes):
+            if box is None:
+                missing.setdefault(keys[i], i)
+
+        if missing:
+            built = build(list(missing.values()))
+
+            positions = {}
+            for n, key in enumerate(missing):
+                positions[key] = n
+
+            self.put_many([(key, built[n]) for key, n in positions.items()])
+
+            for i, box in enumerate(boxes):
+                if box is None:
+                    boxes[i] = built[positions[keys[i]]]
+
+        return core.BatchResult(
+            np.array([box[0] for box in boxes]).reshape(-1, 3, 3),
+            np.array([box[1] for box in boxes]).reshape(-1, 3),
+            np.array([box[2] for box in boxes]).reshape(-1, 3),
+        )
+
+    def invalidate(self, geometryHash=None):
+        """
+        Drops the boxes of a geometry, or every box.
+
+        :param geometryHash(str): geometry to drop, None to clear the cache.
+
+        Raises:
+            None
+
+        Returns:
+            (int) number of boxes dropped.
+        """
+        with self._lock:
+            if geometryHash is None:
+                count = len(self._boxes)
+                self._boxes.clear()
+                return count
+
+            keys = [key for key in self._boxes if key[0] == geometryHash]
+            for key in keys:
+                del self._boxes[key]
+
+            return len(keys)
+
+    def reset_stats(self):
+        """
+        Zeroes the hit and miss counters.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class SqliteBoxCache(BoxCache):
+    """
+    :class:`SqliteBoxCache` Persistent cache of boxes in an SQLite file.
+
+    Rows are keyed by geometry hash, method, options and the library
+    version, so boxes solved by another version are never returned. Any
+    number of threads and processes can read and write the same file and
+    wait up to ``timeout`` seconds for locks. The file runs in write ahead
+    log mode, so readers don't block each other or the writer, unless
+    ``shared`` asks for the rollback journal network file systems need.
+    Boxes looked up are kept in the in memory LRU of :class:`BoxCache` as
+    well.
+
+    With ``maxSize`` the least recently used rows beyond that many are
+    evicted after every write. Hits don't write, their access times are
+    queued and written in batches (see :meth:`flush`), so eviction order
+    can lag behind by up to :data:`ACCESS_INTERVAL` seconds.
+    """
+
+    def __init__(
+        self, path, maxSize=None, memorySize=CACHE_SIZE, timeout=60.0, shared=False
+    ):
+        BoxCache.__init__(self, maxSize=memorySize)
+
+        self.path = path
+        self.diskSize = maxSize
+        self.timeout = timeout
+        self.shared = shared
+        self.version = __version__
+
+        self._local = threading.local()
+        self._accessed = {}
+        self._pendingSince = time.time()
+
+        connection = self._connection()
+        with self._transaction(connection):
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS boxes ("
+                " hash TEXT NOT NULL,"
+                " method INTEGER NOT NULL,"
+                " options TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " box BLOB NOT NULL,"
+                " axesError REAL,"
+                " accessed REAL NOT NULL,"
+                " PRIMARY KEY (hash, method, options, version))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS boxes_accessed ON boxes (accessed)"
+            )
+
+            # Row count kept up to date by the writes, eviction doesn't
+            # count the table.
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS box_count (rows INTEGER NOT NULL)"
+            )
+            if connection.execute("SELECT rows FROM box_count").fetchone() is None:
+                connection.execute("INSERT INTO box_count SELECT COUNT(*) FROM boxes")
+
+    @property
+    def stats(self):
+        """
+        Property dict of the hits, misses, boxes in memory and rows stored.
+        """
+        stats = BoxCache.stats.fget(self)
+        stats["stored"] = self._connection().execute(
+            "SELECT rows FROM box_count"
+        ).fetchone()[0]
+
+        return stats
+
+    def get(self, key):
+        """
+        Looks a box up in memory, then in the file.
+
+        :param key(tuple): see :meth:`BoxCache.key`.
+
+        Raises:
+            None
+
+        Returns:
+            (tuple) eigenVectors, center, extents and axesError, or None.
+        """
+        with self._lock:
+            box = self._boxes.get(key)
+            if box is not None:
+                self._boxes.move_to_end(key)
+                self.hits += 1
+                return box
+
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT box, axesError FROM boxes"
+            " WHERE hash = ? AND method = ? AND options = ? AND version = ?",
+            self._row_key(key),
+        ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        box = _decode(*row)
+        BoxCache.put(self, key, *box)
+
+        with self._lock:
+            self.hits += 1
+
+        self._touch([self._row_key(key)])
+
+        return box
+
+    def put(self, key, eigenVectors, center, extents, axesError=None):
+        """
+        Stores a box in memory and in the file.
+
+        :param key(tuple): see :meth:`BoxCache.key`.
+        :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+        :param center(numpy.ndarray): (3,) center point.
+        :param extents(numpy.ndarray): (3,) half lengths along each axis.
+        :param axesError(float): axes error of sampled fits, or None.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self.put_many([(key, (eigenVectors, center, extents, axesError))])
+
+    def put_many(self, entries):
+        """
+        Stores many boxes in memory and in the file, in one transaction.
+
+        :param entries(list of tuples): (key, (eigenVectors, center,
+            extents)) pairs, optionally with the axesError last.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        rows = []
+        accessed = time.time()
+        for key, box in entries:
+            BoxCache.put(self, key, *box)
+            rows.append(self._row_key(key) + _encode(*box) + (accessed,))
+
+        if not rows:
+            return
+
+        connection = self._connection()
+        with self._transaction(connection):
+            added = connection.executemany(
+                "INSERT OR IGNORE INTO boxes"
+                " (hash, method, options, version, box, axesError, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+
+            # Some rows were stored already, replace them.
+            if added < len(rows):
+                connection.executemany(
+                    "UPDATE boxes SET box = ?, axesError = ?, accessed = ?"
+                    " WHERE hash = ? AND method = ? AND options = ?"
+                    " AND version = ?",
+                    [row[4:] + row[:4] for row in rows],
+                )
+
+            self._count_rows(connection, added)
+            self._write_accessed(connection)
+            self._evict(connection)
+
+    def get_many(self, keys):
+        """
+        Looks many boxes up in memory, then the rest in the file with a
+        query per PREFETCH_SIZE keys, see :meth:`BoxCache.get`.
+
+        :param keys(list of tuples): see :meth:`BoxCache.key`.
+
+        Raises:
+            None
+
+        Returns:
+            (list of tuples) boxes in the order of keys, None where missing.
+        """
+        with self._lock:
+            boxes = [self._boxes.get(key) for key in keys]
+
+        groups = collections.defaultdict(list)
+        for key, box in zip(keys, boxes):
+            if box is None:
+                groups[key[1:]].append(key[0])
+
+        # Kept here as well, the memory LRU may be smaller than the batch.
+        found = {}
+        for (method, options), geometryHashes in groups.items():
+            found.update(self._fetch(geometryHashes, method, dict(options)))
+
+        boxes = [
+            found.get(key) if box is None else box for key, box in zip(keys, boxes)
+        ]
+
+        with self._lock:
+            for key, box in zip(keys, boxes):
+                if box is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    if key in self._boxes:
+                        self._boxes.move_to_end(key)
+
+        return boxes
+
+    def prefetch(self, geometryHashes, method=0, options=None):
+        """
+        Loads the stored boxes of many geometries into memory at once.
+
+        :param geometryHashes(list of str): see
+            :func:`OBB.core.geometry_hash`.
+        :param method(int): method index.
+        :param options(dict): keyword options of the build method.
+
+        Raises:
+            None
+
+        Returns:
+            (int) number of boxes found.
+        """
+        geometryHashes = [
+            geometryHash
+            for geometryHash in geometryHashes
+            if self.key(geometryHash, method, options) not in self._boxes
+        ]
+
+        return len(self._fetch(geometryHashes, method, options))
+
+    def flush(self):
+        """
+        Writes the queued access times of hits to the file.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        if not self._accessed:
+            return
+
+        connection = self._connection()
+        with self._transaction(connection):
+            self._write_accessed(connection)
+
+    def invalidate(self, geometryHash=None):
+        """
+        Drops the boxes of a geometry, or every box, from memory and from
+        the file (for every library version).
+
+        :param geometryHash(str): geometry to drop, None to clear the cache.
+
+        Raises:
+            None
+
+        Returns:
+            (int) number of rows dropped from the file.
+        """
+        BoxCache.invalidate(self, geometryHash)
+
+        connection = self._connection()
+        with self._transaction(connection):
+            if geometryHash is None:
+                cursor = connection.execute("DELETE FROM boxes")
+                connection.execute("UPDATE box_count SET rows = 0")
+            else:
+                cursor = connection.execute(
+                    "DELETE FROM boxes WHERE hash = ?", (geometryHash,)
+                )
+                self._count_rows(connection, -cursor.rowcount)
+
+        return cursor.rowcount
+
+    def close(self):
+        """
+        Writes the queued access times and closes this thread's connection
+        to the file.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self.flush()
+
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _fetch(self, geometryHashes, method, options):
+        """
+        Reads the stored boxes of many geometries, keeping them in memory.
+
+        :param geometryHashes(list of str): geometries to read.
+        :param method(int): method index.
+        :param options(dict): keyword options of the build method.
+
+        Raises:
+            None
+
+        Returns:
+            (dict) boxes found by cache key.
+        """
+        optionsKey = repr(self.key(None, method, options)[2])
+        geometryHashes = list(collections.OrderedDict.fromkeys(geometryHashes))
+
+        connection = self._connection()
+        rows = []
+        for start in range(0, len(geometryHashes), PREFETCH_SIZE):
+            chunk = geometryHashes[start:start + PREFETCH_SIZE]
+            rows.extend(
+                connection.execute(
+                    "SELECT hash, box, axesError FROM boxes"
+                    " WHERE method = ? AND options = ? AND version = ?"
+                    " AND hash IN (%s)" % ", ".join("?" * len(chunk)),
+                    [method, optionsKey, self.version] + chunk,
+                ).fetchall()
+            )
+
+        found = {}
+        for geometryHash, box, axesError in rows:
+            key = self.key(geometryHash, method, options)
+            found[key] = _decode(box, axesError)
+            BoxCache.put(self, key, *found[key])
+
+        self._touch([(row[0], method, optionsKey, self.version) for row in rows])
+
+        return found
+
+    def _row_key(self, key):
+        """
+        Row key columns (hash, method, options, version) of a cache key.
+        """
+        geometryHash, method, options = key
+
+        return geometryHash, method, repr(options), self.version
+
+    def _connection(self):
+        """
+        Connection of this thread and process, opened on first use.
+        """
+        connection = getattr(self._local, "connection", None)
+
+        # Connections don't survive a fork, open one per process.
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            if self.shared:
+                connection.execute("PRAGMA journal_mode=DELETE")
+            else:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def _transaction(self, connection):
+        """
+        Context of a write transaction, taking the write lock up front.
+        """
+        return _Transaction(connection)
+
+    def _touch(self, rowKeys):
+        """
+        Queues access times of rows, written once enough are pending.
+        """
+        if not rowKeys:
+            return
+
+        now = time.time()
+        with self._lock:
+            if not self._accessed:
+                self._pendingSince = now
+
+            for rowKey in rowKeys:
+                self._accessed[rowKey] = now
+
+            due = (
+                len(self._accessed) >= ACCESS_BATCH_SIZE
+                or now - self._pendingSince >= ACCESS_INTERVAL
+            )
+
+        if due:
+            self.flush()
+
+    def _write_accessed(self, connection):
+        """
+        Writes the queued access times inside a write transaction.
+        """
+        with self._lock:
+            accessed = self._accessed
+            self._accessed = {}
+
+        if accessed:
+            connection.executemany(
+                "UPDATE boxes SET accessed = ?"
+                " WHERE hash = ? AND method = ? AND options = ? AND version = ?",
+                [(when,) + rowKey for rowKey, when in accessed.items()],
+            )
+
+    def _evict(self, connection):
+        """
+        Drops the least recently used rows beyond diskSize.
+        """
+        if not self.diskSize:
+            return
+
+        count = connection.execute("SELECT rows FROM box_count").fetchone()[0]
+        if count > self.diskSize:
+            cursor = connection.execute(
+                "DELETE FROM boxes WHERE rowid IN"
+                " (SELECT rowid FROM boxes ORDER BY accessed LIMIT ?)",
+                (count - self.diskSize,),
+            )
+            self._count_rows(connection, -cursor.rowcount)
+
+    def _count_rows(self, connection, change):
+        """
+        Adds the rows inserted (or deleted, negative) to the row count.
+        """
+        if change:
+            connection.execute("UPDATE box_count SET rows = rows + ?", (change,))
+
+
+class _Transaction(object):
+    """
+    :class:`_Transaction` BEGIN IMMEDIATE ... COMMIT, or ROLLBACK on errors.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, excType, exc, traceback):
+        self.connection.execute("ROLLBACK" if excType else "COMMIT")
+
+
+def _encode(eigenVectors, center, extents, axesError=None):
+    """
+    Row columns (box, axesError) of a box.
+    """
+    values = np.concatenate(
+        [np.ravel(eigenVectors), np.ravel(center), np.ravel(extents)]
+    )
+
+    return values.astype("<f8").tobytes(), axesError
+
+
+def _decode(box, axesError):
+    """
+    Box tuple of the row columns (box, axesError).
+    """
+    values = np.frombuffer(box, dtype="<f8")
+
+    return values[:9].reshape(3, 3), values[9:12], values[12:15], axesError
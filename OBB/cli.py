@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch fitting from the command line, ``python -m OBB``.
+
+Every file is fit in a worker process, one file at a time per worker, so a
+file that raises (or even crashes its worker) is reported as a failure
+without stopping the rest of the job. Maya scenes are opened with
+``maya.standalone`` when running under mayapy, or handed to a mayapy
+subprocess otherwise.
+
+Usage::
+
+    python -m OBB scans/ "assets/**/*.obj" -m 2 -j 8 -o boxes.jsonl
+"""
+import argparse
+import collections
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from OBB import boxfile
+from OBB import core
+from OBB import readers
+
+# Maya scene extensions, fit through maya.standalone.
+SCENES = (".ma", ".mb")
+
+# Tasks queued per worker, the ones lost if a worker crashes.
+QUEUE_DEPTH = 2
+
+_standalone = False
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    :param argv(list of str): arguments, defaults to sys.argv[1:].
+
+    Raises:
+        None
+
+    Returns:
+        (int) exit code, 1 if any file failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m OBB",
+        description="Fits oriented bounding boxes to geometry files.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="files, directories or glob patterns (PLY, OBJ, XYZ or Maya"
+        " scenes).",
+    )
+    parser.add_argument(
+        "-m",
+        "--method",
+        type=int,
+        default=0,
+        choices=range(5),
+        help="0(from_points), 1(from_triangles), 2(from_hull), 3(from_dito)"
+        " or 4(from_min_volume). Defaults to 0.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to the cpu count.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="output file, defaults to stdout.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="jsonl",
+        choices=("jsonl", "binary"),
+        help="JSON lines, or a binary box file (needs --output).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=readers.CHUNK_SIZE,
+        help="records read per chunk, bounds the memory per worker.",
+    )
+    parser.add_argument(
+        "--mayapy",
+        default="mayapy",
+        help="mayapy executable fitting Maya scenes, defaults to the PATH's.",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="no progress on stderr."
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.format == "binary" and args.output == "-":
+        parser.error("--format binary needs an --output file.")
+
+    paths = find_files(args.paths)
+    if not paths:
+        parser.error("no supported files found.")
+
+    start = time.time()
+    records = []
+    failures = 0
+
+    stream = sys.stdout if args.output == "-" else None
+    if stream is None and args.format == "jsonl":
+        stream = open(args.output, "w")
+
+    try:
+        jobs = fit_files(
+            paths,
+            method=args.method,
+            workers=args.workers,
+            chunkSize=args.chunk_size,
+            mayapy=args.mayapy,
+        )
+        for done, (path, fileRecords) in enumerate(jobs, 1):
+            for record in fileRecords:
+                failures += record["error"] is not None
+
+                if args.format == "jsonl":
+                    stream.write(json.dumps(record) + "\n")
+                else:
+                    records.append(record)
+
+            if not args.quiet:
+                _progress(done, len(paths), path, fileRecords)
+
+        if args.format == "binary":
+            write_table(args.output, records)
+
+    finally:
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+
+    if not args.quiet:
+        sys.stderr.write(
+            "%d files, %d failures in %.2fs\n"
+            % (len(paths), failures, time.time() - start)
+        )
+
+    return 1 if failures else 0
+
+
+def find_files(patterns):
+    """
+    Expands files, directories and glob patterns into supported files.
+
+    Directories are searched recursively.
+
+    :param patterns(list of str): files, directories or glob patterns.
+
+    Raises:
+        None
+
+    Returns:
+        (list of str) unique files in the order found.
+    """
+    extensions = tuple(readers.READERS) + SCENES
+
+    paths = []
+    for pattern in patterns:
+        for match in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            if os.path.isdir(match):
+                for root, dirs, files in os.walk(match):
+                    dirs.sort()
+                    paths.extend(
+                        os.path.join(root, name)
+                        for name in sorted(files)
+                        if name.lower().endswith(extensions)
+                    )
+            elif match.lower().endswith(extensions):
+                paths.append(match)
+
+    return list(collections.OrderedDict.fromkeys(paths))
+
+
+def fit_files(paths, method=0, workers=None, chunkSize=readers.CHUNK_SIZE,
+              mayapy="mayapy"):
+    """
+    Fits every file on a pool of worker processes.
+
+    Only a few tasks per worker are queued at a time. When a worker
+    crashes, the tasks in flight are retried one by one in a fresh process
+    to tell the culprit apart, the others go on in a new pool.
+
+    :param paths(list of str): geometry files or Maya scenes.
+    :param method(int): method index.
+    :param workers(int): number of worker processes, defaults to the cpu
+        count.
+    :param chunkSize(int): records read per chunk.
+    :param mayapy(str): mayapy executable fitting Maya scenes.
+
+    Raises:
+        None
+
+    Returns:
+        (generator) of (path, list of dict records) in completion order.
+    """
+    workers = workers or os.cpu_count() or 1
+    queue = collections.deque(paths)
+
+    while queue:
+        suspects = []
+
+        with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while queue or running:
+                while queue and len(running) < workers * QUEUE_DEPTH:
+                    path = queue.popleft()
+                    future = pool.submit(fit_file, path, method, chunkSize, mayapy)
+                    running[future] = path
+
+                done, _ = futures.wait(
+                    running, return_when=futures.FIRST_COMPLETED
+                )
+                try:
+                    for future in done:
+                        yield running[future], future.result()
+                        del running[future]
+                except BrokenProcessPool:
+                    suspects = list(running.values())
+                    break
+
+        for path in suspects:
+            yield path, _fit_isolated(path, method, chunkSize, mayapy)
+
+
+def fit_file(path, method=0, chunkSize=readers.CHUNK_SIZE, mayapy="mayapy"):
+    """
+    Fits one file, turning any error into a failure record.
+
+    :param path(str): geometry file or Maya scene.
+    :param method(int): method index.
+    :param chunkSize(int): records read per chunk.
+    :param mayapy(str): mayapy executable fitting Maya scenes.
+
+    Raises:
+        None
+
+    Returns:
+        (list of dict) one record per box, a single one for geometry files.
+    """
+    start = time.time()
+
+    try:
+        if path.lower().endswith(SCENES):
+            return _fit_scene(path, method, mayapy)
+
+        with readers.open_reader(path, chunkSize=chunkSize) as reader:
+            box = readers.build_from_reader(reader, method=method)
+            digest = core.geometry_hash(
+                reader.points, reader.triangles if method == 1 else None
+            )
+
+        return [_record(path, method, time.time() - start, *box, digest=digest)]
+
+    except Exception as exc:
+        return [_failure(path, method, time.time() - start, exc)]
+
+
+def write_table(path, records):
+    """
+    Writes the fit records to a box file, see :mod:`OBB.boxfile`.
+
+    Failures are left out, their sources are the file paths (followed by
+    the mesh names for Maya scenes).
+
+    :param path(str): output file.
+    :param records(list of dict): fit records.
+
+    Raises:
+        None
+
+    Returns:
+        None
+    """
+    records = [record for record in records if record["error"] is None]
+
+    boxfile.write(
+        path,
+        np.array([record["axes"] for record in records]).reshape(-1, 3, 3),
+        np.array([record["center"] for record in records]).reshape(-1, 3),
+        np.array([record["extents"] for record in records]).reshape(-1, 3),
+        sources=[record["path"] + (record["mesh"] or "") for record in records],
+        hashes=[record["hash"] for record in records],
+    )
+
+
+def _fit_isolated(path, method, chunkSize, mayapy):
+    """
+    Fits one file alone in a fresh worker process.
+
+    :param path(str): geometry file or Maya scene.
+    :param method(int): method index.
+    :param chunkSize(int): records read per chunk.
+    :param mayapy(str): mayapy executable fitting Maya scenes.
+
+    Raises:
+        None
+
+    Returns:
+        (list of dict) records, a failure if the worker crashes again.
+    """
+    start = time.time()
+
+    try:
+        with futures.ProcessPoolExecutor(max_workers=1) as pool:
+            return pool.submit(fit_file, path, method, chunkSize, mayapy).result()
+    except BrokenProcessPool:
+        return [
+            _failure(
+                path,
+                method,
+                time.time() - start,
+                RuntimeError("The worker process crashed."),
+            )
+        ]
+
+
+def _fit_scene(path, method, mayapy):
+    """
+    Fits every mesh of a Maya scene.
+
+    :param path(str): Maya scene.
+    :param method(int): method index.
+    :param mayapy(str): mayapy executable, used outside of mayapy.
+
+    Raises:
+        `RuntimeError` if the scene can't be opened or fit.
+
+    Returns:
+        (list of dict) one record per mesh.
+    """
+    global _standalone
+
+    start = time.time()
+
+    try:
+        import maya.standalone
+    except ImportError:
+        return _fit_scene_subprocess(path, method, mayapy)
+
+    if not _standalone:
+        maya.standalone.initialize(name="python")
+        _standalone = True
+
+    from maya import cmds
+
+    from OBB.api import OBB
+
+    cmds.file(path, open=True, force=True)
+
+    shapes = cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+    meshNames = sorted(
+        set(cmds.listRelatives(shapes, parent=True, fullPath=True) or [])
+    )
+    if not meshNames:
+        return []
+
+    pointsList, trianglesList = OBB.get_batch_data(meshNames, method)
+    result = core.batch_build(pointsList, method=method, trianglesList=trianglesList)
+    seconds = (time.time() - start) / len(meshNames)
+
+    return [
+        _record(
+            path,
+            method,
+            seconds,
+            *result[i],
+            mesh=meshName,
+            digest=core.geometry_hash(
+                pointsList[i], trianglesList[i] if trianglesList else None
+            )
+        )
+        for i, meshName in enumerate(meshNames)
+    ]
+
+
+def _fit_scene_subprocess(path, method, mayapy):
+    """
+    Fits a Maya scene by running this tool under mayapy.
+
+    :param path(str): Maya scene.
+    :param method(int): method index.
+    :param mayapy(str): mayapy executable.
+
+    Raises:
+        `RuntimeError` if mayapy is unavailable or fails.
+
+    Returns:
+        (list of dict) one record per mesh.
+    """
+    env = dict(os.environ)
+    package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+
+    command = [mayapy, "-m", "OBB", path, "-m", str(method), "-j", "1", "-q"]
+
+    try:
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+        )
+    except OSError:
+        raise RuntimeError(
+            "Maya scenes need mayapy, %s is unavailable." % mayapy
+        )
+
+    stdout, stderr = process.communicate()
+
+    records = [
+        json.loads(line) for line in stdout.decode("utf-8").splitlines() if line
+    ]
+    if not records and process.returncode:
+        raise RuntimeError(
+            "mayapy failed: %s" % stderr.decode("utf-8", "replace").strip()
+        )
+
+    return records
+
+
+def _record(
+    path, method, seconds, eigenVectors, center, extents, mesh=None, digest=None
+):
+    """
+    JSON friendly record of a fit box.
+
+    :param path(str): source file.
+    :param method(int): method index.
+    :param seconds(float): time spent fitting.
+    :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+    :param center(numpy.ndarray): (3,) center point.
+    :param extents(numpy.ndarray): (3,) half lengths along each axis.
+    :param mesh(str): mesh name within a Maya scene.
+    :param digest(str): geometry hash, see :func:`OBB.core.geometry_hash`.
+
+    Raises:
+        None
+
+    Returns:
+        (dict)
+    """
+    return {
+        "path": path,
+        "mesh": mesh,
+        "method": method,
+        "seconds": seconds,
+        "error": None,
+        "hash": digest,
+        "axes": np.asarray(eigenVectors).tolist(),
+        "center": np.asarray(center).tolist(),
+        "extents": np.asarray(extents).tolist(),
+        "matrix": core.get_matrix(eigenVectors, center, extents),
+    }
+
+
+def _failure(path, method, seconds, exc):
+    """
+    JSON friendly record of a file that failed.
+
+    :param path(str): source file.
+    :param method(int): method index.
+    :param seconds(float): time spent before failing.
+    :param exc(Exception): the error.
+
+    Raises:
+        None
+
+    Returns:
+        (dict)
+    """
+    return {
+        "path": path,
+        "mesh": None,
+        "method": method,
+        "seconds": seconds,
+        "error": "%s: %s" % (type(exc).__name__, exc),
+    }
+
+
+def _progress(done, total, path, records):
+    """
+    Writes one progress line to stderr.
+
+    :param done(int): files done so far.
+    :param total(int): number of files.
+    :param path(str): file just done.
+    :param records(list of dict): its records.
+
+    Raises:
+        None
+
+    Returns:
+        None
+    """
+    seconds = sum(record["seconds"] for record in records)
+    errors = [record["error"] for record in records if record["error"]]
+
+    status = "FAILED %s" % errors[0] if errors else "%d boxes" % len(records)
+
+    sys.stderr.write(
+        "[%d/%d] %s %.3fs %s\n" % (done, total, path, seconds, status)
+    )
+    sys.stderr.flush()
@@ -0,0 +1,2301 @@
+# -*- coding: utf-8 -*-
+"""
+Maya independent oriented bounding box solvers.
+
+Every function in this module works on plain numpy arrays so boxes can be
+fit anywhere numpy is available (farm workers, tests, mayapy without a
+license, ...). :class:`OBB.api.OBB` is a thin Maya adapter on top of it.
+
+Points are ``(N, 3)`` float arrays and triangles are ``(M, 3)`` (or flat
+``(3M,)``) integer arrays indexing into the points.
+"""
+import hashlib
+import itertools
+import time
+
+import numpy as np
+
+from OBB.moments import Moments
+from OBB.moments import POINT_CHUNK_SIZE
+from OBB.moments import TRIANGLE_CHUNK_SIZE
+from OBB.moments import merge_moments
+from OBB.utils import batch_eigh3
+from OBB.utils import eigh
+from OBB.utils import eigh3
+from OBB.utils import lazy_property
+
+try:
+    from scipy.spatial import ConvexHull
+
+    hullMethod = True
+except ImportError:
+    hullMethod = False
+
+# Slab normals of the DiTO-14 and DiTO-26 extremal point selection.
+DITO_14 = np.array(
+    [
+        [1, 0, 0],
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 1, 1],
+        [1, 1, -1],
+        [1, -1, 1],
+        [1, -1, -1],
+    ],
+    dtype=np.float64,
+)
+DITO_26 = np.concatenate(
+    [
+        DITO_14,
+        [
+            [1, 1, 0],
+            [1, -1, 0],
+            [1, 0, 1],
+            [1, 0, -1],
+            [0, 1, 1],
+            [0, 1, -1],
+        ],
+    ]
+)
+
+# Default number of points the sampled axes are estimated from.
+SAMPLE_SIZE = 65536
+
+# Relative covariance change below which temporal fits keep their axes.
+TEMPORAL_TOLERANCE = 1.0e-6
+
+# Relative deviation from a uniform scale still carried over as similarity.
+SIMILARITY_TOLERANCE = 1.0e-9
+
+# Hull edge pairs whose normals are built at once by the min volume search.
+EDGE_CHUNK_SIZE = 65536
+
+# Default time budget (seconds) of min volume fits in batches and files.
+MIN_VOLUME_TIME = 1.0
+
+# Build method options the batched fits run with, per method index.
+BATCH_OPTIONS = {4: {"maxTime": MIN_VOLUME_TIME}}
+
+# Relative covariance change below which incremental fits keep their axes.
+INCREMENTAL_TOLERANCE = 1.0e-3
+
+# Points (or triangles) converted and hashed at a time by geometry_hash.
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def as_points(points):
+    """
+    Converts the input into a contiguous (N, 3) float array.
+
+    Float32 and float64 input is kept as is, anything else is
+    converted to float64.
+
+    :param points(array like): points to represent geometry.
+
+    Raises:
+        `RuntimeError` if the points are not (N, 3) or empty.
+
+    Returns:
+        (numpy.ndarray) (N, 3) points.
+    """
+    points = np.asarray(points)
+
+    if points.dtype not in (np.float32, np.float64):
+        points = points.astype(np.float64)
+
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise RuntimeError(
+            "Points must be an (N, 3) array, got %s." % (points.shape,)
+        )
+
+    if not len(points):
+        raise RuntimeError("No points to build a bounding box from.")
+
+    return np.ascontiguousarray(points)
+
+
+def as_triangles(triangles):
+    """
+    Converts the input into a contiguous (M, 3) integer array.
+
+    :param triangles(array like): flat or (M, 3) triangle indices.
+
+    Raises:
+        `RuntimeError` if the indices are not a multiple of 3.
+
+    Returns:
+        (numpy.ndarray) (M, 3) triangle indices.
+    """
+    triangles = np.asarray(triangles)
+
+    if triangles.size % 3:
+        raise RuntimeError("Triangle indices must be a multiple of 3.")
+
+    return np.ascontiguousarray(triangles.reshape(-1, 3), dtype=np.intp)
+
+
+def geometry_hash(points, triangles=None):
+    """
+    Content hash of the geometry a box is fit to.
+
+    The arrays' own buffers are hashed along with their dtype and shape,
+    so float32 and float64 copies of one mesh hash differently. Pass the
+    triangles only for the methods reading them. Contiguous arrays, memory
+    mapped ones included, are hashed in place chunk by chunk, only strided
+    views are copied a chunk at a time.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param triangles(numpy.ndarray): (M, 3) triangle indices or None.
+
+    Raises:
+        None
+
+    Returns:
+        (str) 32 hexadecimal digits (a 128 bit blake2b digest).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    for name, values in ((b"points", points), (b"triangles", triangles)):
+        if values is None:
+            continue
+
+        values = np.asarray(values)
+        digest.update(
+            b"%s %s %s" % (name, values.dtype.str.encode(), str(values.shape).encode())
+        )
+
+        for start in range(0, len(values), HASH_CHUNK_SIZE):
+            chunk = values[start:start + HASH_CHUNK_SIZE]
+            if not chunk.flags.c_contiguous:
+                chunk = np.ascontiguousarray(chunk)
+
+            digest.update(memoryview(chunk).cast("B"))
+
+    return digest.hexdigest()
+
+
+def points_covariance(points):
+    """
+    Covariance matrix of a point cloud.
+
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) 3x3 covariance matrix.
+    """
+    return Moments.from_points(as_points(points), withSupport=False).covariance
+
+
+def triangles_covariance(points, triangles, chunkSize=TRIANGLE_CHUNK_SIZE):
+    """
+    Area weighted covariance matrix of a triangle mesh.
+
+    See :meth:`OBB.moments.Moments.from_triangles`.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param triangles(numpy.ndarray): (M, 3) triangle indices.
+    :param chunkSize(int): number of triangles processed at once.
+
+    Raises:
+        `RuntimeError` if the mesh has no area.
+
+    Returns:
+        (numpy.ndarray) 3x3 covariance matrix.
+    """
+    moments = Moments.from_triangles(
+        as_points(points),
+        as_triangles(triangles),
+        withSupport=False,
+        chunkSize=chunkSize,
+    )
+
+    return moments.covariance
+
+
+def build_from_moments(moments):
+    """
+    Bounding box algorithm using a moment summary.
+
+    The axes come from the summary's covariance and the extents from its
+    support points.
+
+    :param moments(OBB.moments.Moments): summary with support points.
+
+    Raises:
+        `RuntimeError` if the summary has no support points.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    if moments.support is None:
+        raise RuntimeError("Moments have no support points to fit.")
+
+    return build_from_covariance_matrix(moments.covariance, moments.support)
+
+
+def build_from_covariance_matrix(cvMatrix, points):
+    """
+    Build eigen vectors from covariance matrix and fit the points to them.
+
+    :param cvMatrix(numpy.ndarray): 3x3 covariance matrix.
+    :param points(numpy.ndarray): (N, 3) points to get the extents from.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    points = as_points(points)
+
+    # Calculate the natural axes by getting the eigen vectors.
+    eigenValues, eigenVectors = eigh3(cvMatrix)
+
+    return fit_axes(eigenVectors.T, points)
+
+
+def fit_axes(eigenVectors, points):
+    """
+    Fits a box with the given axes tightly around the points.
+
+    :param eigenVectors(numpy.ndarray): (3, 3) orthonormal axes as rows.
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    eigenVectors = np.asarray(eigenVectors, dtype=np.float64)
+
+    # (3, N) so the min/max run over contiguous rows.
+    p_prime = np.dot(eigenVectors, as_points(points).T)
+
+    minim = p_prime.min(axis=1)
+    maxim = p_prime.max(axis=1)
+
+    centerPoint = (maxim + minim) * 0.5
+    m_ext = (maxim - minim) * 0.5
+
+    m_pos = np.dot(eigenVectors.T, centerPoint)
+
+    return eigenVectors, m_pos, m_ext
+
+
+def fit_axes_chunks(eigenVectors, chunks):
+    """
+    Fits a box with the given axes around points streamed in chunks.
+
+    Keeps running minima and maxima along the axes, so only one chunk is
+    held at a time.
+
+    :param eigenVectors(numpy.ndarray): (3, 3) orthonormal axes as rows.
+    :param chunks(iterable of numpy.ndarray): (n, 3) chunks of points.
+
+    Raises:
+        `RuntimeError` if there are no points.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    eigenVectors = np.asarray(eigenVectors, dtype=np.float64)
+
+    minim = np.full(3, np.inf)
+    maxim = np.full(3, -np.inf)
+
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+
+        p_prime = np.dot(eigenVectors, as_points(chunk).T)
+
+        minim = np.minimum(minim, p_prime.min(axis=1))
+        maxim = np.maximum(maxim, p_prime.max(axis=1))
+
+    if not np.isfinite(minim).all():
+        raise RuntimeError("No points to build a bounding box from.")
+
+    centerPoint = (maxim + minim) * 0.5
+    m_ext = (maxim - minim) * 0.5
+
+    m_pos = np.dot(eigenVectors.T, centerPoint)
+
+    return eigenVectors, m_pos, m_ext
+
+
+def build_from_points(points):
+    """
+    Bounding box algorithm using vertex points.
+
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    return build_from_covariance_matrix(points_covariance(points), points)
+
+
+def sample_points(points, sampleSize=SAMPLE_SIZE, stratified=True, seed=None):
+    """
+    Random subsample of the points.
+
+    Stratified sampling picks one random point in each of ``sampleSize``
+    equal runs of the point order, which spreads the sample over the mesh
+    since vertex order is spatially coherent.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param sampleSize(int): number of points to keep.
+    :param stratified(bool): stratified or plain random sampling.
+    :param seed(int): random seed, None for a random one.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (min(N, sampleSize), 3) points.
+    """
+    points = as_points(points)
+    count = len(points)
+
+    if sampleSize >= count:
+        return points
+
+    random = np.random.RandomState(seed)
+
+    if stratified:
+        bounds = (np.arange(sampleSize + 1) * count) // sampleSize
+        indices = bounds[:-1] + (
+            random.random_sample(sampleSize) * np.diff(bounds)
+        ).astype(np.intp)
+    else:
+        indices = random.choice(count, sampleSize, replace=False)
+
+    return points[indices]
+
+
+def estimate_axes(points):
+    """
+    Principal axes of the points and their angular standard error.
+
+    The error is the asymptotic standard deviation of the sample covariance
+    eigen vectors, sqrt(l_i * l_j / (n - 1)) / |l_i - l_j|, for the worst
+    pair of eigen values. It tells how far (in radians) the axes estimated
+    from a sample are expected to be from those of the whole population.
+
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (3, 3) axes as rows.
+        (float) angular standard error in radians, inf if undetermined.
+    """
+    points = as_points(points)
+
+    eigenValues, eigenVectors = eigh3(points_covariance(points))
+    eigenValues = np.maximum(eigenValues, 0.0)
+
+    first, second = np.triu_indices(3, k=1)
+    gaps = np.abs(eigenValues[first] - eigenValues[second])
+    spread = np.sqrt(
+        eigenValues[first] * eigenValues[second] / max(len(points) - 1, 1)
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        errors = np.where(gaps > 0.0, spread / gaps, np.inf)
+
+    return eigenVectors.T, float(errors.max())
+
+
+def build_from_sampled_points(
+    points, sampleSize=SAMPLE_SIZE, stratified=True, seed=None
+):
+    """
+    Bounding box algorithm estimating the axes from a subsample.
+
+    The covariance only reads ``sampleSize`` points, the extents come from
+    one projection pass over all of them so the box still contains every
+    point.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param sampleSize(int): number of points the axes are estimated from.
+    :param stratified(bool): stratified or plain random sampling.
+    :param seed(int): random seed, None for a random one.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    sample = sample_points(points, sampleSize, stratified=stratified, seed=seed)
+
+    return fit_axes(estimate_axes(sample)[0], points)
+
+
+def iter_progressive(
+    points, initialSize=1024, growth=4, tolerance=None, seed=None, matrix=None
+):
+    """
+    Anytime bounding box, yields coarse boxes refined as more points are read.
+
+    Every step takes a strided sample of the points, ``growth`` times larger
+    than the previous one, estimates the axes from it and fits the box to
+    that sample only. The last step fits the exact extents over all points,
+    it is reached when every point is sampled or when the axes error drops
+    under ``tolerance``. Stop iterating whenever the time budget runs out.
+
+    With a ``matrix`` the points are in object space and only the samples
+    are transformed, the first boxes don't wait for the whole mesh to be
+    moved to world space.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param initialSize(int): number of points of the first coarse box.
+    :param growth(int): sample growth factor per step.
+    :param tolerance(float): axes error (radians) accepted as final.
+    :param seed(int): random seed, None for a random one.
+    :param matrix(numpy.ndarray): 4x4 (row vector) matrix of the points.
+
+    Raises:
+        None
+
+    Returns:
+        (generator) of (EigenVectors, CenterPoint, BoundingExtents, error,
+        exact) tuples, error being the axes angular standard error and
+        exact whether the extents cover all points.
+    """
+    points = as_points(points)
+    random = np.random.RandomState(seed)
+
+    def transform(points):
+        if matrix is None:
+            return points
+
+        return np.dot(points, matrix[:3, :3]) + matrix[3, :3]
+
+    if matrix is not None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+
+    stride = max(len(points) // max(int(initialSize), 1), 1)
+
+    while True:
+        sample = transform(points[random.randint(stride)::stride])
+        eigenVectors, error = estimate_axes(sample)
+
+        if stride == 1 or (tolerance is not None and error <= tolerance):
+            break
+
+        yield fit_axes(eigenVectors, sample) + (error, False)
+
+        stride = max(stride // max(int(growth), 2), 1)
+
+    if stride != 1:
+        sample = transform(points)
+
+    yield fit_axes(eigenVectors, sample) + (error, True)
+
+
+def voxel_decimate(points, cellSize):
+    """
+    Decimates the points to the per voxel extremes, for convex hulls.
+
+    Points are keyed by their integer cell, packed when the grid is small
+    enough and spatially hashed into a table of ~2N slots otherwise. The
+    min and max x, y and z of every slot are reduced in one unbuffered
+    pass each and the points reaching them are kept (six per slot unless
+    they tie), which keeps the outline of the geometry. Nothing is sorted,
+    the cost is linear in the number of points.
+
+    A hash collision merges two cells, the merged slot keeps the extremes
+    of both and may drop an outline point, which only loosens the axes
+    estimate.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param cellSize(float): edge length of the voxels.
+
+    Raises:
+        `RuntimeError` if the cell size is not positive.
+
+    Returns:
+        (numpy.ndarray) (M, 3) decimated points.
+    """
+    if not cellSize > 0:
+        raise RuntimeError("Voxel cell size must be positive.")
+
+    points = as_points(points)
+
+    # Contiguous columns, the (N, 3) reductions along the first axis are
+    # several times slower.
+    columns = [np.ascontiguousarray(points[:, axis]) for axis in range(3)]
+    cells = [
+        np.floor((values - values.min()) / cellSize).astype(np.int64)
+        for values in columns
+    ]
+    keys, slots = _cell_keys(cells)
+
+    keep = np.zeros(len(points), dtype=bool)
+    extremes = np.empty(slots, dtype=points.dtype)
+
+    for values in columns:
+        for reduce, start in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+            extremes.fill(start)
+            reduce.at(extremes, keys, values)
+
+            keep |= values == extremes[keys]
+
+    return points[keep]
+
+
+def _cell_keys(cells):
+    """
+    Integer slot of every voxel cell.
+
+    :param cells(list of numpy.ndarray): x, y and z (N,) non negative
+        integer cells.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (N,) keys, equal for equal cells.
+        (int) number of slots, the keys are in range(slots).
+    """
+    x, y, z = cells
+    dims = [int(values.max()) + 1 for values in cells]
+    slots = 2 * len(x) + 1
+
+    if float(dims[0]) * float(dims[1]) * float(dims[2]) <= slots:
+        keys = z * dims[1]
+        keys += y
+        keys *= dims[0]
+        keys += x
+
+        return keys, dims[0] * dims[1] * dims[2]
+
+    # Sparse grid, spatial hash of the cells (Teschner et al. 2003).
+    keys = x * 73856093
+    keys ^= y * 19349663
+    keys ^= z * 83492791
+    keys %= slots
+
+    return keys, slots
+
+
+def build_from_triangles(points, triangles, chunkSize=TRIANGLE_CHUNK_SIZE):
+    """
+    Bounding box algorithm using triangles.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param triangles(numpy.ndarray): (M, 3) triangle indices.
+    :param chunkSize(int): number of triangles processed at once.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    cvMatrix = triangles_covariance(points, triangles, chunkSize=chunkSize)
+
+    return build_from_covariance_matrix(cvMatrix, points)
+
+
+def build_from_hull(points, voxelSize=None):
+    """
+    Bounding box algorithm using convex hull points.
+
+    With ``voxelSize`` the hull is built from the per voxel extremes of the
+    points (see :func:`voxel_decimate`) and the extents are measured over
+    all points, so they stay exact.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param voxelSize(float): voxel edge length to decimate with, or None.
+
+    Raises:
+        `RuntimeError` if scipy is unavailable.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    if voxelSize:
+        decimated = voxel_decimate(points, voxelSize)
+        hullPoints, hullTriangles = convex_hull(decimated)
+
+        cvMatrix = triangles_covariance(hullPoints, hullTriangles)
+
+        return build_from_covariance_matrix(cvMatrix, points)
+
+    # Only hull vertices can be extremal, the extents skip the rest.
+    hullPoints, hullTriangles = convex_hull(points)
+
+    cvMatrix = triangles_covariance(hullPoints, hullTriangles)
+
+    return build_from_covariance_matrix(cvMatrix, hullPoints)
+
+
+def convex_hull(points):
+    """
+    Convex hull as a compact mesh of its own vertices.
+
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        `RuntimeError` if scipy is unavailable.
+
+    Returns:
+        (numpy.ndarray) (H, 3) hull vertices.
+        (numpy.ndarray) (M, 3) hull triangles indexing the hull vertices.
+    """
+    if not hullMethod:
+        raise RuntimeError(
+            "From hull method unavailable because"
+            " scipy cannot be imported."
+            "Please install it if you need it."
+        )
+
+    points = as_points(points)
+    hull = ConvexHull(points)
+
+    remap = np.empty(len(points), dtype=np.intp)
+    remap[hull.vertices] = np.arange(len(hull.vertices))
+
+    return points[hull.vertices], remap[hull.simplices]
+
+
+def build_from_dito(points, normals=DITO_14):
+    """
+    Ditetrahedron OBB algorithm (DiTO) by Larsson and Kallberg.
+
+    The extremal points along a fixed set of slab normals give a large
+    base triangle and the two tetrahedra built on it. Every edge and
+    normal of these seven triangles is a candidate axis set, the one
+    giving the smallest box surface over the extremal points wins and is
+    fit to all points. Runs in linear time.
+
+    The covariance axes of :func:`build_from_points` are a candidate too
+    and the smaller volume of the two boxes is kept, so DiTO is never
+    looser than the points method. How much tighter it gets depends on
+    the shape, from about the same box on smooth blobs to much smaller
+    ones on boxy or elongated meshes.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param normals(numpy.ndarray): (K, 3) slab normals, DITO_14 or DITO_26.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    points = as_points(points)
+    normals = np.asarray(normals, dtype=np.float64)
+    normals = normals / np.linalg.norm(normals, axis=1)[:, None]
+
+    # Extremal points, min and max along every slab normal.
+    projections = np.dot(points, normals.T)
+    extremal = np.concatenate(
+        [points[projections.argmin(axis=0)], points[projections.argmax(axis=0)]]
+    ).astype(np.float64)
+
+    pcaBox = build_from_points(points)
+
+    candidates = [pcaBox[0], np.eye(3)]
+    candidates.extend(_dito_candidates(extremal))
+    candidates = np.array(candidates)
+
+    # Half the box surface area over the extremal points as the quality.
+    ranges = np.einsum("kij,sj->ksi", candidates, extremal)
+    lengths = ranges.max(axis=1) - ranges.min(axis=1)
+    quality = (
+        lengths[:, 0] * lengths[:, 1]
+        + lengths[:, 1] * lengths[:, 2]
+        + lengths[:, 2] * lengths[:, 0]
+    )
+
+    best = quality.argmin()
+    if not best:
+        return pcaBox
+
+    # The extremal points only estimate the quality, the covariance box
+    # is measured on all points.
+    box = fit_axes(candidates[best], points)
+    if np.prod(pcaBox[2]) < np.prod(box[2]):
+        return pcaBox
+
+    return box
+
+
+def _dito_candidates(extremal, tol=1.0e-12):
+    """
+    Candidate axes from the ditetrahedron over the extremal points.
+
+    :param extremal(numpy.ndarray): (S, 3) extremal points.
+    :param tol(float): squared length under which vectors are degenerate.
+
+    Raises:
+        None
+
+    Returns:
+        (list of numpy.ndarray) (3, 3) orthonormal axes as rows.
+    """
+    # Base triangle, the most distant extremal pair and the point the
+    # furthest from the line through them.
+    distances = ((extremal[:, None] - extremal[None]) ** 2).sum(axis=2)
+    first, second = np.unravel_index(distances.argmax(), distances.shape)
+    p0, p1 = extremal[first], extremal[second]
+
+    line = p1 - p0
+    if np.dot(line, line) <= tol:
+        return []
+
+    line /= np.sqrt(np.dot(line, line))
+    offsets = extremal - p0
+    offsets -= np.outer(np.dot(offsets, line), line)
+    lineDistances = (offsets ** 2).sum(axis=1)
+
+    if lineDistances.max() <= tol:
+        # Every point is on the line, any frame around it will do.
+        helper = np.eye(3)[np.abs(line).argmin()]
+        u = np.cross(line, helper)
+        u /= np.linalg.norm(u)
+        return [np.array([line, u, np.cross(line, u)])]
+
+    p2 = extremal[lineDistances.argmax()]
+    triangles = [(p0, p1, p2)]
+
+    # The two tetrahedra apexes, the furthest points on either side.
+    normal = np.cross(p1 - p0, p2 - p0)
+    heights = np.dot(extremal - p0, normal)
+    for apex in (extremal[heights.argmin()], extremal[heights.argmax()]):
+        triangles.extend([(p0, p1, apex), (p1, p2, apex), (p2, p0, apex)])
+
+    candidates = []
+    for a, b, c in triangles:
+        normal = np.cross(b - a, c - a)
+        if np.dot(normal, normal) <= tol:
+            continue
+
+        normal /= np.sqrt(np.dot(normal, normal))
+        for edge in (b - a, c - b, a - c):
+            edge = edge / np.sqrt(np.dot(edge, edge))
+            candidates.append(np.array([edge, normal, np.cross(edge, normal)]))
+
+    return candidates
+
+
+def build_from_min_volume(
+    points, maxTime=None, maxIterations=None, edgeSearch=False
+):
+    """
+    Bounding box algorithm searching for the minimum volume box.
+
+    Starting from the DiTO box, every distinct face normal of the convex
+    hull is tried as a box axis, largest faces first. The hull vertices are
+    projected on the face plane and the minimum area rectangle around them
+    is found with rotating calipers over the 2D hull edges. With
+    ``edgeSearch`` the cross products of hull edge pairs are tried next.
+
+    The search stops when ``maxTime`` seconds or ``maxIterations`` candidate
+    axes are spent and returns the best box found so far.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param maxTime(float): time budget in seconds, None for no limit.
+    :param maxIterations(int): candidate axes budget, None for no limit.
+    :param edgeSearch(bool): also try the hull edge pair directions.
+
+    Raises:
+        `RuntimeError` if scipy is unavailable.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    if not hullMethod:
+        raise RuntimeError(
+            "From min volume method unavailable because"
+            " scipy cannot be imported."
+            "Please install it if you need it."
+        )
+
+    start = time.time()
+    points = as_points(points)
+
+    hull = ConvexHull(points)
+    hullPoints = points[hull.vertices].astype(np.float64)
+
+    bestAxes = build_from_dito(hullPoints)[0]
+    bestVolume = np.prod(np.ptp(np.dot(hullPoints, bestAxes.T), axis=0))
+
+    # Edge pairs grow quadratically, their normals are built a chunk at a
+    # time so the budget is checked before each chunk exists.
+    chunks = [_hull_face_normals(hull)]
+    if edgeSearch:
+        chunks = itertools.chain(chunks, _iter_hull_edge_normals(hull))
+
+    iterations = 0
+    for candidates in _budgeted(chunks, start, maxTime):
+        for normal in candidates:
+            if maxIterations is not None and iterations >= maxIterations:
+                return fit_axes(bestAxes, hullPoints)
+
+            if maxTime is not None and time.time() - start > maxTime:
+                return fit_axes(bestAxes, hullPoints)
+
+            iterations += 1
+
+            bestAxes, bestVolume = _try_face_axis(
+                normal, hullPoints, bestAxes, bestVolume
+            )
+
+    return fit_axes(bestAxes, hullPoints)
+
+
+def _budgeted(chunks, start, maxTime):
+    """
+    Yields chunks until the time budget is spent, checked before each one.
+
+    :param chunks(iterable): lazily built chunks.
+    :param start(float): time the budget started at.
+    :param maxTime(float): time budget in seconds, None for no limit.
+
+    Raises:
+        None
+
+    Returns:
+        (generator) of chunks.
+    """
+    chunks = iter(chunks)
+
+    while maxTime is None or time.time() - start <= maxTime:
+        try:
+            yield next(chunks)
+        except StopIteration:
+            return
+
+
+def _try_face_axis(normal, hullPoints, bestAxes, bestVolume):
+    """
+    Tries a normal as box axis with the minimum area rectangle around it.
+
+    :param normal(numpy.ndarray): (3,) unit candidate axis.
+    :param hullPoints(numpy.ndarray): (H, 3) hull vertices.
+    :param bestAxes(numpy.ndarray): (3, 3) best axes so far.
+    :param bestVolume(float): volume of the best box so far.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (3, 3) best axes.
+        (float) best volume.
+    """
+    u, v = _plane_frame(normal)
+    plane = np.dot(hullPoints, np.array([u, v]).T)
+
+    try:
+        area, direction = _min_area_rectangle(plane)
+    except RuntimeError:
+        # Qhull could not build the projected 2D hull.
+        return bestAxes, bestVolume
+
+    volume = area * np.ptp(np.dot(hullPoints, normal))
+    if volume < bestVolume:
+        axis = direction[0] * u + direction[1] * v
+        bestAxes = np.array([axis, np.cross(normal, axis), normal])
+        bestVolume = volume
+
+    return bestAxes, bestVolume
+
+
+def _hull_face_normals(hull, decimals=9):
+    """
+    Distinct face normals of a convex hull, largest faces first.
+
+    :param hull(scipy.spatial.ConvexHull): convex hull.
+    :param decimals(int): rounding used to merge coplanar triangles.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (F, 3) unit normals.
+    """
+    corners = hull.points[hull.simplices]
+    areas = np.linalg.norm(
+        np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]),
+        axis=1,
+    )
+
+    normals = hull.equations[:, :3]
+    keys, first, inverse = np.unique(
+        np.round(normals, decimals), axis=0, return_index=True, return_inverse=True
+    )
+
+    faceAreas = np.bincount(inverse.ravel(), weights=areas)
+    order = np.argsort(faceAreas)[::-1]
+
+    return normals[first[order]]
+
+
+def _iter_hull_edge_normals(
+    hull, decimals=6, tol=1.0e-9, chunkSize=EDGE_CHUNK_SIZE
+):
+    """
+    Directions orthogonal to pairs of distinct hull edge directions, built
+    a chunk at a time.
+
+    :param hull(scipy.spatial.ConvexHull): convex hull.
+    :param decimals(int): rounding used to merge parallel edges.
+    :param tol(float): length under which a cross product is discarded.
+    :param chunkSize(int): edge pairs per chunk, whole rows of pairs are
+        added until it is reached.
+
+    Raises:
+        None
+
+    Returns:
+        (generator) of (P, 3) unit normals.
+    """
+    simplices = hull.simplices
+    edges = np.concatenate(
+        [simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]]
+    )
+    directions = hull.points[edges[:, 1]] - hull.points[edges[:, 0]]
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+
+    # Edges are undirected, flip them into one half space before merging.
+    major = np.abs(directions).argmax(axis=1)
+    flip = np.sign(directions[np.arange(len(directions)), major])
+    directions = np.unique(np.round(directions * flip[:, None], decimals), axis=0)
+
+    # Whole rows of the (i, j > i) pairs until a chunk is full.
+    count = len(directions)
+    rows = []
+    size = 0
+
+    for row in range(count - 1):
+        rows.append(row)
+        size += count - 1 - row
+
+        if size < chunkSize and row < count - 2:
+            continue
+
+        first = np.repeat(rows, [count - 1 - i for i in rows])
+        second = np.concatenate([np.arange(i + 1, count) for i in rows])
+
+        normals = np.cross(directions[first], directions[second])
+        lengths = np.linalg.norm(normals, axis=1)
+        keep = lengths > tol
+
+        yield normals[keep] / lengths[keep, None]
+
+        rows = []
+        size = 0
+
+
+def _plane_frame(normal):
+    """
+    Two unit vectors spanning the plane orthogonal to a unit normal.
+
+    :param normal(numpy.ndarray): (3,) unit normal.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (3,) first plane vector.
+        (numpy.ndarray) (3,) second plane vector.
+    """
+    helper = np.eye(3)[np.abs(normal).argmin()]
+    u = np.cross(normal, helper)
+    u /= np.linalg.norm(u)
+
+    return u, np.cross(normal, u)
+
+
+def _min_area_rectangle(points):
+    """
+    Minimum area rectangle around 2D points with rotating calipers.
+
+    One side of the minimum rectangle is collinear with an edge of the
+    convex hull, so every hull edge direction is evaluated at once.
+
+    :param points(numpy.ndarray): (N, 2) points.
+
+    Raises:
+        `RuntimeError` (QhullError) if the points are degenerate.
+
+    Returns:
+        (float) area of the rectangle.
+        (numpy.ndarray) (2,) unit direction of one of its sides.
+    """
+    polygon = points[ConvexHull(points).vertices]
+
+    edges = np.roll(polygon, -1, axis=0) - polygon
+    edges /= np.linalg.norm(edges, axis=1)[:, None]
+    normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1)
+
+    areas = np.ptp(np.dot(edges, polygon.T), axis=1) * np.ptp(
+        np.dot(normals, polygon.T), axis=1
+    )
+    best = areas.argmin()
+
+    return areas[best], edges[best]
+
+
+def get_matrix(eigenVectors, center, extents):
+    """
+    Gets the matrix representing the transformation of the bounding box.
+
+    :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+    :param center(numpy.ndarray): (3,) center point.
+    :param extents(numpy.ndarray): (3,) half lengths along each axis.
+
+    Raises:
+        None
+
+    Returns:
+        (list of floats) Matrix
+    """
+    matrices = get_matrices(
+        np.asarray(eigenVectors)[None],
+        np.asarray(center)[None],
+        np.asarray(extents)[None],
+    )
+
+    return matrices[0].tolist()
+
+
+def get_matrices(eigenVectors, centers, extents):
+    """
+    Gets the matrices representing the transformation of many boxes.
+
+    :param eigenVectors(numpy.ndarray): (K, 3, 3) axes as rows.
+    :param centers(numpy.ndarray): (K, 3) center points.
+    :param extents(numpy.ndarray): (K, 3) half lengths along each axis.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K, 16) flattened matrices.
+    """
+    eigenVectors = np.asarray(eigenVectors, dtype=np.float64)
+    scaled = eigenVectors * (np.asarray(extents, dtype=np.float64) * 2.0)[:, :, None]
+
+    m = np.zeros((len(eigenVectors), 4, 4))
+    m[:, 0, :3] = scaled[:, 1]
+    m[:, 1, :3] = scaled[:, 2]
+    m[:, 2, :3] = scaled[:, 0]
+    m[:, 3, :3] = centers
+    m[:, 3, 3] = 1.0
+
+    flip = np.linalg.det(m[:, :3, :3]) < 0
+    m[flip, 2, :3] *= -1
+
+    return m.reshape(-1, 16)
+
+
+def get_bounding_points(eigenVectors, center, extents):
+    """
+    Gets the bounding box points from the build.
+
+    :param eigenVectors(numpy.ndarray): (3, 3) axes as rows.
+    :param center(numpy.ndarray): (3,) center point.
+    :param extents(numpy.ndarray): (3,) half lengths along each axis.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (8, 3) bounding box points.
+    """
+    signs = np.array(
+        [
+            [-1, 1, 1],
+            [-1, 1, -1],
+            [1, 1, 1],
+            [1, 1, -1],
+            [1, -1, 1],
+            [1, -1, -1],
+            [-1, -1, 1],
+            [-1, -1, -1],
+        ],
+        dtype=np.float64,
+    )
+    axes = np.asarray(eigenVectors) * np.asarray(extents)[:, None]
+
+    return np.asarray(center) + np.dot(signs, axes)
+
+
+class BatchResult(object):
+    """
+    :class:`BatchResult` Structure of arrays holding many bounding boxes.
+
+    Box ``i`` is ``axes[i]`` (one axis per row), ``centers[i]`` and
+    ``extents[i]``, in the same order as the batch input. Tracks of one
+    mesh over time have the frame ``times`` instead of ``names``.
+    """
+
+    def __init__(self, axes, centers, extents, names=None, times=None):
+        self.axes = axes
+        self.centers = centers
+        self.extents = extents
+        self.names = names
+        self.times = times
+
+    def __len__(self):
+        return len(self.centers)
+
+    def __getitem__(self, index):
+        return self.axes[index], self.centers[index], self.extents[index]
+
+    @property
+    def matrices(self):
+        """
+        Property (K, 16) matrices of the bounding boxes.
+        """
+        return get_matrices(self.axes, self.centers, self.extents)
+
+    @property
+    def volumes(self):
+        """
+        Property (K,) volumes of the bounding boxes.
+        """
+        return np.prod(self.extents * 2.0, axis=1)
+
+
+def segment_offsets(counts):
+    """
+    Start offsets of consecutive segments plus the total as last entry.
+
+    :param counts(list of ints): length of each segment.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K + 1,) offsets.
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+
+    return offsets
+
+
+def concatenate(pointsList, trianglesList=None):
+    """
+    Concatenates per mesh arrays into one buffer with segment offsets.
+
+    Triangle indices stay local to their own mesh's points.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) points per mesh.
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per mesh.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (N, 3) points.
+        (numpy.ndarray) (K + 1,) point offsets.
+        (numpy.ndarray) (M, 3) triangles or None.
+        (numpy.ndarray) (K + 1,) triangle offsets or None.
+    """
+    pointsList = [as_points(points) for points in pointsList]
+    points = np.concatenate(pointsList)
+    offsets = segment_offsets([len(p) for p in pointsList])
+
+    if trianglesList is None:
+        return points, offsets, None, None
+
+    trianglesList = [as_triangles(triangles) for triangles in trianglesList]
+    triangles = np.concatenate(trianglesList)
+    triangleOffsets = segment_offsets([len(t) for t in trianglesList])
+
+    return points, offsets, triangles, triangleOffsets
+
+
+def batch_points_covariance(points, offsets, chunkSize=POINT_CHUNK_SIZE):
+    """
+    Covariance matrix of every point segment.
+
+    One pass over chunks of the buffer: every chunk is reduced per segment
+    around its own means in float64 and merged into the running moments
+    with :func:`OBB.moments.merge_moments`, like
+    :class:`OBB.moments.MomentAccumulator` does for a single mesh.
+
+    :param points(numpy.ndarray): (N, 3) concatenated points.
+    :param offsets(numpy.ndarray): (K + 1,) segment offsets.
+    :param chunkSize(int): number of points accumulated at once.
+
+    Raises:
+        `RuntimeError` if a segment is empty.
+
+    Returns:
+        (numpy.ndarray) (K, 3, 3) covariance matrices.
+    """
+    counts = _segment_counts(offsets)
+
+    weights = np.zeros(len(counts))
+    means = np.zeros((len(counts), 3))
+    scatters = np.zeros((len(counts), 3, 3))
+
+    for start, end, segments, bounds in _iter_segment_chunks(offsets, chunkSize):
+        chunk = points[start:end].astype(np.float64)
+        chunkCounts = np.diff(bounds)
+
+        mean = np.add.reduceat(chunk, bounds[:-1], axis=0) / chunkCounts[:, None]
+        chunk -= np.repeat(mean, chunkCounts, axis=0)
+
+        weights[segments], means[segments], scatters[segments] = merge_moments(
+            weights[segments],
+            means[segments],
+            scatters[segments],
+            chunkCounts,
+            mean,
+            _segment_moments(chunk, chunk, None, bounds),
+        )
+
+    return scatters / counts[:, None, None]
+
+
+def batch_triangles_covariance(
+    points, offsets, triangles, triangleOffsets, chunkSize=TRIANGLE_CHUNK_SIZE
+):
+    """
+    Area weighted covariance matrix of every triangle segment.
+
+    One pass over chunks of triangles, merged per segment like
+    :func:`batch_points_covariance`, so the (chunk, 3, 3) corner array
+    bounds the memory used.
+
+    :param points(numpy.ndarray): (N, 3) concatenated points.
+    :param offsets(numpy.ndarray): (K + 1,) point segment offsets.
+    :param triangles(numpy.ndarray): (M, 3) triangles local to each segment.
+    :param triangleOffsets(numpy.ndarray): (K + 1,) triangle segment offsets.
+    :param chunkSize(int): number of triangles processed at once.
+
+    Raises:
+        `RuntimeError` if a segment is empty or has no area.
+
+    Returns:
+        (numpy.ndarray) (K, 3, 3) covariance matrices.
+    """
+    _segment_counts(triangleOffsets)
+
+    # Every segment is shifted to its first point to keep the precision far
+    # from the origin, the scatter does not depend on the shift.
+    shifts = points[np.minimum(offsets[:-1], len(points) - 1)].astype(np.float64)
+
+    weights = np.zeros(len(shifts))
+    means = np.zeros((len(shifts), 3))
+    scatters = np.zeros((len(shifts), 3, 3))
+
+    for start, end, segments, bounds in _iter_segment_chunks(
+        triangleOffsets, chunkSize
+    ):
+        chunkCounts = np.diff(bounds)
+        shift = np.repeat(shifts[segments], chunkCounts, axis=0)
+
+        # Move the local triangle indices into the concatenated points.
+        pointOffsets = np.repeat(offsets[:-1][segments], chunkCounts)
+        corners = points[triangles[start:end] + pointOffsets[:, None]].astype(
+            np.float64
+        )
+        corners -= shift[:, None, :]
+
+        p, q, r = corners[:, 0], corners[:, 1], corners[:, 2]
+
+        mui = corners.mean(axis=1)
+        Ai = np.sqrt((np.cross(q - p, r - p) ** 2).sum(axis=1)) * 0.5
+
+        Am = np.add.reduceat(Ai, bounds[:-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mu = np.add.reduceat(mui * Ai[:, None], bounds[:-1], axis=0) / Am[:, None]
+        mu[Am <= 0.0] = 0.0
+
+        # These bits set the c terms to Am*E[xx], Am*E[xy], Am*E[xz]....
+        areaWeights = Ai / 12.0
+        C = 9.0 * _segment_moments(mui, mui, areaWeights, bounds)
+        for corner in range(3):
+            C += _segment_moments(
+                corners[:, corner], corners[:, corner], areaWeights, bounds
+            )
+
+        weights[segments], means[segments], scatters[segments] = merge_moments(
+            weights[segments],
+            means[segments],
+            scatters[segments],
+            Am,
+            mu + shifts[segments],
+            C - Am[:, None, None] * mu[:, :, None] * mu[:, None, :],
+        )
+
+    if (weights <= 0.0).any():
+        raise RuntimeError("Triangles have no area to build a bounding box.")
+
+    return scatters / weights[:, None, None]
+
+
+def batch_build_from_covariance_matrices(cvMatrices, points, offsets):
+    """
+    Build eigen vectors from many covariance matrices in one solve and fit
+    every point segment to its own axes.
+
+    :param cvMatrices(numpy.ndarray): (K, 3, 3) covariance matrices.
+    :param points(numpy.ndarray): (N, 3) concatenated points.
+    :param offsets(numpy.ndarray): (K + 1,) segment offsets.
+
+    Raises:
+        None
+
+    Returns:
+        (BatchResult)
+    """
+    eigenValues, eigenVectors = batch_eigh3(cvMatrices)
+
+    return batch_fit_axes(np.swapaxes(eigenVectors, 1, 2), points, offsets)
+
+
+def batch_fit_axes(eigenVectors, points, offsets):
+    """
+    Fits every point segment tightly into a box with its own axes.
+
+    :param eigenVectors(numpy.ndarray): (K, 3, 3) axes as rows.
+    :param points(numpy.ndarray): (N, 3) concatenated points.
+    :param offsets(numpy.ndarray): (K + 1,) segment offsets.
+
+    Raises:
+        `RuntimeError` if a segment is empty.
+
+    Returns:
+        (BatchResult)
+    """
+    eigenVectors = np.asarray(eigenVectors, dtype=np.float64)
+    counts = _segment_counts(offsets)
+    starts = offsets[:-1]
+
+    minim = np.empty((len(counts), 3))
+    maxim = np.empty((len(counts), 3))
+
+    # One axis at a time keeps the temporaries at (N, 3).
+    for axis in range(3):
+        p_prime = (np.repeat(eigenVectors[:, axis], counts, axis=0) * points).sum(
+            axis=1
+        )
+        minim[:, axis] = np.minimum.reduceat(p_prime, starts)
+        maxim[:, axis] = np.maximum.reduceat(p_prime, starts)
+
+    centerPoints = (maxim + minim) * 0.5
+    extents = (maxim - minim) * 0.5
+
+    centers = np.einsum("kji,kj->ki", eigenVectors, centerPoints)
+
+    return BatchResult(eigenVectors, centers, extents)
+
+
+def batch_build(pointsList, method=0, trianglesList=None):
+    """
+    Fits a bounding box to every mesh with one batched eigen solve.
+
+    The meshes are concatenated into one buffer, see
+    :func:`batch_build_segments`.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) points per mesh.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per mesh,
+        required by the triangles method.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        (BatchResult)
+    """
+    if method == 1 and trianglesList is None:
+        raise RuntimeError("The triangles method needs triangles.")
+
+    if method != 1:
+        trianglesList = None
+
+    points, offsets, triangles, triangleOffsets = concatenate(
+        pointsList, trianglesList
+    )
+
+    return batch_build_segments(
+        points,
+        offsets,
+        method=method,
+        triangles=triangles,
+        triangleOffsets=triangleOffsets,
+    )
+
+
+def batch_build_segments(
+    points, offsets, method=0, triangles=None, triangleOffsets=None
+):
+    """
+    Fits a bounding box to every segment of a concatenated point buffer.
+
+    The moments and extents are computed with segmented reductions and all
+    covariance matrices are solved with one batched eigen solve.
+    Minimum volume searches spend at most :data:`MIN_VOLUME_TIME` seconds
+    per segment.
+
+    :param points(numpy.ndarray): (N, 3) concatenated points.
+    :param offsets(numpy.ndarray): (K + 1,) point segment offsets.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param triangles(numpy.ndarray): (M, 3) triangles local to each segment,
+        required by the triangles method.
+    :param triangleOffsets(numpy.ndarray): (K + 1,) triangle segment offsets.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        (BatchResult)
+    """
+    if method == 0:
+        cvMatrices = batch_points_covariance(points, offsets)
+
+    elif method == 1:
+        if triangles is None:
+            raise RuntimeError("The triangles method needs triangles.")
+
+        cvMatrices = batch_triangles_covariance(
+            points, offsets, triangles, triangleOffsets
+        )
+
+    elif method == 2:
+        # Fit on the hull vertices only, nothing else can be extremal.
+        hulls = [
+            convex_hull(points[start:end])
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+        points, offsets, triangles, triangleOffsets = concatenate(
+            [hullPoints for hullPoints, hullTriangles in hulls],
+            [hullTriangles for hullPoints, hullTriangles in hulls],
+        )
+        cvMatrices = batch_triangles_covariance(
+            points, offsets, triangles, triangleOffsets
+        )
+
+    elif method == 3:
+        # No covariance to batch, the axes are searched per mesh.
+        axes = np.array(
+            [
+                build_from_dito(points[start:end])[0]
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+        )
+        return batch_fit_axes(axes, points, offsets)
+
+    elif method == 4:
+        axes = np.array(
+            [
+                build_from_min_volume(points[start:end], **BATCH_OPTIONS[4])[0]
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+        )
+        return batch_fit_axes(axes, points, offsets)
+
+    else:
+        raise RuntimeError(
+            "Method unsupported! Please use 0(from_points),"
+            " 1(from_triangles), 2(from_hull), 3(from_dito)"
+            " or 4(from_min_volume)."
+        )
+
+    return batch_build_from_covariance_matrices(cvMatrices, points, offsets)
+
+
+def batch_build_frames(frames, method=0, triangles=None):
+    """
+    Fits a bounding box to every frame of an animated mesh.
+
+    The frames share one topology, so they are fit as equal segments of
+    one buffer with batched moments and eigen solves, see
+    :func:`batch_build_segments`.
+
+    :param frames(numpy.ndarray): (F, N, 3) points per frame.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param triangles(numpy.ndarray): (M, 3) triangles of every frame,
+        required by the triangles method.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        (BatchResult) one box per frame.
+    """
+    frames = np.asarray(frames)
+    frameCount, count = frames.shape[:2]
+
+    triangleOffsets = None
+    if triangles is not None:
+        triangles = as_triangles(triangles)
+        triangleOffsets = np.arange(frameCount + 1) * len(triangles)
+        triangles = np.tile(triangles, (frameCount, 1))
+
+    return batch_build_segments(
+        frames.reshape(-1, 3),
+        np.arange(frameCount + 1) * count,
+        method=method,
+        triangles=triangles,
+        triangleOffsets=triangleOffsets,
+    )
+
+
+def concatenate_results(results):
+    """
+    Concatenates batch results in order.
+
+    :param results(list of BatchResult): results to join.
+
+    Raises:
+        None
+
+    Returns:
+        (BatchResult)
+    """
+    if not results:
+        return BatchResult(np.empty((0, 3, 3)), np.empty((0, 3)), np.empty((0, 3)))
+
+    return BatchResult(
+        np.concatenate([result.axes for result in results]),
+        np.concatenate([result.centers for result in results]),
+        np.concatenate([result.extents for result in results]),
+    )
+
+
+def align_axes(axes, reference):
+    """
+    Reorders and flips axes to follow reference axes.
+
+    Picks the order matching every reference axis to its most parallel axis,
+    then flips the axes pointing away from their reference, so boxes of
+    successive frames don't swap or mirror their axes.
+
+    :param axes(numpy.ndarray): (3, 3) orthonormal axes as rows.
+    :param reference(numpy.ndarray): (3, 3) orthonormal axes as rows.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (3, 3) aligned axes as rows.
+    """
+    order, signs = _axes_alignment(axes, reference)
+
+    return np.asarray(axes, dtype=np.float64)[order] * signs[:, None]
+
+
+def align_box(eigenVectors, center, extents, reference):
+    """
+    Reorders and flips a box's axes to follow reference axes, the extents
+    follow their axes. See :func:`align_axes`.
+
+    :param eigenVectors(numpy.ndarray): (3, 3) orthonormal axes as rows.
+    :param center(numpy.ndarray): (3,) center point.
+    :param extents(numpy.ndarray): (3,) half lengths along each axis.
+    :param reference(numpy.ndarray): (3, 3) orthonormal axes as rows.
+
+    Raises:
+        None
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    order, signs = _axes_alignment(eigenVectors, reference)
+
+    return (
+        np.asarray(eigenVectors, dtype=np.float64)[order] * signs[:, None],
+        center,
+        np.asarray(extents)[order],
+    )
+
+
+def _axes_alignment(axes, reference):
+    """
+    Order and signs aligning axes to reference axes.
+
+    :param axes(numpy.ndarray): (3, 3) orthonormal axes as rows.
+    :param reference(numpy.ndarray): (3, 3) orthonormal axes as rows.
+
+    Raises:
+        None
+
+    Returns:
+        (list of int) axis matched to each reference axis.
+        (numpy.ndarray) (3,) signs flipping the reordered axes.
+    """
+    axes = np.asarray(axes, dtype=np.float64)
+    dots = np.dot(reference, axes.T)
+
+    order = list(
+        max(
+            itertools.permutations(range(3)),
+            key=lambda order: (
+                abs(dots[0, order[0]]) + abs(dots[1, order[1]]) + abs(dots[2, order[2]])
+            ),
+        )
+    )
+    signs = np.where(dots[[0, 1, 2], order] < 0.0, -1.0, 1.0)
+
+    return order, signs
+
+
+class TemporalFitter(object):
+    """
+    :class:`TemporalFitter` Temporally coherent boxes of one animated mesh.
+
+    Frames are fit in order. Each frame's eigen solve starts from the
+    previous frame's axes, so the jacobi solver converges in a sweep or two,
+    and the new axes are aligned to the previous ones (:func:`align_axes`).
+    While the covariance stays within ``tolerance`` (relative) of the last
+    solved one the solve is skipped and the axes are kept, only the extents
+    are refit.
+
+    ``solves`` and ``skips`` count the frames that did and didn't solve.
+    """
+
+    def __init__(self, method=0, triangles=None, tolerance=TEMPORAL_TOLERANCE):
+        if method not in (0, 1, 2):
+            raise RuntimeError(
+                "Temporal fitting needs a covariance method, 0(from_points),"
+                " 1(from_triangles) or 2(from_hull)."
+            )
+
+        if method == 1 and triangles is None:
+            raise RuntimeError("From triangles method needs triangles.")
+
+        self.method = method
+        self.triangles = as_triangles(triangles) if triangles is not None else None
+        self.tolerance = tolerance
+
+        self.axes = None
+        self.cvMatrix = None
+        self.solves = 0
+        self.skips = 0
+
+    def seed(self, axes):
+        """
+        Starts the next solve from axes fit another way, such as a rigid
+        frame's, and aligns it to them.
+
+        :param axes(numpy.ndarray): (3, 3) orthonormal axes as rows.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self.axes = np.asarray(axes, dtype=np.float64)
+        self.cvMatrix = None
+
+    def reset(self):
+        """
+        Forgets the previous frame, the next one is solved from scratch.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self.axes = None
+        self.cvMatrix = None
+
+    def fit(self, points):
+        """
+        Fits the next frame.
+
+        :param points(numpy.ndarray): (N, 3) points of the frame.
+
+        Raises:
+            `RuntimeError` if the frame can't be fit.
+
+        Returns:
+            EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+            CenterPoint(numpy.ndarray) (3,)
+            BoundingExtents(numpy.ndarray) (3,)
+        """
+        points = as_points(points)
+
+        if self.method == 0:
+            cvMatrix = points_covariance(points)
+        elif self.method == 1:
+            cvMatrix = triangles_covariance(points, self.triangles)
+        else:
+            points, hullTriangles = convex_hull(points)
+            cvMatrix = triangles_covariance(points, hullTriangles)
+
+        scale = np.abs(cvMatrix).max()
+
+        if self.axes is None:
+            # Same axes as the non temporal methods on the first frame.
+            eigenValues, eigenVectors = eigh3(cvMatrix)
+            self.axes = eigenVectors.T
+            self.cvMatrix = cvMatrix
+            self.solves += 1
+
+        elif (
+            self.cvMatrix is None
+            or np.abs(cvMatrix - self.cvMatrix).max() > self.tolerance * scale
+        ):
+            eigenValues, eigenVectors = eigh(
+                cvMatrix.tolist(),
+                tol=max(scale * 1.0e-12, 1.0e-300),
+                vectors=self.axes.T,
+            )
+            self.axes = align_axes(np.array(eigenVectors).T, self.axes)
+            self.cvMatrix = cvMatrix
+            self.solves += 1
+
+        else:
+            self.skips += 1
+
+        return fit_axes(self.axes, points)
+
+    def fit_frames(self, frames):
+        """
+        Fits frames in order.
+
+        :param frames(numpy.ndarray): (F, N, 3) points per frame.
+
+        Raises:
+            `RuntimeError` if a frame can't be fit.
+
+        Returns:
+            (BatchResult) one box per frame.
+        """
+        boxes = [self.fit(points) for points in frames]
+        if not boxes:
+            return concatenate_results([])
+
+        axes, centers, extents = zip(*boxes)
+
+        return BatchResult(np.array(axes), np.array(centers), np.array(extents))
+
+
+def transform_boxes(axes, centers, extents, matrices):
+    """
+    Carries boxes through matrices.
+
+    A box under a similarity transform (rotation, translation, uniform
+    scale, mirroring) is still a box, under other transforms it becomes a
+    parallelepiped and has to be refit, see :class:`RigidFitter`.
+
+    :param axes(numpy.ndarray): (K, 3, 3) axes as rows, or (1, 3, 3) for
+        all.
+    :param centers(numpy.ndarray): (K, 3) or (1, 3) center points.
+    :param extents(numpy.ndarray): (K, 3) or (1, 3) half lengths.
+    :param matrices(numpy.ndarray): (K, 4, 4) Maya style (row vector)
+        matrices.
+
+    Raises:
+        None
+
+    Returns:
+        (BatchResult) transformed boxes, the input boxes' axes and extents
+        where the matrix isn't a similarity.
+        (numpy.ndarray) (K,) bool, True where the matrix is a similarity.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    linear = matrices[:, :3, :3]
+
+    gram = np.matmul(linear, np.swapaxes(linear, 1, 2))
+    scales = np.trace(gram, axis1=1, axis2=2) / 3.0
+    similar = (scales > 0.0) & (
+        np.abs(gram - scales[:, None, None] * np.eye(3)).max(axis=(1, 2))
+        <= SIMILARITY_TOLERANCE * scales
+    )
+
+    # The transformed axes stay orthogonal, only their length changes.
+    axes = np.asarray(axes, dtype=np.float64)
+    transformed = np.matmul(axes, linear)
+    lengths = np.linalg.norm(transformed, axis=2)
+    lengths[~similar] = 1.0
+    axes = np.where(
+        similar[:, None, None], transformed / lengths[..., None], axes
+    )
+
+    centers = np.matmul(np.asarray(centers, dtype=np.float64)[:, None], linear)
+    centers = centers[:, 0] + matrices[:, 3, :3]
+
+    return BatchResult(axes, centers, extents * lengths), similar
+
+
+class RigidFitter(object):
+    """
+    :class:`RigidFitter` Boxes of one rigid shape under many transforms.
+
+    The shape is fit once in object space. Similarity transforms (rotation,
+    translation, uniform scale, mirroring) carry that box over with a 4x4
+    multiply, the axes of the covariance methods follow the shape exactly.
+    Frames with a non uniform scale or shear get new axes (a 3x3 solve for
+    from_points, the method itself otherwise) and their extents are refit
+    on the transformed convex hull of the shape, which holds every extreme
+    point.
+
+    DiTO boxes keep the object space slab directions, so they can differ
+    from fitting the transformed points from scratch.
+
+    ``box`` is the shape's (axes, center, extents) when already fit.
+    """
+
+    def __init__(self, points, method=0, triangles=None, box=None):
+        self.points = as_points(points)
+        self.method = method
+        self.triangles = as_triangles(triangles) if triangles is not None else None
+
+        if box is None:
+            box = batch_build_frames(
+                self.points[None], method=method, triangles=self.triangles
+            )[0]
+
+        self.axes, self.center, self.extents = box
+
+    @lazy_property
+    def hull(self):
+        """
+        Property convex hull vertices and triangles of the shape, all points
+        and no triangles without scipy.
+        """
+        if not hullMethod:
+            return self.points, None
+
+        return convex_hull(self.points)
+
+    @lazy_property
+    def cvMatrix(self):
+        """
+        Property 3x3 covariance matrix of the shape's points.
+        """
+        return points_covariance(self.points)
+
+    def fit_matrices(self, matrices):
+        """
+        Boxes of the shape transformed by each matrix.
+
+        :param matrices(numpy.ndarray): (F, 4, 4) Maya style (row vector)
+            matrices.
+
+        Raises:
+            None
+
+        Returns:
+            (BatchResult) one box per matrix.
+        """
+        matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+
+        result, similar = transform_boxes(
+            self.axes[None], self.center[None], self.extents[None], matrices
+        )
+
+        refit = np.flatnonzero(~similar)
+        if len(refit):
+            boxes = self._refit(matrices[refit, :3, :3], matrices[refit, 3, :3])
+            result.axes[refit] = boxes.axes
+            result.centers[refit] = boxes.centers
+            result.extents[refit] = boxes.extents
+
+        return result
+
+    def _refit(self, linear, translations):
+        """
+        Boxes of the shape under general affine transforms.
+
+        :param linear(numpy.ndarray): (F, 3, 3) linear parts.
+        :param translations(numpy.ndarray): (F, 3) translations.
+
+        Raises:
+            None
+
+        Returns:
+            (BatchResult) one box per transform.
+        """
+        if self.method == 1:
+            # Triangle areas change with the shear, the mesh is refit.
+            return concatenate_results(
+                [
+                    batch_build_frames(
+                        (np.dot(self.points, matrix) + translation)[None],
+                        method=1,
+                        triangles=self.triangles,
+                    )
+                    for matrix, translation in zip(linear, translations)
+                ]
+            )
+
+        hullPoints, hullTriangles = self.hull
+        frames = np.matmul(hullPoints, linear) + translations[:, None]
+
+        if self.method == 0:
+            cvMatrices = np.matmul(
+                np.swapaxes(linear, 1, 2), np.matmul(self.cvMatrix, linear)
+            )
+
+            return batch_build_from_covariance_matrices(
+                cvMatrices,
+                frames.reshape(-1, 3),
+                np.arange(len(frames) + 1) * len(hullPoints),
+            )
+
+        if self.method == 2:
+            # The hull of the transformed shape is the transformed hull.
+            return batch_build_frames(frames, method=1, triangles=hullTriangles)
+
+        return batch_build_frames(frames, method=self.method)
+
+
+class IncrementalFitter(object):
+    """
+    :class:`IncrementalFitter` Box of a point cloud kept up to date under
+    edits of a few points at a time.
+
+    The first and second moment sums are kept around a fixed origin, an
+    edit subtracts the old positions of the moved points and adds the new
+    ones. The 3x3 eigen problem is only solved again when the covariance
+    moved more than ``tolerance`` (relative) since the last solve, warm
+    started and aligned like :class:`TemporalFitter`. While the axes stay
+    the extents are updated from the moved points alone, and the points
+    are only rescanned when a moved point was one of the six support
+    points. The box is always exact for its axes, only the axes can lag.
+
+    The sums are rebuilt from the points once as many points were edited
+    as there are points, so rounding errors of the subtractions don't
+    build up.
+    """
+
+    def __init__(self, points, tolerance=INCREMENTAL_TOLERANCE):
+        self.points = np.array(as_points(points), dtype=np.float64)
+        self.tolerance = tolerance
+
+        self.axes = None
+        self.solves = 0
+        self.scans = 0
+
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def covariance(self):
+        """
+        Property 3x3 covariance matrix of the points.
+        """
+        mean = self._sum / len(self.points)
+
+        return self._scatter / len(self.points) - np.outer(mean, mean)
+
+    @property
+    def box(self):
+        """
+        Property (axes, center, extents) of the current box.
+        """
+        centerPoint = (self._maxim + self._minim) * 0.5
+        extents = (self._maxim - self._minim) * 0.5
+
+        return self.axes, np.dot(self.axes.T, centerPoint), extents
+
+    def rebuild(self):
+        """
+        Recomputes the moment sums, axes and extents from all points.
+
+        Raises:
+            `RuntimeError` if there are no points.
+
+        Returns:
+            None
+        """
+        if not len(self.points):
+            raise RuntimeError("No points to build a bounding box from.")
+
+        self._origin = self.points.mean(axis=0)
+        centered = self.points - self._origin
+
+        self._sum = centered.sum(axis=0)
+        self._scatter = np.dot(centered.T, centered)
+        self._edits = 0
+
+        self._solve()
+        self._scan()
+
+    def update(self, indices, positions):
+        """
+        Moves points and updates the box.
+
+        :param indices(numpy.ndarray): (K,) unique indices of moved points.
+        :param positions(numpy.ndarray): (K, 3) new positions.
+
+        Raises:
+            None
+
+        Returns:
+            EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+            CenterPoint(numpy.ndarray) (3,)
+            BoundingExtents(numpy.ndarray) (3,)
+        """
+        indices = np.asarray(indices, dtype=np.intp).ravel()
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+        if not len(indices):
+            return self.box
+
+        old = self.points[indices] - self._origin
+        new = positions - self._origin
+
+        self._sum += new.sum(axis=0) - old.sum(axis=0)
+        self._scatter += np.dot(new.T, new) - np.dot(old.T, old)
+        self.points[indices] = positions
+
+        self._edits += len(indices)
+        if self._edits >= len(self.points):
+            self.rebuild()
+            return self.box
+
+        cvMatrix = self.covariance
+        if np.abs(cvMatrix - self._cvMatrix).max() > self.tolerance * np.abs(
+            cvMatrix
+        ).max():
+            self._solve()
+            self._scan()
+
+        elif np.isin(self._support, indices).any():
+            self._scan()
+
+        else:
+            # Points that weren't extreme can only push the extents out.
+            p_prime = np.dot(positions, self.axes.T)
+            low = p_prime.argmin(axis=0)
+            high = p_prime.argmax(axis=0)
+
+            for axis in range(3):
+                if p_prime[low[axis], axis] < self._minim[axis]:
+                    self._minim[axis] = p_prime[low[axis], axis]
+                    self._support[axis] = indices[low[axis]]
+
+                if p_prime[high[axis], axis] > self._maxim[axis]:
+                    self._maxim[axis] = p_prime[high[axis], axis]
+                    self._support[axis + 3] = indices[high[axis]]
+
+        return self.box
+
+    def _solve(self):
+        """
+        Solves the axes of the current covariance.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        cvMatrix = self.covariance
+
+        if self.axes is None:
+            eigenValues, eigenVectors = eigh3(cvMatrix)
+            self.axes = eigenVectors.T
+        else:
+            eigenValues, eigenVectors = eigh(
+                cvMatrix.tolist(),
+                tol=max(np.abs(cvMatrix).max() * 1.0e-12, 1.0e-300),
+                vectors=self.axes.T,
+            )
+            self.axes = align_axes(np.array(eigenVectors).T, self.axes)
+
+        self._cvMatrix = cvMatrix
+        self.solves += 1
+
+    def _scan(self):
+        """
+        Measures the extents and support points along the axes.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        p_prime = np.dot(self.points, self.axes.T)
+
+        low = p_prime.argmin(axis=0)
+        high = p_prime.argmax(axis=0)
+
+        self._minim = p_prime[low, np.arange(3)]
+        self._maxim = p_prime[high, np.arange(3)]
+        self._support = np.concatenate([low, high])
+        self.scans += 1
+
+
+def batch_build_instances(
+    pointsList, shapeIndices, matrices, method=0, trianglesList=None, shapes=None
+):
+    """
+    Fits instances of shared shapes, each shape only once.
+
+    Every shape is fit in object space and its box is carried to each of
+    its instances by the instance's world matrix, see
+    :func:`transform_boxes`. Instances under a non uniform scale or shear
+    are refit from their shape's hull, see :class:`RigidFitter`.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) object space points
+        per shape.
+    :param shapeIndices(numpy.ndarray): (K,) shape of every instance.
+    :param matrices(numpy.ndarray): (K, 4, 4) world matrix of every
+        instance, Maya style (row vector).
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per
+        shape, required by the triangles method.
+    :param shapes(BatchResult): object space boxes of the shapes when
+        already fit, by a cache or a worker pool.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        (BatchResult) one box per instance.
+    """
+    shapeIndices = np.asarray(shapeIndices, dtype=np.intp)
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+
+    if shapes is None:
+        shapes = batch_build(pointsList, method=method, trianglesList=trianglesList)
+
+    result, similar = transform_boxes(
+        shapes.axes[shapeIndices],
+        shapes.centers[shapeIndices],
+        shapes.extents[shapeIndices],
+        matrices,
+    )
+
+    for shape in np.unique(shapeIndices[~similar]):
+        indices = np.flatnonzero(~similar & (shapeIndices == shape))
+
+        fitter = RigidFitter(
+            pointsList[shape],
+            method=method,
+            triangles=trianglesList[shape] if trianglesList else None,
+            box=shapes[shape],
+        )
+        boxes = fitter.fit_matrices(matrices[indices])
+
+        result.axes[indices] = boxes.axes
+        result.centers[indices] = boxes.centers
+        result.extents[indices] = boxes.extents
+
+    return result
+
+
+def _segment_counts(offsets):
+    """
+    Lengths of the segments, which all have to be non empty.
+
+    :param offsets(numpy.ndarray): (K + 1,) segment offsets.
+
+    Raises:
+        `RuntimeError` if a segment is empty.
+
+    Returns:
+        (numpy.ndarray) (K,) counts.
+    """
+    counts = np.diff(offsets)
+
+    if (counts <= 0).any():
+        raise RuntimeError("Can not build a bounding box from an empty mesh.")
+
+    return counts
+
+
+def _iter_segment_chunks(offsets, chunkSize):
+    """
+    Splits a segmented buffer into chunks, with the segments of each.
+
+    :param offsets(numpy.ndarray): (K + 1,) non empty segment offsets.
+    :param chunkSize(int): number of elements per chunk.
+
+    Raises:
+        None
+
+    Returns:
+        (generator) of (start, end, segments, bounds) tuples, ``segments``
+        the slice of the segments overlapping ``start:end`` and ``bounds``
+        their offsets clipped to the chunk, relative to ``start``.
+    """
+    total = int(offsets[-1])
+    chunkSize = max(int(chunkSize or total), 1)
+
+    for start in range(0, total, chunkSize):
+        end = min(start + chunkSize, total)
+
+        first = int(np.searchsorted(offsets, start, side="right")) - 1
+        last = int(np.searchsorted(offsets, end, side="left"))
+
+        bounds = np.clip(offsets[first:last + 1], start, end) - start
+
+        yield start, end, slice(first, last), bounds
+
+
+def _segment_moments(a, b, weights, offsets):
+    """
+    Per segment sums of the (optionally weighted) outer products a b^T.
+
+    :param a(numpy.ndarray): (N, 3) vectors.
+    :param b(numpy.ndarray): (N, 3) vectors.
+    :param weights(numpy.ndarray): (N,) weights or None.
+    :param offsets(numpy.ndarray): (K + 1,) segment offsets.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K, 3, 3) summed outer products.
+    """
+    if weights is not None:
+        a = a * weights[:, None]
+
+    C = np.empty((len(offsets) - 1, 3, 3))
+
+    for i in range(3):
+        for j in range(i, 3):
+            C[:, i, j] = C[:, j, i] = np.add.reduceat(
+                a[:, i] * b[:, j], offsets[:-1]
+            )
+
+    return C
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Mesh data extraction from Maya into numpy arrays.
+
+Vertex positions are read straight out of the mesh's raw float buffer
+(``MFnMesh.getRawPoints``) into a contiguous ``(N, 3)`` array, no
+``MPoint``/``MVector`` is created per vertex. World space positions are
+the object space buffer multiplied by the dag path's inclusive matrix.
+Index and point arrays are copied out of their ``MIntArray`` and
+``MFloatPointArray`` into ``MScriptUtil`` buffers in C++, never one Python
+object per element.
+
+Animated points are evaluated through an ``MDGContext`` per frame, so the
+current time (and the UI) never changes.
+"""
+import ctypes
+
+import numpy as np
+
+try:
+    from maya import OpenMaya
+    from maya import cmds
+except ImportError:
+    pass
+
+
+def get_shape_key(dagPath):
+    """
+    Gets a key of the shape a dag path ends in, the same for all of its
+    instances.
+
+    The node's UUID, unlike an object handle's hash code it is unique to
+    the node.
+
+    :param dagPath (OpenMaya.MDagPath): dag path.
+
+    Raises:
+        None
+
+    Returns:
+        (str) shape key.
+    """
+    return OpenMaya.MFnDependencyNode(dagPath.node()).uuid().asString()
+
+
+def get_matrix(dagPath):
+    """
+    Gets the inclusive (world) matrix of a dag path.
+
+    :param dagPath (OpenMaya.MDagPath): dag path.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) 4x4 matrix, row vector convention like Maya.
+    """
+    return _matrix_array(dagPath.inclusiveMatrix())
+
+
+def transform_points(points, matrix):
+    """
+    Transforms points by a Maya style (row vector) 4x4 matrix.
+
+    :param points(numpy.ndarray): (N, 3) points.
+    :param matrix(numpy.ndarray): 4x4 matrix.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (N, 3) float64 points.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+
+    return np.dot(points, matrix[:3, :3]) + matrix[3, :3]
+
+
+def get_points(fnMesh, worldSpace=True):
+    """
+    Get the points of each vertex as a numpy array.
+
+    :param fnMesh (OpenMaya.MFnMesh): mesh function set.
+    :param worldSpace (bool): world or object space points.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (N, 3) points, float32 in object space and
+        float64 in world space.
+    """
+    points = _raw_points(fnMesh)
+
+    if worldSpace:
+        points = transform_points(points, get_matrix(fnMesh.dagPath()))
+
+    return points
+
+
+def iter_frame_meshes(fnMesh, times, worldSpace=True):
+    """
+    Object space points and world matrix of the mesh at many times.
+
+    The mesh and its world matrix are evaluated in a DG context per time,
+    the current time is left alone.
+
+    :param fnMesh (OpenMaya.MFnMesh): mesh function set.
+    :param times (list of floats): times in the current ui unit.
+    :param worldSpace (bool): evaluate the world matrix too.
+
+    Raises:
+        `RuntimeError` if the vertex count changes between frames.
+
+    Returns:
+        (generator) of (N, 3) float32 object space points and the 4x4
+        world matrix, None in object space, per time.
+    """
+    dagPath = fnMesh.dagPath()
+    fnNode = OpenMaya.MFnDependencyNode(dagPath.node())
+
+    plugs = [fnNode.findPlug("outMesh")]
+    if worldSpace:
+        plugs.append(
+            fnNode.findPlug("worldMatrix").elementByLogicalIndex(
+                dagPath.instanceNumber()
+            )
+        )
+
+    count = fnMesh.numVertices()
+
+    for time in times:
+        context = OpenMaya.MDGContext(OpenMaya.MTime(time, OpenMaya.MTime.uiUnit()))
+        values = _evaluate(plugs, context)
+
+        points = _raw_points(OpenMaya.MFnMesh(values[0]))
+        if len(points) != count:
+            raise RuntimeError(
+                "%s changes its vertex count at time %s."
+                % (dagPath.partialPathName(), time)
+            )
+
+        matrix = None
+        if worldSpace:
+            matrix = _matrix_array(OpenMaya.MFnMatrixData(values[1]).matrix())
+
+        yield points, matrix
+
+
+def get_selected_points(worldSpace=True):
+    """
+    Get the points of the selected vertices as a numpy array.
+
+    Selected edges and faces count as their vertices.
+
+    :param worldSpace (bool): world or object space points.
+
+    Raises:
+        `RuntimeError` if other components are selected.
+
+    Returns:
+        (numpy.ndarray) (N, 3) points, empty if no vertices are selected.
+    """
+    mSel = OpenMaya.MSelectionList()
+    OpenMaya.MGlobal.getActiveSelectionList(mSel)
+
+    mDagPath = OpenMaya.MDagPath()
+    mComponents = OpenMaya.MObject()
+    mSel.getDagPath(0, mDagPath, mComponents)
+
+    if mComponents.isNull():
+        return np.empty((0, 3))
+
+    indices = _component_vertices(mDagPath, mComponents)
+
+    return get_points(OpenMaya.MFnMesh(mDagPath), worldSpace=worldSpace)[indices]
+
+
+def get_triangles(fnMesh):
+    """
+    Get the triangle vertex indices as a numpy array.
+
+    :param fnMesh (OpenMaya.MFnMesh): mesh function set.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (M, 3) indices of triangles.
+    """
+    triangleCounts = OpenMaya.MIntArray()
+    triangleVertices = OpenMaya.MIntArray()
+    fnMesh.getTriangles(triangleCounts, triangleVertices)
+
+    return _int_array(triangleVertices).reshape(-1, 3)
+
+
+def _component_vertices(dagPath, mComponents):
+    """
+    Vertex indices of vertex, edge or face components.
+
+    :param dagPath (OpenMaya.MDagPath): dag path of the mesh.
+    :param mComponents (OpenMaya.MObject): selected components.
+
+    Raises:
+        `RuntimeError` if the components aren't vertices, edges or faces.
+
+    Returns:
+        (numpy.ndarray) (K,) unique vertex indices.
+    """
+    componentType = mComponents.apiType()
+
+    if componentType not in (
+        OpenMaya.MFn.kMeshVertComponent,
+        OpenMaya.MFn.kMeshEdgeComponent,
+        OpenMaya.MFn.kMeshPolygonComponent,
+    ):
+        raise RuntimeError(
+            "Select vertices, edges or faces, not %s." % mComponents.apiTypeStr()
+        )
+
+    if componentType == OpenMaya.MFn.kMeshEdgeComponent:
+        return _edge_vertices(dagPath, mComponents)
+
+    elements = OpenMaya.MIntArray()
+    OpenMaya.MFnSingleIndexedComponent(mComponents).getElements(elements)
+    indices = _int_array(elements)
+
+    if componentType == OpenMaya.MFn.kMeshVertComponent:
+        return indices
+
+    mCounts = OpenMaya.MIntArray()
+    mVertices = OpenMaya.MIntArray()
+    OpenMaya.MFnMesh(dagPath).getVertices(mCounts, mVertices)
+    counts = _int_array(mCounts)
+    vertices = _int_array(mVertices)
+
+    selected = np.zeros(len(counts), dtype=bool)
+    selected[indices] = True
+
+    return np.unique(vertices[np.repeat(selected, counts)])
+
+
+def _edge_vertices(dagPath, mComponents):
+    """
+    Vertex indices of edge components.
+
+    The API only answers one edge at a time, the selection is converted to
+    vertices by ``polyListComponentConversion`` in one call instead. Both
+    sides are compact index range strings, e.g. ``pCube1.vtx[0:7]``.
+
+    :param dagPath (OpenMaya.MDagPath): dag path of the mesh.
+    :param mComponents (OpenMaya.MObject): edge components.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (K,) unique vertex indices.
+    """
+    mSel = OpenMaya.MSelectionList()
+    mSel.add(dagPath, mComponents)
+
+    mEdges = OpenMaya.MStringArray()
+    mSel.getSelectionStrings(mEdges)
+    edges = [mEdges[i] for i in range(mEdges.length())]
+
+    mSel = OpenMaya.MSelectionList()
+    for vertices in cmds.polyListComponentConversion(
+        edges, fromEdge=True, toVertex=True
+    ):
+        mSel.add(vertices)
+
+    indices = []
+    for i in range(mSel.length()):
+        mVertices = OpenMaya.MObject()
+        mSel.getDagPath(i, OpenMaya.MDagPath(), mVertices)
+
+        elements = OpenMaya.MIntArray()
+        OpenMaya.MFnSingleIndexedComponent(mVertices).getElements(elements)
+        indices.append(_int_array(elements))
+
+    return np.unique(np.concatenate(indices))
+
+
+def _raw_points(fnMesh):
+    """
+    Copies the mesh's raw object space float buffer.
+
+    Falls back to copying ``MFnMesh.getPoints`` when the raw pointer can
+    not be resolved.
+
+    :param fnMesh (OpenMaya.MFnMesh): mesh function set.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (N, 3) float32 object space points.
+    """
+    count = fnMesh.numVertices()
+
+    if not count:
+        return np.empty((0, 3), dtype=np.float32)
+
+    try:
+        address = int(fnMesh.getRawPoints())
+    except (AttributeError, TypeError, RuntimeError):
+        mPoints = OpenMaya.MFloatPointArray()
+        fnMesh.getPoints(mPoints)
+
+        # (x, y, z, w) per point.
+        points = _copy_array(mPoints, mPoints.length() * 4, ctypes.c_float, "Float4")
+
+        return points.reshape(-1, 4)[:, :3].copy()
+
+    buffer = (ctypes.c_float * (count * 3)).from_address(address)
+
+    # Maya owns the buffer, copy it before the mesh can reallocate it.
+    return np.frombuffer(buffer, dtype=np.float32).reshape(count, 3).copy()
+
+
+def _evaluate(plugs, context):
+    """
+    Values of plugs evaluated in a DG context.
+
+    :param plugs (list of OpenMaya.MPlug): plugs to evaluate.
+    :param context (OpenMaya.MDGContext): context, typically a time.
+
+    Raises:
+        None
+
+    Returns:
+        (list of OpenMaya.MObject) plug values.
+    """
+    # Maya 2018+ evaluates in the current context, passing it is deprecated.
+    if hasattr(context, "makeCurrent"):
+        previous = context.makeCurrent()
+        try:
+            return [plug.asMObject() for plug in plugs]
+        finally:
+            previous.makeCurrent()
+
+    return [plug.asMObject(context) for plug in plugs]
+
+
+def _matrix_array(mMatrix):
+    """
+    Converts an API 1.0 MMatrix to a numpy array.
+
+    :param mMatrix (OpenMaya.MMatrix): matrix.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) 4x4 matrix.
+    """
+    return np.array([[mMatrix(i, j) for j in range(4)] for i in range(4)])
+
+
+def _int_array(mIntArray):
+    """
+    Converts an API 1.0 MIntArray to a numpy array.
+
+    :param mIntArray (OpenMaya.MIntArray): int array.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) indices.
+    """
+    return _copy_array(mIntArray, mIntArray.length(), ctypes.c_int, "Int").astype(
+        np.intp
+    )
+
+
+def _copy_array(mArray, count, ctype, kind):
+    """
+    Copies an API 1.0 array through an ``MScriptUtil`` buffer.
+
+    ``MArray.get`` fills the buffer in C++, numpy then copies it out by
+    address, like the raw points.
+
+    :param mArray (OpenMaya.MIntArray or OpenMaya.MFloatPointArray): array.
+    :param count (int): number of scalars in the array.
+    :param ctype (ctypes type): scalar type, c_int or c_float.
+    :param kind (str): pointer kind of the buffer, Int or Float4.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (count,) scalars.
+    """
+    if not count:
+        return np.empty(0, dtype=ctype)
+
+    # The zeros only size the buffer, a list of one repeated int.
+    util = OpenMaya.MScriptUtil()
+    util.createFromList([0] * count, count)
+
+    pointer = getattr(util, "as%sPtr" % kind)()
+    mArray.get(pointer)
+
+    buffer = (ctype * count).from_address(int(pointer))
+
+    return np.frombuffer(buffer, dtype=ctype).copy()
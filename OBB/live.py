@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Bounding boxes kept up to date while a mesh is edited.
+
+:class:`LiveOBB` registers node dirty, topology and world matrix callbacks
+on a mesh. Edits are coalesced and applied on idle: the object space
+points are diffed against the last ones and only the moved vertices are
+fed to an :class:`OBB.core.IncrementalFitter`, the full mesh is only refit
+when its topology changes.
+
+Dirty plugs don't reliably name the moved vertices (tweaks, history and
+deformers all dirty the output mesh), so every update still copies the N
+raw points and compares them with the last copy. That is a memory bound
+pass of a few milliseconds per million vertices, the fit itself only
+touches the moved vertices.
+"""
+import numpy as np
+
+from OBB import core
+from OBB import extract
+from OBB.api import OBB
+
+try:
+    from maya import OpenMaya
+    from maya.utils import executeDeferred
+except ImportError:
+    pass
+
+
+class LiveOBB(object):
+    """
+    :class:`LiveOBB` Live bounding box of a mesh.
+
+    Call :meth:`stop` to remove the callbacks, ``callback`` is called with
+    the instance on Maya's main thread after every update.
+    """
+
+    def __init__(
+        self,
+        meshName,
+        worldSpace=True,
+        tolerance=core.INCREMENTAL_TOLERANCE,
+        callback=None,
+    ):
+        self.meshName = meshName
+        self.shapeName = OBB.getShape(meshName)
+        self.fnMesh = OBB.getMFnMesh(self.shapeName)
+
+        self.worldSpace = worldSpace
+        self.tolerance = tolerance
+        self.callback = callback
+
+        self.callbackIds = []
+        self._pending = False
+        self._topologyChanged = False
+        self._rigidFitter = None
+
+        self.rebuild()
+        self.start()
+
+    @property
+    def box(self):
+        """
+        Property (axes, center, extents) of the current box.
+        """
+        axes, center, extents = self.fitter.box
+
+        if not self.worldSpace:
+            return axes, center, extents
+
+        matrix = extract.get_matrix(self.fnMesh.dagPath())[None]
+
+        result, similar = core.transform_boxes(
+            axes[None], center[None], extents[None], matrix
+        )
+
+        if not similar[0]:
+            # Its hull is kept until the points change.
+            if self._rigidFitter is None:
+                self._rigidFitter = core.RigidFitter(
+                    self.fitter.points, box=(axes, center, extents)
+                )
+            result = self._rigidFitter.fit_matrices(matrix)
+
+        return result[0]
+
+    @property
+    def matrix(self):
+        """
+        Property list of 16 floats, the bounding box matrix.
+        """
+        return core.get_matrix(*self.box)
+
+    def to_obb(self):
+        """
+        Snapshot of the current box.
+
+        Raises:
+            None
+
+        Returns:
+            (OBB Instance)
+        """
+        return OBB.from_arrays(*self.box)
+
+    def start(self):
+        """
+        Registers the callbacks, called on creation.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        if self.callbackIds:
+            return
+
+        dagPath = self.fnMesh.dagPath()
+        node = dagPath.node()
+
+        self.callbackIds = [
+            OpenMaya.MNodeMessage.addNodeDirtyPlugCallback(node, self._on_dirty),
+            OpenMaya.MPolyMessage.addPolyTopologyChangedCallback(
+                node, self._on_topology
+            ),
+            OpenMaya.MNodeMessage.addNodeAboutToDeleteCallback(
+                node, self._on_delete
+            ),
+        ]
+
+        if self.worldSpace:
+            self.callbackIds.append(
+                OpenMaya.MDagMessage.addWorldMatrixModifiedCallback(
+                    dagPath, self._on_matrix
+                )
+            )
+
+    def stop(self):
+        """
+        Removes the callbacks.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        for callbackId in self.callbackIds:
+            OpenMaya.MMessage.removeCallback(callbackId)
+
+        self.callbackIds = []
+
+    def rebuild(self):
+        """
+        Refits the whole mesh.
+
+        Raises:
+            `RuntimeError` if the mesh has no points.
+
+        Returns:
+            None
+        """
+        self._points = extract.get_points(self.fnMesh, worldSpace=False)
+        self.fitter = core.IncrementalFitter(self._points, tolerance=self.tolerance)
+        self._rigidFitter = None
+
+    def update(self):
+        """
+        Applies the vertex edits since the last update.
+
+        Copies and compares all N object space points to find the moved
+        ones, see the module notes.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self._pending = False
+
+        points = extract.get_points(self.fnMesh, worldSpace=False)
+
+        if self._topologyChanged or len(points) != len(self._points):
+            self._topologyChanged = False
+            self.rebuild()
+        else:
+            moved = np.flatnonzero((points != self._points).any(axis=1))
+            if len(moved):
+                self.fitter.update(moved, points[moved])
+                self._points = points
+                self._rigidFitter = None
+
+        if self.callback:
+            self.callback(self)
+
+    def _schedule(self, rebuild=False):
+        """
+        Queues an update on idle, the edits of one drag give one update.
+
+        :param rebuild(bool): refit the whole mesh.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self._topologyChanged |= rebuild
+
+        if not self._pending:
+            self._pending = True
+            executeDeferred(self._deferred_update)
+
+    def _deferred_update(self):
+        """
+        Updates unless the callbacks were removed in the meantime.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        if self.callbackIds:
+            self.update()
+
+    def _on_dirty(self, *args):
+        """
+        Node dirty callback, vertices may have moved.
+        """
+        self._schedule()
+
+    def _on_topology(self, *args):
+        """
+        Topology changed callback, the vertex indices are stale.
+        """
+        self._schedule(rebuild=True)
+
+    def _on_matrix(self, *args):
+        """
+        World matrix modified callback, the object space fit still holds.
+        """
+        self._schedule()
+
+    def _on_delete(self, *args):
+        """
+        Node about to delete callback.
+        """
+        self.stop()
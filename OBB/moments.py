@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""
+Mergeable moment summaries of geometry.
+
+A :class:`Moments` holds the sufficient statistics the covariance methods
+need (total weight, mean and the scatter matrix around the mean) plus a
+small set of support points the extents can be measured on. Summaries of
+separate parts merge with the parallel axis theorem, so the box of a
+group is built from its parts without revisiting their points.
+
+:class:`MomentAccumulator` builds them in one pass over streamed chunks.
+Every chunk is centered on its own mean (or shifted to one of its
+vertices for triangles) in float64 and merged into the running totals
+with Chan's pairwise update, so float32 storage and geometry placed far
+from the origin keep their precision.
+"""
+import itertools
+
+import numpy as np
+
+try:
+    from scipy.spatial import ConvexHull
+
+    hullMethod = True
+except ImportError:
+    hullMethod = False
+
+# Without scipy the support points are the extremes along these 13
+# directions (the 3x3x3 neighbourhood directions, as in DiTO-26).
+SUPPORT_NORMALS = np.array(
+    [
+        normal
+        for normal in itertools.product((-1, 0, 1), repeat=3)
+        if next((value for value in normal if value), 0) > 0
+    ],
+    dtype=np.float64,
+)
+
+# Points accumulated per chunk, small enough for the float64 copy of a
+# chunk to stay in cache while its mean and scatter are computed.
+POINT_CHUNK_SIZE = 65536
+
+# Triangles gathered per chunk by the triangle moments, this bounds the
+# (chunk, 3, 3) temporary to ~72MB of float64.
+TRIANGLE_CHUNK_SIZE = 1000000
+
+# Weighting kinds, point counts and surface areas don't mix.
+POINT_WEIGHTED = "points"
+AREA_WEIGHTED = "area"
+
+
+class Moments(object):
+    """
+    :class:`Moments` Sufficient statistics of a point cloud or mesh.
+
+    ``weight`` is the point count (or the surface area for triangles),
+    ``mean`` the (weighted) centroid and ``scatter`` the weighted sum of
+    the outer products of the offsets to the mean, so the covariance is
+    ``scatter / weight``. ``support`` are the points the extents are
+    measured on, the convex hull vertices when scipy is available.
+
+    ``kind`` is POINT_WEIGHTED or AREA_WEIGHTED, only summaries of the same
+    kind merge.
+    """
+
+    def __init__(self, weight, mean, scatter, support=None, kind=POINT_WEIGHTED):
+        self.weight = float(weight)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scatter = np.asarray(scatter, dtype=np.float64)
+        self.support = support
+        self.kind = kind
+
+    def __add__(self, other):
+        return self.merge([self, other])
+
+    @property
+    def covariance(self):
+        """
+        Property 3x3 covariance matrix.
+        """
+        return self.scatter / self.weight
+
+    @classmethod
+    def from_points(cls, points, withSupport=True, chunkSize=POINT_CHUNK_SIZE):
+        """
+        Moments of a point cloud, in one pass over chunks of points.
+
+        :param points(numpy.ndarray): (N, 3) points.
+        :param withSupport(bool): also gather the support points.
+        :param chunkSize(int): number of points accumulated at once.
+
+        Raises:
+            `RuntimeError` if there are no points.
+
+        Returns:
+            (Moments)
+        """
+        accumulator = MomentAccumulator(withSupport=False)
+        accumulator.add_points(points, chunkSize=chunkSize)
+
+        moments = accumulator.moments
+        if withSupport:
+            moments.support = support_points(points)
+
+        return moments
+
+    @classmethod
+    def from_triangles(
+        cls, points, triangles, withSupport=True, chunkSize=TRIANGLE_CHUNK_SIZE
+    ):
+        """
+        Area weighted moments of a triangle mesh.
+
+        Triangles are gathered and accumulated ``chunkSize`` at a time, so
+        the temporary (chunkSize, 3, 3) corner array bounds the memory used
+        no matter how dense the mesh is.
+
+        :param points(numpy.ndarray): (N, 3) points.
+        :param triangles(numpy.ndarray): (M, 3) triangle indices.
+        :param withSupport(bool): also gather the support points.
+        :param chunkSize(int): number of triangles processed at once.
+
+        Raises:
+            `RuntimeError` if the mesh has no area.
+
+        Returns:
+            (Moments)
+        """
+        accumulator = MomentAccumulator(withSupport=False)
+        accumulator.add_triangles(points, triangles, chunkSize=chunkSize)
+
+        if accumulator.weight <= 0.0:
+            raise RuntimeError("Triangles have no area to build a bounding box.")
+
+        moments = accumulator.moments
+        if withSupport:
+            moments.support = support_points(points)
+
+        return moments
+
+    @classmethod
+    def merge(cls, momentsList):
+        """
+        Merges summaries with the parallel axis theorem.
+
+        :param momentsList(list of Moments): summaries to merge.
+
+        Raises:
+            `RuntimeError` if there is nothing to merge or the summaries are
+            of different kinds.
+
+        Returns:
+            (Moments)
+        """
+        if not momentsList:
+            raise RuntimeError("No moments to merge.")
+
+        kind = _merged_kind(momentsList)
+
+        weights = np.array([moments.weight for moments in momentsList])
+        means = np.array([moments.mean for moments in momentsList])
+
+        weight = weights.sum()
+        mean = np.dot(weights, means) / weight
+
+        # Scatter of every part moved from its own mean to the merged one.
+        shifts = means - mean
+        scatter = sum(moments.scatter for moments in momentsList)
+        scatter = scatter + np.einsum("k,ki,kj->ij", weights, shifts, shifts)
+
+        supports = [moments.support for moments in momentsList]
+        support = None
+        if all(points is not None for points in supports):
+            support = support_points(np.concatenate(supports))
+
+        return cls(weight, mean, scatter, support, kind=kind)
+
+
+class MomentAccumulator(object):
+    """
+    :class:`MomentAccumulator` One pass accumulation of :class:`Moments`.
+
+    Feed it chunks of points (or triangles) as they are streamed, or merge
+    accumulators filled in parallel with :meth:`add`. Every vertex is read
+    once, each chunk is reduced in float64 around its own mean and merged
+    with Chan's pairwise update.
+
+    Points and triangles can't be fed to the same accumulator, the first
+    ones set its ``kind``.
+    """
+
+    def __init__(self, withSupport=True):
+        self.withSupport = withSupport
+
+        self.kind = None
+        self.weight = 0.0
+        self.mean = np.zeros(3)
+        self.scatter = np.zeros((3, 3))
+        self.support = None
+
+    @property
+    def moments(self):
+        """
+        Property :class:`Moments` accumulated so far.
+
+        Raises:
+            `RuntimeError` if nothing has been accumulated.
+        """
+        if self.weight <= 0.0:
+            raise RuntimeError("No points to build a bounding box from.")
+
+        return Moments(
+            self.weight, self.mean, self.scatter, self.support, kind=self.kind
+        )
+
+    def add(self, moments):
+        """
+        Merges a summary (or another accumulator) into this one.
+
+        :param moments(Moments): summary to merge.
+
+        Raises:
+            `RuntimeError` if the summary is of another kind.
+
+        Returns:
+            None
+        """
+        self._set_kind(moments.kind)
+        self.add_moments(moments.weight, moments.mean, moments.scatter)
+
+        if self.withSupport and moments.support is not None:
+            self._add_support(moments.support)
+
+    def add_moments(self, weight, mean, scatter):
+        """
+        Merges raw weight, mean and scatter with Chan's pairwise update.
+
+        :param weight(float): weight to add.
+        :param mean(numpy.ndarray): (3,) mean of the added weight.
+        :param scatter(numpy.ndarray): 3x3 scatter around that mean.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        if weight <= 0.0:
+            return
+
+        total, self.mean, self.scatter = merge_moments(
+            self.weight, self.mean, self.scatter, weight, mean, scatter
+        )
+        self.weight = float(total)
+
+    def add_points(self, points, chunkSize=POINT_CHUNK_SIZE):
+        """
+        Accumulates points, ``chunkSize`` at a time.
+
+        :param points(numpy.ndarray): (N, 3) points, float32 or float64.
+        :param chunkSize(int): number of points accumulated at once.
+
+        Raises:
+            `RuntimeError` if triangles were accumulated.
+
+        Returns:
+            None
+        """
+        self._set_kind(POINT_WEIGHTED)
+
+        points = np.asarray(points)
+        chunkSize = max(int(chunkSize or len(points)), 1)
+
+        for start in range(0, len(points), chunkSize):
+            chunk = points[start:start + chunkSize].astype(np.float64)
+
+            mean = chunk.mean(axis=0)
+            chunk -= mean
+
+            self.add_moments(len(chunk), mean, np.dot(chunk.T, chunk))
+
+            if self.withSupport:
+                self._add_support(support_points(chunk + mean))
+
+    def add_triangles(self, points, triangles, chunkSize=TRIANGLE_CHUNK_SIZE):
+        """
+        Accumulates the area weighted moments of triangles.
+
+        :param points(numpy.ndarray): (N, 3) points, float32 or float64.
+        :param triangles(numpy.ndarray): (M, 3) indices into the points.
+        :param chunkSize(int): number of triangles processed at once.
+
+        Raises:
+            `RuntimeError` if points were accumulated.
+
+        Returns:
+            None
+        """
+        self._set_kind(AREA_WEIGHTED)
+
+        points = np.asarray(points)
+        triangles = np.asarray(triangles).reshape(-1, 3)
+        chunkSize = max(int(chunkSize or len(triangles)), 1)
+
+        for start in range(0, len(triangles), chunkSize):
+            # (m, 3, 3) corners with p, q, r along the second axis.
+            corners = points[triangles[start:start + chunkSize]].astype(np.float64)
+            if not len(corners):
+                continue
+
+            # Shift to a vertex of the chunk to keep the precision far from
+            # the origin, the scatter does not depend on the shift.
+            shift = corners[0, 0].copy()
+            corners -= shift
+
+            p, q, r = corners[:, 0], corners[:, 1], corners[:, 2]
+
+            mui = corners.mean(axis=1)
+            Ai = np.sqrt((np.cross(q - p, r - p) ** 2).sum(axis=1)) * 0.5
+
+            Am = Ai.sum()
+            if Am <= 0.0:
+                continue
+
+            mu = np.dot(Ai, mui) / Am
+
+            # These bits set the c terms to Am*E[xx], Am*E[xy], Am*E[xz]....
+            weights = Ai / 12.0
+            C = 9.0 * np.einsum("k,ki,kj->ij", weights, mui, mui)
+            C += np.einsum("k,kvi,kvj->ij", weights, corners, corners)
+
+            self.add_moments(Am, mu + shift, C - Am * np.outer(mu, mu))
+
+            if self.withSupport:
+                self._add_support(support_points(corners.reshape(-1, 3) + shift))
+
+    def _set_kind(self, kind):
+        """
+        Sets the weighting kind on the first input, checks it afterwards.
+
+        :param kind(str): POINT_WEIGHTED or AREA_WEIGHTED.
+
+        Raises:
+            `RuntimeError` if the kind differs from the accumulated one.
+
+        Returns:
+            None
+        """
+        if self.kind is None:
+            self.kind = kind
+        elif kind != self.kind:
+            raise RuntimeError(
+                "Can't mix %s and %s weighted moments." % (self.kind, kind)
+            )
+
+    def _add_support(self, support):
+        """
+        Merges support points into the running support.
+
+        :param support(numpy.ndarray): (S, 3) support points.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        if self.support is not None:
+            support = support_points(np.concatenate([self.support, support]))
+
+        self.support = support
+
+
+def merge_moments(weight, mean, scatter, otherWeight, otherMean, otherScatter):
+    """
+    Chan's pairwise update of weights, means and scatter matrices.
+
+    Works on single summaries or on stacks of them, (K,) weights with
+    (K, 3) means and (K, 3, 3) scatters are merged element wise. Zero
+    weights merge to the other side unchanged.
+
+    :param weight(float or numpy.ndarray): weights of the first side.
+    :param mean(numpy.ndarray): (..., 3) means of the first side.
+    :param scatter(numpy.ndarray): (..., 3, 3) scatters of the first side.
+    :param otherWeight(float or numpy.ndarray): weights of the second side.
+    :param otherMean(numpy.ndarray): (..., 3) means of the second side.
+    :param otherScatter(numpy.ndarray): (..., 3, 3) scatters of the second
+        side.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) merged weights.
+        (numpy.ndarray) merged means.
+        (numpy.ndarray) merged scatters.
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    total = weight + otherWeight
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(total > 0.0, otherWeight / total, 0.0)
+
+    delta = otherMean - mean
+
+    scatter = scatter + otherScatter + (
+        delta[..., :, None] * delta[..., None, :] * (weight * ratio)[..., None, None]
+    )
+    mean = mean + delta * ratio[..., None]
+
+    return total, mean, scatter
+
+
+def _merged_kind(momentsList):
+    """
+    Common weighting kind of summaries.
+
+    :param momentsList(list of Moments): summaries to merge.
+
+    Raises:
+        `RuntimeError` if the summaries are of different kinds.
+
+    Returns:
+        (str) POINT_WEIGHTED or AREA_WEIGHTED.
+    """
+    kinds = sorted(set(moments.kind for moments in momentsList))
+
+    if len(kinds) > 1:
+        raise RuntimeError(
+            "Can't merge %s weighted moments, rebuild the parts with methods "
+            "of the same kind." % " and ".join(kinds)
+        )
+
+    return kinds[0]
+
+
+def support_points(points):
+    """
+    Small set of points whose extents match those of all the points.
+
+    The convex hull vertices when scipy is available, which keep the
+    extents exact along any axes, the extremes along SUPPORT_NORMALS
+    otherwise.
+
+    :param points(numpy.ndarray): (N, 3) points.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (S, 3) float64 support points.
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    if hullMethod and len(points) > 4:
+        try:
+            return points[ConvexHull(points).vertices]
+        except RuntimeError:
+            # Flat or degenerate points, Qhull can't build a 3D hull.
+            pass
+
+    projections = np.dot(points, SUPPORT_NORMALS.T)
+    indices = np.concatenate([projections.argmin(axis=0), projections.argmax(axis=0)])
+
+    return points[np.unique(indices)]
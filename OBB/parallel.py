@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel batch fitting on a pool of worker processes or threads.
+
+The meshes are concatenated into one point buffer (and one triangle
+buffer). Each task fits a chunk of consecutive meshes with
+:func:`OBB.core.batch_build_segments` and the results are joined back in
+input order.
+
+Worker processes get the buffers through shared memory, so they attach to
+them instead of receiving pickled arrays. Worker threads read them
+directly, numpy releases the GIL in the reductions and matrix products
+doing the work.
+"""
+import os
+import threading
+from concurrent import futures
+
+import numpy as np
+
+from OBB import core
+
+try:
+    from multiprocessing import shared_memory
+
+    sharedMemory = True
+except ImportError:
+    # Python < 3.8, the buffers are pickled to the workers instead.
+    sharedMemory = False
+
+# Number of tasks per worker when the chunk size is derived, a few per
+# worker so one slow chunk doesn't leave the others idle.
+TASKS_PER_WORKER = 4
+
+
+def batch_build(
+    pointsList,
+    method=0,
+    trianglesList=None,
+    workers=None,
+    chunkSize=None,
+    executor="process",
+):
+    """
+    Fits a bounding box to every mesh on a process or thread pool.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) points per mesh.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per mesh,
+        required by the triangles method.
+    :param workers(int): number of workers, defaults to the cpu count.
+    :param chunkSize(int): number of meshes per task, defaults to chunks of
+        even point totals, TASKS_PER_WORKER per worker.
+    :param executor(str): "process" or "thread".
+
+    Raises:
+        `RuntimeError` if the method or executor is unsupported.
+
+    Returns:
+        (OBB.core.BatchResult) boxes in the order of pointsList.
+    """
+    if executor == "thread":
+        return batch_build_async(
+            pointsList,
+            method=method,
+            trianglesList=trianglesList,
+            workers=workers,
+            chunkSize=chunkSize,
+        ).result()
+
+    if executor != "process":
+        raise RuntimeError(
+            "Executor unsupported! Please use \"process\" or \"thread\"."
+        )
+
+    tasks, workers = _prepare(pointsList, method, trianglesList, workers, chunkSize)
+    if not tasks:
+        return core.concatenate_results([])
+
+    points, offsets, triangles, triangleOffsets = tasks[0][:4]
+
+    buffers = []
+    try:
+        if sharedMemory:
+            # Every task reads the same buffers, share them once.
+            shared = (
+                _share(points, buffers),
+                offsets,
+                _share(triangles, buffers),
+                triangleOffsets,
+            )
+            tasks = [shared + task[4:] for task in tasks]
+        else:
+            # Tasks are pickled, each only carries its own meshes.
+            tasks = [_slice(task) for task in tasks]
+
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_fit_segments, tasks))
+
+    finally:
+        for buffer in buffers:
+            buffer.close()
+            buffer.unlink()
+
+    return core.concatenate_results(results)
+
+
+def batch_build_async(
+    pointsList, method=0, trianglesList=None, workers=None, chunkSize=None
+):
+    """
+    Fits a bounding box to every mesh on a thread pool without blocking.
+
+    The input arrays are only read, so the caller (typically Maya's main
+    thread) can carry on while the boxes are fit.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) points per mesh.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per mesh,
+        required by the triangles method.
+    :param workers(int): number of threads, defaults to the cpu count.
+    :param chunkSize(int): number of meshes per task, defaults to chunks of
+        even point totals, TASKS_PER_WORKER per worker.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        (concurrent.futures.Future) resolving to the
+        :class:`OBB.core.BatchResult` in the order of pointsList.
+    """
+    tasks, workers = _prepare(pointsList, method, trianglesList, workers, chunkSize)
+
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = [executor.submit(_fit_segments, task) for task in tasks]
+    finally:
+        executor.shutdown(wait=False)
+
+    return _gather(pending)
+
+
+def _prepare(pointsList, method, trianglesList, workers, chunkSize):
+    """
+    Concatenates the meshes and splits them into worker tasks.
+
+    :param pointsList(list of numpy.ndarray): (N_i, 3) points per mesh.
+    :param method(int): method index.
+    :param trianglesList(list of numpy.ndarray): (M_i, 3) triangles per mesh.
+    :param workers(int): number of workers or None.
+    :param chunkSize(int): number of meshes per task or None.
+
+    Raises:
+        `RuntimeError` if the triangles method has no triangles.
+
+    Returns:
+        (list of tuples) one task per chunk of meshes.
+        (int) number of workers.
+    """
+    if method == 1 and trianglesList is None:
+        raise RuntimeError("The triangles method needs triangles.")
+
+    if method != 1:
+        trianglesList = None
+
+    workers = workers or os.cpu_count() or 1
+
+    if not len(pointsList):
+        return [], workers
+
+    points, offsets, triangles, triangleOffsets = core.concatenate(
+        pointsList, trianglesList
+    )
+
+    count = len(offsets) - 1
+
+    if chunkSize:
+        bounds = np.append(np.arange(0, count, max(int(chunkSize), 1)), count)
+    else:
+        # Cut the point buffer into even parts, at the nearest mesh ends.
+        taskCount = min(count, workers * TASKS_PER_WORKER)
+        bounds = np.unique(
+            np.searchsorted(offsets, np.linspace(0, offsets[-1], taskCount + 1))
+        )
+        bounds[-1] = count
+
+    tasks = [
+        (points, offsets, triangles, triangleOffsets, method, int(first), int(last))
+        for first, last in zip(bounds[:-1], bounds[1:])
+    ]
+
+    return tasks, workers
+
+
+def _gather(pending):
+    """
+    Joins the futures of every chunk into one future of the whole batch.
+
+    :param pending(list of concurrent.futures.Future): chunk futures in
+        input order.
+
+    Raises:
+        None
+
+    Returns:
+        (concurrent.futures.Future) resolving to the joined
+        :class:`OBB.core.BatchResult`.
+    """
+    gathered = futures.Future()
+    remaining = [len(pending)]
+    lock = threading.Lock()
+
+    def done(future):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+
+        try:
+            gathered.set_result(
+                core.concatenate_results([task.result() for task in pending])
+            )
+        except Exception as exc:
+            gathered.set_exception(exc)
+
+    if not pending:
+        gathered.set_result(core.concatenate_results([]))
+
+    for future in pending:
+        future.add_done_callback(done)
+
+    return gathered
+
+
+def _slice(task):
+    """
+    Cuts a task's buffers down to its own meshes.
+
+    :param task(tuple): buffers, offsets, method and segment range.
+
+    Raises:
+        None
+
+    Returns:
+        (tuple) task over the sliced buffers, segments 0 to last - first.
+    """
+    points, offsets, triangles, triangleOffsets, method, first, last = task
+
+    points = points[offsets[first]:offsets[last]]
+    segmentOffsets = offsets[first:last + 1] - offsets[first]
+
+    segmentTriangleOffsets = None
+    if triangles is not None:
+        triangles = triangles[triangleOffsets[first]:triangleOffsets[last]]
+        segmentTriangleOffsets = (
+            triangleOffsets[first:last + 1] - triangleOffsets[first]
+        )
+
+    return (
+        points,
+        segmentOffsets,
+        triangles,
+        segmentTriangleOffsets,
+        method,
+        0,
+        last - first,
+    )
+
+
+def _share(array, buffers):
+    """
+    Describes an array so a worker process can get it back.
+
+    The array is copied into a new shared memory block, which is appended
+    to ``buffers`` so the caller can release it.
+
+    :param array(numpy.ndarray): array to share, may be None.
+    :param buffers(list): shared memory blocks created so far.
+
+    Raises:
+        None
+
+    Returns:
+        (tuple) shared memory name, shape and dtype, or None.
+    """
+    if array is None:
+        return None
+
+    buffer = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    buffers.append(buffer)
+
+    np.ndarray(array.shape, dtype=array.dtype, buffer=buffer.buf)[...] = array
+
+    return buffer.name, array.shape, array.dtype.str
+
+
+def _fit_segments(task):
+    """
+    Worker entry, fits the meshes ``first`` to ``last`` of the buffers.
+
+    :param task(tuple): shared buffers, offsets, method and segment range.
+
+    Raises:
+        None
+
+    Returns:
+        (OBB.core.BatchResult)
+    """
+    pointsBuffer, offsets, trianglesBuffer, triangleOffsets, method, first, last = (
+        task
+    )
+
+    attached = []
+    try:
+        points = _attach(pointsBuffer, attached)
+        points = points[offsets[first]:offsets[last]]
+        segmentOffsets = offsets[first:last + 1] - offsets[first]
+
+        triangles = _attach(trianglesBuffer, attached)
+        segmentTriangleOffsets = None
+        if triangles is not None:
+            triangles = triangles[triangleOffsets[first]:triangleOffsets[last]]
+            segmentTriangleOffsets = (
+                triangleOffsets[first:last + 1] - triangleOffsets[first]
+            )
+
+        result = core.batch_build_segments(
+            points,
+            segmentOffsets,
+            method=method,
+            triangles=triangles,
+            triangleOffsets=segmentTriangleOffsets,
+        )
+
+    finally:
+        # Drop the views into the shared blocks before closing them.
+        points = triangles = None
+
+        for buffer in attached:
+            try:
+                buffer.close()
+            except BufferError:
+                # The traceback of a failed fit still holds views, the block
+                # is unmapped once they are collected. Raising here would hide
+                # the error of the fit.
+                pass
+
+    return result
+
+
+def _attach(description, attached):
+    """
+    Gets an array back from the description made by :func:`_share`.
+
+    :param description(tuple): shared memory name, shape and dtype, or an
+        array.
+    :param attached(list): shared memory blocks attached so far.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) array, viewing the shared memory when possible.
+    """
+    if not isinstance(description, tuple):
+        return description
+
+    name, shape, dtype = description
+
+    buffer = shared_memory.SharedMemory(name=name)
+    attached.append(buffer)
+
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer.buf)
@@ -0,0 +1,920 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming readers of geometry files too large to load at once.
+
+PLY (ascii and binary), OBJ and XYZ files are read in chunks of a fixed
+number of records. Binary PLY vertices are memory mapped where they lie in
+the file, the other formats are parsed once into temporary binary files
+that are memory mapped in turn, so the peak memory follows the chunk size
+rather than the file size.
+
+The chunks feed a :class:`OBB.moments.MomentAccumulator` for the axes and
+:func:`OBB.core.fit_axes_chunks` for the extents.
+"""
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from OBB import core
+from OBB.core import hullMethod
+from OBB.moments import MomentAccumulator
+from OBB.utils import eigh3
+
+# Records (vertices, faces or lines) read per chunk.
+CHUNK_SIZE = 1 << 20
+
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+
+class GeometryReader(object):
+    """
+    :class:`GeometryReader` Base of the chunked geometry file readers.
+
+    ``points`` is an (N, 3) memory mapped array of the vertices and
+    ``triangles`` an (M, 3) one of the triangle indices, or None when the
+    file has no faces. Use the readers as context managers so their
+    temporary files are removed.
+    """
+
+    def __init__(self, path, chunkSize=CHUNK_SIZE):
+        self.path = path
+        self.chunkSize = max(int(chunkSize or CHUNK_SIZE), 1)
+
+        self.points = None
+        self.triangles = None
+        self._tempDir = None
+
+        if not os.path.isfile(path):
+            raise RuntimeError("%s is not a file." % path)
+
+        try:
+            self.read()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self):
+        """
+        Maps (or parses) the file into ``points`` and ``triangles``.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases the maps and removes the temporary files.
+
+        Raises:
+            None
+
+        Returns:
+            None
+        """
+        self.points = None
+        self.triangles = None
+
+        if self._tempDir is not None:
+            shutil.rmtree(self._tempDir, ignore_errors=True)
+            self._tempDir = None
+
+    def iter_points(self):
+        """
+        Points of the file, ``chunkSize`` at a time.
+
+        Raises:
+            None
+
+        Returns:
+            (generator) of (n, 3) numpy.ndarray.
+        """
+        for start in range(0, len(self.points), self.chunkSize):
+            yield np.asarray(self.points[start:start + self.chunkSize])
+
+    def iter_triangles(self):
+        """
+        Triangles of the file, ``chunkSize`` at a time.
+
+        Raises:
+            `RuntimeError` if the file has no faces.
+
+        Returns:
+            (generator) of (m, 3) numpy.ndarray indexing ``points``.
+        """
+        if self.triangles is None:
+            raise RuntimeError("%s has no faces." % self.path)
+
+        for start in range(0, len(self.triangles), self.chunkSize):
+            yield np.asarray(
+                self.triangles[start:start + self.chunkSize], dtype=np.intp
+            )
+
+    def _spill(self, name, dtype):
+        """
+        Temporary binary file to parse records into.
+
+        :param name(str): file name in the reader's temporary directory.
+        :param dtype(numpy.dtype): dtype of the records.
+
+        Raises:
+            None
+
+        Returns:
+            (_Spill)
+        """
+        if self._tempDir is None:
+            self._tempDir = tempfile.mkdtemp(prefix="OBB_")
+
+        return _Spill(os.path.join(self._tempDir, name), dtype)
+
+    def _read_lines(self, stream, count=None):
+        """
+        Lines of a text stream in lists of ``chunkSize``.
+
+        :param stream(file): stream opened on the file.
+        :param count(int): number of lines to read, None for all.
+
+        Raises:
+            `RuntimeError` if the stream ends before ``count`` lines.
+
+        Returns:
+            (generator) of lists of lines.
+        """
+        remaining = count
+        while remaining is None or remaining > 0:
+            size = self.chunkSize
+            if remaining is not None:
+                size = min(size, remaining)
+
+            lines = []
+            for line in stream:
+                lines.append(line)
+                if len(lines) == size:
+                    break
+
+            if not lines:
+                if remaining:
+                    raise RuntimeError("%s ends unexpectedly." % self.path)
+                return
+
+            if remaining is not None:
+                remaining -= len(lines)
+
+            yield lines
+
+
+class PlyReader(GeometryReader):
+    """
+    :class:`PlyReader` Reads ascii and binary PLY files.
+
+    Binary vertices are memory mapped in place. Triangle faces of a fixed
+    vertex count are too, other polygons are fanned into triangles.
+    """
+
+    def read(self):
+        with open(self.path, "rb") as stream:
+            fmt, elements = self._read_header(stream)
+            headerSize = stream.tell()
+
+        if fmt == "ascii":
+            self._read_ascii(headerSize, elements)
+        else:
+            self._read_binary(
+                headerSize, elements, "<" if fmt == "binary_little_endian" else ">"
+            )
+
+        if self.points is None:
+            raise RuntimeError("%s has no vertices." % self.path)
+
+    def _read_header(self, stream):
+        """
+        Parses the PLY header.
+
+        :param stream(file): binary stream at the start of the file.
+
+        Raises:
+            `RuntimeError` if the header is invalid.
+
+        Returns:
+            (str) ascii, binary_little_endian or binary_big_endian.
+            (list of tuples) element name, count and properties, the
+            properties being (name, type) or (name, (countType, itemType)).
+        """
+        if stream.readline().strip() != b"ply":
+            raise RuntimeError("%s is not a PLY file." % self.path)
+
+        fmt = None
+        elements = []
+        while True:
+            line = stream.readline()
+            if not line:
+                raise RuntimeError("%s has no end_header." % self.path)
+
+            words = line.decode("ascii", "replace").split()
+            if not words or words[0] in ("comment", "obj_info"):
+                continue
+
+            if words[0] == "end_header":
+                break
+            elif words[0] == "format":
+                fmt = words[1]
+            elif words[0] == "element":
+                elements.append((words[1], int(words[2]), []))
+            elif words[0] == "property" and elements:
+                if words[1] == "list":
+                    elements[-1][2].append(
+                        (words[4], (PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+                    )
+                else:
+                    elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+
+        if fmt not in ("ascii", "binary_little_endian", "binary_big_endian"):
+            raise RuntimeError("%s has an unsupported PLY format." % self.path)
+
+        return fmt, elements
+
+    def _read_binary(self, offset, elements, order):
+        """
+        Maps the binary elements of the file.
+
+        :param offset(int): byte offset of the first element.
+        :param elements(list of tuples): parsed header elements.
+        :param order(str): "<" or ">" byte order.
+
+        Raises:
+            `RuntimeError` if an element can't be read.
+
+        Returns:
+            None
+        """
+        for name, count, properties in elements:
+            if any(isinstance(kind, tuple) for _, kind in properties):
+                offset = self._read_binary_lists(
+                    offset, name, count, properties, order
+                )
+                continue
+
+            dtype = np.dtype([(prop, order + kind) for prop, kind in properties])
+
+            if name == "vertex" and count:
+                records = np.memmap(
+                    self.path, dtype=dtype, mode="r", offset=offset, shape=(count,)
+                )
+                self.points = self._vertex_view(records)
+
+            offset += dtype.itemsize * count
+
+    def _vertex_view(self, records):
+        """
+        (N, 3) view of the x, y and z fields of the vertex records.
+
+        :param records(numpy.memmap): (N,) structured vertex records.
+
+        Raises:
+            `RuntimeError` if the vertices have no x, y or z.
+
+        Returns:
+            (numpy.ndarray) (N, 3) points.
+        """
+        fields = records.dtype.fields
+        if not all(axis in fields for axis in "xyz"):
+            raise RuntimeError("%s vertices have no x, y or z." % self.path)
+
+        kind, start = fields["x"][:2]
+
+        # Adjacent fields of one type are strided in place, no copy.
+        if all(
+            fields[axis][0] == kind and fields[axis][1] == start + i * kind.itemsize
+            for i, axis in enumerate("xyz")
+        ):
+            return np.ndarray(
+                (len(records), 3),
+                dtype=kind,
+                buffer=records,
+                offset=start,
+                strides=(records.dtype.itemsize, kind.itemsize),
+            )
+
+        spill = self._spill("points", np.float64)
+        for first in range(0, len(records), self.chunkSize):
+            chunk = records[first:first + self.chunkSize]
+            spill.write(np.column_stack([chunk["x"], chunk["y"], chunk["z"]]))
+
+        return spill.array(3)
+
+    def _read_binary_lists(self, offset, name, count, properties, order):
+        """
+        Reads an element with list properties, triangulating the faces.
+
+        Faces whose lists all have the vertex count of the first one are
+        memory mapped as fixed width records, anything else is walked by
+        :meth:`_walk_binary`.
+
+        :param offset(int): byte offset of the element.
+        :param name(str): element name.
+        :param count(int): number of records.
+        :param properties(list of tuples): element properties.
+        :param order(str): "<" or ">" byte order.
+
+        Raises:
+            `RuntimeError` if the file ends within the element.
+
+        Returns:
+            (int) byte offset after the element.
+        """
+        lists = [prop for prop, kind in properties if isinstance(kind, tuple)]
+        indices = lists[0] if name == "face" else None
+
+        if not count:
+            if indices is not None:
+                self.triangles = np.empty((0, 3), dtype=np.intp)
+            return offset
+
+        size = os.path.getsize(self.path)
+        records = None
+
+        if len(lists) == 1:
+            # Fixed width guess from the first record's list length.
+            head = 0
+            for prop, kind in properties:
+                if prop == lists[0]:
+                    break
+                head += np.dtype(kind).itemsize
+
+            countType = np.dtype(order + dict(properties)[lists[0]][0])
+            first = np.memmap(
+                self.path, dtype=countType, mode="r", offset=offset + head, shape=(1,)
+            )
+            length = int(first[0])
+
+            dtype = _record_dtype(properties, order, {lists[0]: length})
+
+            if offset + dtype.itemsize * count <= size:
+                records = np.memmap(
+                    self.path, dtype=dtype, mode="r", offset=offset, shape=(count,)
+                )
+                if not all(
+                    (records[first:first + self.chunkSize][lists[0] + "_count"]
+                     == length).all()
+                    for first in range(0, count, self.chunkSize)
+                ):
+                    records = None
+
+        if records is not None:
+            if indices is not None:
+                if length == 3:
+                    self.triangles = records[indices]
+                else:
+                    spill = self._spill("triangles", np.int64)
+                    for first in range(0, count, self.chunkSize):
+                        spill.write(
+                            _fan(records[first:first + self.chunkSize][indices])
+                        )
+                    self.triangles = spill.array(3)
+
+            return offset + dtype.itemsize * count
+
+        return self._walk_binary(offset, count, properties, order, indices)
+
+    def _walk_binary(self, offset, count, properties, order, indices):
+        """
+        Reads variable width records.
+
+        Record boundaries depend on every list length before them, so only
+        the cursor walks the records, reading the lengths. The face indices
+        are then gathered and fanned with numpy, a chunk of records at a
+        time.
+
+        :param offset(int): byte offset of the element.
+        :param count(int): number of records.
+        :param properties(list of tuples): element properties.
+        :param order(str): "<" or ">" byte order.
+        :param indices(str): name of the face indices list, or None to skip.
+
+        Raises:
+            `RuntimeError` if the file ends within the element.
+
+        Returns:
+            (int) byte offset after the element.
+        """
+        if offset >= os.path.getsize(self.path):
+            raise RuntimeError("Binary PLY ends unexpectedly.")
+
+        data = np.memmap(self.path, dtype=np.uint8, mode="r", offset=offset)
+        buffer = memoryview(data)
+
+        # Bytes before every list, its length reader, length and item sizes.
+        layout = []
+        skip = 0
+        for prop, kind in properties:
+            if not isinstance(kind, tuple):
+                skip += np.dtype(kind).itemsize
+                continue
+
+            countType = np.dtype(order + kind[0])
+            layout.append(
+                (
+                    skip,
+                    struct.Struct(order + countType.char).unpack_from,
+                    countType.itemsize,
+                    np.dtype(kind[1]).itemsize,
+                    prop == indices,
+                )
+            )
+            skip = 0
+
+            if prop == indices:
+                indicesType = np.dtype(order + kind[1])
+
+        spill = self._spill("triangles", np.int64) if indices else None
+
+        position = 0
+        for first in range(0, count, self.chunkSize):
+            starts = []
+            lengths = []
+            try:
+                for _ in range(min(self.chunkSize, count - first)):
+                    for before, unpack, countSize, itemSize, isIndices in layout:
+                        position += before
+                        length = unpack(buffer, position)[0]
+                        position += countSize
+
+                        if isIndices:
+                            starts.append(position)
+                            lengths.append(length)
+
+                        position += length * itemSize
+                    position += skip
+
+            except struct.error:
+                raise RuntimeError("Binary PLY ends unexpectedly.")
+
+            if position > len(data):
+                raise RuntimeError("Binary PLY ends unexpectedly.")
+
+            if spill is not None:
+                spill.write(_fan_lists(data, starts, lengths, indicesType))
+
+        if spill is not None:
+            self.triangles = spill.array(3)
+
+        return offset + position
+
+    def _read_ascii(self, offset, elements):
+        """
+        Parses the ascii elements of the file.
+
+        :param offset(int): byte offset of the first element.
+        :param elements(list of tuples): parsed header elements.
+
+        Raises:
+            `RuntimeError` if an element can't be read.
+
+        Returns:
+            None
+        """
+        with open(self.path, "rb") as stream:
+            stream.seek(offset)
+
+            for name, count, properties in elements:
+                names = [prop for prop, _ in properties]
+
+                if name == "vertex":
+                    if not all(axis in names for axis in "xyz"):
+                        raise RuntimeError(
+                            "%s vertices have no x, y or z." % self.path
+                        )
+
+                    columns = [names.index(axis) for axis in "xyz"]
+                    spill = self._spill("points", np.float64)
+                    for lines in self._read_lines(stream, count):
+                        spill.write(
+                            np.array(
+                                [line.split() for line in lines], dtype=np.float64
+                            )[:, columns]
+                        )
+                    self.points = spill.array(3)
+
+                elif name == "face":
+                    # Tokens before the indices list, the scalar properties.
+                    head = 0
+                    for prop, kind in properties:
+                        if isinstance(kind, tuple):
+                            break
+                        head += 1
+
+                    spill = self._spill("triangles", np.int64)
+                    for lines in self._read_lines(stream, count):
+                        polygons = []
+                        for line in lines:
+                            tokens = line.split()
+                            length = int(tokens[head])
+                            polygons.append(tokens[head + 1:head + 1 + length])
+                        spill.write(_triangulate(polygons))
+                    self.triangles = spill.array(3)
+
+                else:
+                    for _ in self._read_lines(stream, count):
+                        pass
+
+
+class ObjReader(GeometryReader):
+    """
+    :class:`ObjReader` Reads Wavefront OBJ files.
+
+    Vertices and faces are parsed into temporary binary files in one pass,
+    polygons are fanned into triangles and relative (negative) indices are
+    resolved.
+    """
+
+    def read(self):
+        points = self._spill("points", np.float64)
+        triangles = self._spill("triangles", np.int64)
+
+        vertexCount = 0
+        with open(self.path, "rb") as stream:
+            for lines in self._read_lines(stream):
+                vertices = []
+                polygons = []
+                for line in lines:
+                    # Any whitespace separates the keyword, "v\t" included.
+                    tokens = line.split()
+                    if not tokens:
+                        continue
+
+                    if tokens[0] == b"v":
+                        vertices.append(tokens[1:4])
+                    elif tokens[0] == b"f":
+                        polygon = [int(token.split(b"/")[0]) for token in tokens[1:]]
+                        count = vertexCount + len(vertices)
+                        polygons.append(
+                            [index - 1 if index > 0 else count + index
+                             for index in polygon]
+                        )
+
+                if vertices:
+                    points.write(np.array(vertices, dtype=np.float64))
+                    vertexCount += len(vertices)
+                triangles.write(_triangulate(polygons))
+
+        self.points = points.array(3)
+        if not len(self.points):
+            raise RuntimeError("%s has no vertices." % self.path)
+
+        self.triangles = triangles.array(3) if triangles.count else None
+
+
+class XyzReader(GeometryReader):
+    """
+    :class:`XyzReader` Reads XYZ (and PTS) point files.
+
+    One point per line as x, y and z, separated by spaces or commas. Extra
+    columns (colors, normals, intensity) are ignored, as are comments and
+    lines that aren't points, such as the PTS point count.
+    """
+
+    def read(self):
+        points = self._spill("points", np.float64)
+
+        with open(self.path, "rb") as stream:
+            for lines in self._read_lines(stream):
+                rows = [
+                    tokens[:3]
+                    for tokens in (line.replace(b",", b" ").split() for line in lines)
+                    if len(tokens) >= 3 and not tokens[0].startswith(b"#")
+                ]
+
+                try:
+                    points.write(np.array(rows, dtype=np.float64))
+                except ValueError:
+                    # Header or stray text lines, keep the numeric ones.
+                    points.write(
+                        np.array([row for row in rows if _numeric(row)],
+                                 dtype=np.float64)
+                    )
+
+        self.points = points.array(3)
+        if not len(self.points):
+            raise RuntimeError("%s has no points." % self.path)
+
+
+# Reader class per lower case file extension.
+READERS = {
+    ".ply": PlyReader,
+    ".obj": ObjReader,
+    ".xyz": XyzReader,
+    ".pts": XyzReader,
+}
+
+
+def open_reader(path, chunkSize=CHUNK_SIZE):
+    """
+    Opens the reader matching the file extension.
+
+    :param path(str): PLY, OBJ or XYZ file.
+    :param chunkSize(int): records read per chunk.
+
+    Raises:
+        `RuntimeError` if the file type is unsupported.
+
+    Returns:
+        (GeometryReader)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise RuntimeError(
+            "%s is unsupported! Please use %s files."
+            % (path, ", ".join(sorted(READERS)))
+        )
+
+    return READERS[extension](path, chunkSize=chunkSize)
+
+
+def accumulate(reader, method=0, withSupport=False):
+    """
+    Streams the moments of a file.
+
+    :param reader(GeometryReader): opened reader.
+    :param method(int): 1 for area weighted triangle moments, point moments
+        otherwise.
+    :param withSupport(bool): also gather the support points.
+
+    Raises:
+        `RuntimeError` if the file has no points (or faces for method 1).
+
+    Returns:
+        (OBB.moments.Moments)
+    """
+    accumulator = MomentAccumulator(withSupport=withSupport)
+
+    if method == 1:
+        for triangles in reader.iter_triangles():
+            accumulator.add_triangles(reader.points, triangles, chunkSize=None)
+
+        if accumulator.weight <= 0.0:
+            raise RuntimeError("Triangles have no area to build a bounding box.")
+    else:
+        for points in reader.iter_points():
+            accumulator.add_points(points)
+
+    return accumulator.moments
+
+
+def build_from_file(path, method=0, chunkSize=CHUNK_SIZE):
+    """
+    Bounding box of a geometry file, streamed in chunks.
+
+    :param path(str): PLY, OBJ or XYZ file.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param chunkSize(int): records read per chunk.
+
+    Raises:
+        `RuntimeError` if the file or method is unsupported.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    with open_reader(path, chunkSize=chunkSize) as reader:
+        return build_from_reader(reader, method=method)
+
+
+def build_from_reader(reader, method=0, maxTime=core.MIN_VOLUME_TIME):
+    """
+    Bounding box of an opened reader's geometry, streamed in chunks.
+
+    The points and triangles methods stream the moments and then the
+    extents. The hull, DiTO and minimum volume methods only depend on the
+    convex hull, so they run on the support points gathered while
+    streaming (the extents take one more pass without scipy).
+
+    :param reader(GeometryReader): opened reader.
+    :param method(int): 0(from_points), 1(from_triangles), 2(from_hull),
+        3(from_dito) or 4(from_min_volume).
+    :param maxTime(float): time budget in seconds of the minimum volume
+        search, None for no limit.
+
+    Raises:
+        `RuntimeError` if the method is unsupported.
+
+    Returns:
+        EigenVectors(numpy.ndarray) (3, 3) with one axis per row.
+        CenterPoint(numpy.ndarray) (3,)
+        BoundingExtents(numpy.ndarray) (3,)
+    """
+    builders = {
+        2: core.build_from_hull,
+        3: core.build_from_dito,
+        4: core.build_from_min_volume,
+    }
+    if method not in (0, 1) and method not in builders:
+        raise RuntimeError(
+            "Method unsupported! Please use 0(from_points), 1(from_triangles), "
+            "2(from_hull), 3(from_dito) or 4(from_min_volume)."
+        )
+
+    if method in builders:
+        moments = accumulate(reader, method=0, withSupport=True)
+        if method == 4:
+            eigenVectors = core.build_from_min_volume(
+                moments.support, maxTime=maxTime
+            )[0]
+        else:
+            eigenVectors = builders[method](moments.support)[0]
+        if hullMethod:
+            return core.fit_axes(eigenVectors, moments.support)
+    else:
+        moments = accumulate(reader, method=method)
+        eigenVectors = eigh3(moments.covariance)[1].T
+
+    return core.fit_axes_chunks(eigenVectors, reader.iter_points())
+
+
+class _Spill(object):
+    """
+    :class:`_Spill` Temporary binary file of fixed width records.
+    """
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+
+        self._stream = open(path, "wb")
+
+    def write(self, values):
+        """
+        Appends values to the file.
+        """
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        values.tofile(self._stream)
+        self.count += values.size
+
+    def array(self, width):
+        """
+        Closes the file and memory maps it as (count / width, width).
+        """
+        self._stream.close()
+
+        if not self.count:
+            return np.empty((0, width), dtype=self.dtype)
+
+        return np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            shape=(self.count // width, width),
+        )
+
+
+def _record_dtype(properties, order, lengths):
+    """
+    Fixed width dtype of binary PLY records with the given list lengths.
+
+    :param properties(list of tuples): element properties.
+    :param order(str): "<" or ">" byte order.
+    :param lengths(dict): length of every list property.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.dtype) structured record dtype, ``<list>_count`` fields
+        holding the list lengths.
+    """
+    return np.dtype(
+        [
+            field
+            for prop, kind in properties
+            for field in (
+                [(prop + "_count", order + kind[0]),
+                 (prop, order + kind[1], (lengths[prop],))]
+                if isinstance(kind, tuple)
+                else [(prop, order + kind)]
+            )
+        ]
+    )
+
+
+def _fan_lists(data, starts, lengths, dtype):
+    """
+    Gathers binary lists of polygon indices and fans them into triangles.
+
+    :param data(numpy.ndarray): (B,) bytes of the element.
+    :param starts(list of int): byte position of every list.
+    :param lengths(list of int): number of indices of every list.
+    :param dtype(numpy.dtype): index type with byte order.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (M, 3) triangles, in the order of the polygons.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+
+    # Flat index of every polygon's first value, then byte of every value.
+    firsts = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - firsts * dtype.itemsize, lengths)
+    positions += np.arange(lengths.sum()) * dtype.itemsize
+
+    values = data[positions[:, None] + np.arange(dtype.itemsize)].view(dtype)
+    values = values.reshape(-1).astype(np.int64)
+
+    # Polygon and fan corner of every triangle.
+    fans = np.maximum(lengths - 2, 0)
+    polygons = np.repeat(np.arange(len(lengths)), fans)
+    corners = np.arange(fans.sum()) - np.repeat(np.cumsum(fans) - fans, fans) + 1
+
+    base = firsts[polygons]
+
+    return np.column_stack(
+        [values[base], values[base + corners], values[base + corners + 1]]
+    )
+
+
+def _fan(polygons):
+    """
+    Fans polygons of one vertex count into triangles.
+
+    :param polygons(numpy.ndarray): (P, K) polygon vertex indices.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (P * (K - 2), 3) triangles.
+    """
+    polygons = np.asarray(polygons, dtype=np.int64)
+    if polygons.ndim != 2 or polygons.shape[1] < 3:
+        return np.empty((0, 3), dtype=np.int64)
+
+    return np.concatenate(
+        [polygons[:, [0, i, i + 1]] for i in range(1, polygons.shape[1] - 1)]
+    )
+
+
+def _triangulate(polygons):
+    """
+    Fans polygons of any vertex count into triangles.
+
+    :param polygons(list of sequences): polygon vertex indices.
+
+    Raises:
+        None
+
+    Returns:
+        (numpy.ndarray) (M, 3) triangles.
+    """
+    groups = {}
+    for polygon in polygons:
+        groups.setdefault(len(polygon), []).append(polygon)
+
+    triangles = [
+        _fan(np.array(group, dtype=np.int64))
+        for length, group in groups.items()
+        if length >= 3
+    ]
+    if not triangles:
+        return np.empty((0, 3), dtype=np.int64)
+
+    return np.concatenate(triangles)
+
+
+def _numeric(tokens):
+    """
+    Whether every token parses as a float.
+    """
+    try:
+        [float(token) for token in tokens]
+    except ValueError:
+        return False
+
+    return True
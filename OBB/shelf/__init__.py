@@ -16,14 +16,17 @@ buttons = OrderedDict(
             "command": (
                 "from maya import cmds\n"
                 "from OBB.api import OBB\n"
+                "from OBB.cache import BoxCache\n"
+                "if OBB.cache is None:\n"
+                "   OBB.cache = BoxCache()\n"
                 "meshes = cmds.ls(selection=True)\n"
                 "if len(meshes) == 0:\n"
                 '   raise RuntimeError("Nothing selected!")\n'
-                "for mesh in meshes:\n"
-                "   obbBoundBoxPnts = OBB.from_points(mesh)\n"
+                "obbBoundBoxes = OBB.batch(meshes)\n"
+                "for mesh, matrix in zip(meshes, obbBoundBoxes.matrices.tolist()):\n"
                 "   obbCube = cmds.polyCube(ch=False,\n"
                 '                           name="{}_BBOX".format(mesh))[0]\n'
-                "   cmds.xform(obbCube, matrix=obbBoundBoxPnts.matrix)"
+                "   cmds.xform(obbCube, matrix=matrix)"
             ),
             "sourceType": "python",
             "style": "iconOnly",
@@ -57,16 +60,19 @@ buttons = OrderedDict(
             "command": (
                 "from maya import cmds\n"
                 "from OBB.api import OBB\n"
+                "from OBB.cache import BoxCache\n"
+                "if OBB.cache is None:\n"
+                "   OBB.cache = BoxCache()\n"
                 "meshes = cmds.ls(selection=True)\n"
                 "if len(meshes) == 0:\n"
                 '   raise RuntimeError("Nothing selected!")\n'
-                "for mesh in meshes:\n"
-                "   obbBoundBoxPnts = OBB.from_points(mesh)\n"
+                "obbBoundBoxes = OBB.batch(meshes)\n"
+                "for mesh, matrix in zip(meshes, obbBoundBoxes.matrices.tolist()):\n"
                 "   lattice = cmds.lattice(dv=(2, 2, 2),\n"
                 "                          objectCentered=True,\n"
                 '                          name="{}_LATTICEBOX".format(mesh))\n'
-                "   cmds.xform(lattice[1], matrix=obbBoundBoxPnts.matrix)\n"
-                "   cmds.xform(lattice[2], matrix=obbBoundBoxPnts.matrix)"
+                "   cmds.xform(lattice[1], matrix=matrix)\n"
+                "   cmds.xform(lattice[2], matrix=matrix)"
             ),
             "sourceType": "python",
             "style": "iconOnly",
@@ -1,17 +1,48 @@
 from math import sqrt
 
+import numpy as np
 
-def eigh(a, tol=1.0e-9):
+
+class lazy_property(object):
+    """
+    Property computed on first access and memoized on the instance.
+
+    The value is stored in the instance ``__dict__`` under the same name,
+    which shadows this (non data) descriptor on every later access.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = instance.__dict__[self.__name__] = self.func(instance)
+
+        return value
+
+
+def eigh(a, tol=1.0e-9, vectors=None):
     """
     Calculates the eigenValues and vectors using jacobi method.
     Code configured without numpy from http://goo.gl/U3m7nX
 
+    :param a(3x3 list of floats): symmetric matrix, modified in place
+        unless vectors are given.
+    :param tol(float): largest off diagonal element left.
+    :param vectors(3x3 list of floats): starting eigen vectors as columns,
+        such as the previous frame's. The closer they are, the fewer
+        rotations are needed.
+
     Returns:
         (list of 3 floats) EigenValues
         (3x3 list of floats) EigenVectors
 
     Raises:
-        None
+        `RuntimeError` if it does not converge within the rotation limit.
     """
     # Find largest off-diag. element a[k][l]
     def maxElem(a):
@@ -68,6 +99,12 @@ def eigh(a, tol=1.0e-9):
          [0.0, 1.0, 0.0],
          [0.0, 0.0, 1.0]]
 
+    if vectors is not None:
+        # Solve in the starting basis, it is already close to diagonal.
+        p = np.asarray(vectors, dtype=np.float64)
+        a = np.dot(p.T, np.dot(a, p)).tolist()
+        p = p.tolist()
+
     # Jacobi rotation loop
     for i in range(maxRot):
 
@@ -77,3 +114,200 @@ def eigh(a, tol=1.0e-9):
             return [a[i][i] for i in range(len(a))], p
 
         rotate(a, p, k, l)
+
+    raise RuntimeError(
+        "Jacobi eigen solve did not converge in %s rotations." % maxRot
+    )
+
+
+def eigh3(a):
+    """
+    Calculates the eigenValues and vectors of a symmetric 3x3 matrix.
+
+    Single matrix version of :func:`batch_eigh3`.
+
+    :param a(array like): symmetric 3x3 matrix.
+
+    Returns:
+        (numpy.ndarray) (3,) EigenValues in ascending order.
+        (numpy.ndarray) (3, 3) EigenVectors as columns.
+
+    Raises:
+        None
+    """
+    eigenValues, eigenVectors = batch_eigh3(np.asarray(a)[None])
+
+    return eigenValues[0], eigenVectors[0]
+
+
+def batch_eigh3(a, tol=1.0e-6):
+    """
+    Calculates the eigenValues and vectors of a stack of symmetric 3x3
+    matrices.
+
+    Uses the closed form trigonometric solution for the eigenValues and
+    builds the eigenVectors from the most separated eigenValue first,
+    which keeps them orthonormal for repeated eigenValues.  Matrices whose
+    residual is still above ``tol`` (relative to the matrix scale) are
+    re-solved with ``numpy.linalg.eigh``.
+
+    :param a(numpy.ndarray): (K, 3, 3) symmetric matrices.
+    :param tol(float): relative residual accepted from the closed form.
+
+    Returns:
+        (numpy.ndarray) (K, 3) EigenValues in ascending order.
+        (numpy.ndarray) (K, 3, 3) EigenVectors as columns.
+
+    Raises:
+        None
+    """
+    a = np.asarray(a, dtype=np.float64)
+    a = (a + np.swapaxes(a, 1, 2)) * 0.5
+    count = len(a)
+
+    # Scale to avoid over and underflow in the cubic.
+    scale = np.abs(a).reshape(count, 9).max(axis=1)
+    scale[scale == 0.0] = 1.0
+    b = a / scale[:, None, None]
+
+    q = np.trace(b, axis1=1, axis2=2) / 3.0
+    shifted = b - q[:, None, None] * np.eye(3)
+
+    p = np.sqrt((shifted ** 2).sum(axis=(1, 2)) / 6.0)
+    isotropic = p <= 1.0e-12
+    p[isotropic] = 1.0
+
+    half_det = np.linalg.det(shifted / p[:, None, None]) * 0.5
+    phi = np.arccos(np.clip(half_det, -1.0, 1.0)) / 3.0
+
+    largest = q + 2.0 * p * np.cos(phi)
+    smallest = q + 2.0 * p * np.cos(phi + 2.0 * np.pi / 3.0)
+    middle = 3.0 * q - largest - smallest
+
+    eigenValues = np.stack([smallest, middle, largest], axis=1)
+    eigenValues[isotropic] = q[isotropic, None]
+
+    # Solve the best separated eigenValue first, the remaining pair is
+    # solved in its orthogonal complement.
+    solveLargest = (largest - middle) >= (middle - smallest)
+    first = np.where(solveLargest, largest, smallest)
+    second = middle
+
+    v0 = _null_vector(b - first[:, None, None] * np.eye(3))
+    u, v = _orthogonal_complement(v0)
+    v1 = _complement_vector(b, u, v, second)
+    v2 = np.cross(v0, v1)
+
+    eigenVectors = np.empty_like(b)
+    eigenVectors[:, :, 1] = v1
+    eigenVectors[:, :, 0] = np.where(solveLargest[:, None], v2, v0)
+    eigenVectors[:, :, 2] = np.where(solveLargest[:, None], v0, v2)
+    eigenVectors[isotropic] = np.eye(3)
+
+    eigenValues *= scale[:, None]
+
+    # Robust fallback for whatever the closed form could not resolve.
+    residual = np.abs(
+        np.matmul(a, eigenVectors) - eigenVectors * eigenValues[:, None, :]
+    ).reshape(count, 9).max(axis=1)
+    failed = ~(residual <= tol * scale)
+
+    if failed.any():
+        eigenValues[failed], eigenVectors[failed] = np.linalg.eigh(a[failed])
+
+    return eigenValues, eigenVectors
+
+
+def _null_vector(m):
+    """
+    Unit vectors orthogonal to the rows of a stack of rank 2 matrices.
+
+    :param m(numpy.ndarray): (K, 3, 3) matrices.
+
+    Returns:
+        (numpy.ndarray) (K, 3) unit vectors.
+
+    Raises:
+        None
+    """
+    crosses = np.stack(
+        [
+            np.cross(m[:, 0], m[:, 1]),
+            np.cross(m[:, 0], m[:, 2]),
+            np.cross(m[:, 1], m[:, 2]),
+        ],
+        axis=1,
+    )
+    lengths = (crosses ** 2).sum(axis=2)
+    best = lengths.argmax(axis=1)
+
+    vector = crosses[np.arange(len(m)), best]
+    length = np.sqrt(lengths[np.arange(len(m)), best])
+
+    degenerate = length == 0.0
+    length[degenerate] = 1.0
+    vector[degenerate] = (1.0, 0.0, 0.0)
+
+    return vector / length[:, None]
+
+
+def _orthogonal_complement(w):
+    """
+    Two unit vectors completing each unit vector into an orthonormal basis.
+
+    :param w(numpy.ndarray): (K, 3) unit vectors.
+
+    Returns:
+        (numpy.ndarray) (K, 3) U vectors.
+        (numpy.ndarray) (K, 3) V vectors.
+
+    Raises:
+        None
+    """
+    zeros = np.zeros(len(w))
+    useX = np.abs(w[:, 0]) > np.abs(w[:, 1])
+
+    u = np.where(
+        useX[:, None],
+        np.stack([-w[:, 2], zeros, w[:, 0]], axis=1),
+        np.stack([zeros, w[:, 2], -w[:, 1]], axis=1),
+    )
+    u /= np.linalg.norm(u, axis=1)[:, None]
+
+    return u, np.cross(w, u)
+
+
+def _complement_vector(a, u, v, eigenValue):
+    """
+    Eigen vector of ``a`` for ``eigenValue`` restricted to the plane (u, v).
+
+    :param a(numpy.ndarray): (K, 3, 3) symmetric matrices.
+    :param u(numpy.ndarray): (K, 3) first plane vectors.
+    :param v(numpy.ndarray): (K, 3) second plane vectors.
+    :param eigenValue(numpy.ndarray): (K,) eigen values.
+
+    Returns:
+        (numpy.ndarray) (K, 3) unit vectors.
+
+    Raises:
+        None
+    """
+    au = np.einsum("kij,kj->ki", a, u)
+    av = np.einsum("kij,kj->ki", a, v)
+
+    m00 = (u * au).sum(axis=1) - eigenValue
+    m01 = (u * av).sum(axis=1)
+    m11 = (v * av).sum(axis=1) - eigenValue
+
+    # Perpendicular to the larger row of the 2x2 (m - eigenValue) matrix.
+    useRow0 = (m00 ** 2 + m01 ** 2) >= (m01 ** 2 + m11 ** 2)
+    x = np.where(useRow0, m01, m11)
+    y = np.where(useRow0, -m00, -m01)
+
+    length = np.sqrt(x ** 2 + y ** 2)
+    degenerate = length == 0.0
+    x[degenerate] = 1.0
+    y[degenerate] = 0.0
+    length[degenerate] = 1.0
+
+    return (x / length)[:, None] * u + (y / length)[:, None] * v
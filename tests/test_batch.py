@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the batched paths against the serial ones.
+"""
+import unittest
+
+import numpy as np
+
+from OBB import core
+from tests.test_core import BoxTestCase
+from tests.test_core import random_points
+
+
+class TestBatchBuild(BoxTestCase):
+    def setUp(self):
+        self.pointsList = [
+            random_points(count, seed=i) * (i + 1)
+            for i, count in enumerate((5, 9, 300, 2000, 50))
+        ]
+        self.meshes = [core.convex_hull(points) for points in self.pointsList]
+
+    def test_points(self):
+        result = core.batch_build(self.pointsList, method=0)
+
+        for box, points in zip(result, self.pointsList):
+            self.assertSameBox(box, core.build_from_points(points))
+
+    def test_triangles(self):
+        result = core.batch_build(
+            [points for points, _ in self.meshes],
+            method=1,
+            trianglesList=[triangles for _, triangles in self.meshes],
+        )
+
+        for box, (points, triangles) in zip(result, self.meshes):
+            self.assertSameBox(box, core.build_from_triangles(points, triangles))
+
+    def test_hull(self):
+        result = core.batch_build(self.pointsList, method=2)
+
+        for box, points in zip(result, self.pointsList):
+            self.assertSameBox(box, core.build_from_hull(points))
+
+    def test_dito(self):
+        result = core.batch_build(self.pointsList, method=3)
+
+        for box, points in zip(result, self.pointsList):
+            self.assertSameBox(box, core.build_from_dito(points))
+
+    def test_min_volume(self):
+        result = core.batch_build(self.pointsList, method=4)
+
+        for box, points in zip(result, self.pointsList):
+            self.assertContains(box, points)
+
+    def test_empty_mesh(self):
+        with self.assertRaises(RuntimeError):
+            core.batch_build([self.pointsList[0], np.empty((0, 3))])
+
+
+class TestBatchFrames(BoxTestCase):
+    def setUp(self):
+        points = random_points(500)
+        self.frames = np.array(
+            [points * (1.0 + 0.1 * frame) + frame for frame in range(6)]
+        )
+
+    def test_frames(self):
+        for method in (0, 2, 3):
+            result = core.batch_build_frames(self.frames, method=method)
+            self.assertEqual(len(result), len(self.frames))
+
+            for box, framePoints in zip(result, self.frames):
+                self.assertContains(box, framePoints)
+                self.assertSameBox(
+                    box, core.batch_build([framePoints], method=method)[0]
+                )
+
+    def test_triangles(self):
+        hullPoints, hullTriangles = core.convex_hull(self.frames[0])
+        frames = np.array([hullPoints * (1.0 + frame) for frame in range(3)])
+
+        result = core.batch_build_frames(frames, method=1, triangles=hullTriangles)
+
+        for box, framePoints in zip(result, frames):
+            self.assertSameBox(
+                box, core.build_from_triangles(framePoints, hullTriangles)
+            )
+
+
+class TestBatchInstances(BoxTestCase):
+    def setUp(self):
+        self.shapes = [random_points(300, seed=1), random_points(800, seed=2) * 0.5]
+        self.shapeIndices = np.array([0, 1, 0, 0, 1])
+
+        self.matrices = np.tile(np.eye(4), (len(self.shapeIndices), 1, 1))
+        self.matrices[:, 3, :3] = np.arange(15).reshape(5, 3)
+        self.matrices[1, :3, :3] *= 2.0
+        self.matrices[2, :3, :3] = [[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        self.matrices[3, :3, :3] = [[1.0, 0.4, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 3.0]]
+
+    def world(self, i):
+        matrix = self.matrices[i]
+
+        return np.dot(self.shapes[self.shapeIndices[i]], matrix[:3, :3]) + matrix[3, :3]
+
+    def test_instances(self):
+        result = core.batch_build_instances(
+            self.shapes, self.shapeIndices, self.matrices
+        )
+        self.assertEqual(len(result), len(self.matrices))
+
+        for i in range(len(result)):
+            self.assertContains(result[i], self.world(i))
+
+        # Similarity transforms follow the shape's axes exactly.
+        for i in (0, 1, 2, 4):
+            self.assertSameBox(result[i], core.build_from_points(self.world(i)))
+
+
+if __name__ == "__main__":
+    unittest.main()
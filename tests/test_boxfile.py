@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the binary box file format.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from OBB import boxfile
+from OBB import core
+from tests.test_core import BoxTestCase
+from tests.test_core import TOLERANCE
+from tests.test_core import random_points
+
+
+class TestBoxFile(BoxTestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp(prefix="OBB_test_")
+        self.path = os.path.join(self.tempDir, "boxes.obb")
+
+        self.result = core.batch_build(
+            [random_points(count, seed=i) for i, count in enumerate((20, 300, 50))]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def write(self, **kwargs):
+        boxfile.write(
+            self.path,
+            self.result.axes,
+            self.result.centers,
+            self.result.extents,
+            **kwargs
+        )
+
+    def test_round_trip(self):
+        hashes = [core.geometry_hash(random_points(10)), None, "f" * 32]
+        self.write(sources=["a", "b", "c"], hashes=hashes)
+
+        boxes = boxfile.load(self.path)
+
+        self.assertEqual(len(boxes), 3)
+        self.assertEqual(boxes.hashes, hashes)
+        self.assertEqual(boxes.names, ["a", "b", "c"])
+
+        for i in range(3):
+            self.assertSameBox(
+                (boxes.axes[i], boxes.centers[i], boxes.extents[i]),
+                (self.result.axes[i], self.result.centers[i], self.result.extents[i]),
+            )
+            self.assertOrthonormal(boxes.axes[i])
+
+    def test_quaternions(self):
+        axes = np.array(self.result.axes)
+        axes[np.linalg.det(axes) < 0.0, 2] *= -1.0
+        expected = axes.copy()
+
+        # Left handed axes come back with their last axis flipped.
+        axes[1, 2] *= -1.0
+        quaternions = boxfile.quaternions_from_axes(axes)
+
+        np.testing.assert_allclose(
+            np.linalg.norm(quaternions, axis=1), 1.0, atol=TOLERANCE
+        )
+        np.testing.assert_allclose(
+            boxfile.axes_from_quaternions(quaternions), expected, atol=TOLERANCE
+        )
+
+    def test_shared_sources(self):
+        self.write(sources=["scene.ma"], sourceIds=[0, 0, 0])
+
+        self.assertEqual(boxfile.load(self.path).names, ["scene.ma"] * 3)
+
+    def test_sources_must_match(self):
+        with self.assertRaises(RuntimeError):
+            self.write(sources=["a", "b"])
+
+        for sourceIds in ([0, 1, 2], [0, -1, 0], [0, 0]):
+            with self.assertRaises(RuntimeError):
+                self.write(sources=["a", "b"], sourceIds=sourceIds)
+
+        with self.assertRaises(RuntimeError):
+            self.write(hashes=[None])
+
+    def test_not_a_box_file(self):
+        with open(self.path, "wb") as stream:
+            stream.write(b"OBB")
+
+        with self.assertRaises(RuntimeError):
+            boxfile.load(self.path)
+
+
+class TestGeometryHash(unittest.TestCase):
+    def test_content(self):
+        points = random_points(100)
+        triangles = np.arange(99).reshape(-1, 3)
+
+        self.assertEqual(
+            core.geometry_hash(points, triangles),
+            core.geometry_hash(points.copy(), triangles.copy()),
+        )
+
+        moved = points.copy()
+        moved[7, 1] += 1e-3
+
+        self.assertNotEqual(core.geometry_hash(points), core.geometry_hash(moved))
+        self.assertNotEqual(
+            core.geometry_hash(points), core.geometry_hash(points, triangles)
+        )
+
+    def test_dtype_and_strides(self):
+        points = random_points(100)
+
+        self.assertNotEqual(
+            core.geometry_hash(points), core.geometry_hash(points.astype(np.float32))
+        )
+
+        strided = np.zeros((100, 6))
+        strided[:, ::2] = points
+
+        self.assertEqual(
+            core.geometry_hash(points), core.geometry_hash(strided[:, ::2])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the in memory and SQLite box caches.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from OBB import core
+from OBB.cache import BoxCache
+from OBB.cache import SqliteBoxCache
+from tests.test_core import random_points
+
+
+def boxes(count):
+    """
+    Keys and boxes of distinct point clouds.
+    """
+    pointsList = [random_points(50, seed=i) for i in range(count)]
+    result = core.batch_build(pointsList)
+
+    keys = [BoxCache.key(core.geometry_hash(points)) for points in pointsList]
+
+    return keys, [result[i] for i in range(count)]
+
+
+class TestBoxCache(unittest.TestCase):
+    def test_get_and_stats(self):
+        cache = BoxCache()
+        keys, built = boxes(2)
+
+        self.assertIsNone(cache.get(keys[0]))
+        cache.put(keys[0], *built[0])
+
+        box = cache.get(keys[0])
+        for array, expected in zip(box[:3], built[0]):
+            np.testing.assert_array_equal(array, expected)
+        self.assertIsNone(box[3])
+        self.assertFalse(box[0].flags.writeable)
+
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1, "size": 1})
+
+    def test_least_recently_used(self):
+        cache = BoxCache(maxSize=2)
+        keys, built = boxes(3)
+
+        cache.put(keys[0], *built[0])
+        cache.put(keys[1], *built[1])
+        cache.get(keys[0])
+        cache.put(keys[2], *built[2])
+
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+        self.assertIn(keys[2], cache)
+
+    def test_options_in_key(self):
+        self.assertNotEqual(
+            BoxCache.key("hash", 0, {"sampleSize": 10}), BoxCache.key("hash", 0)
+        )
+        self.assertEqual(
+            BoxCache.key("hash", 2, {"a": 1, "b": 2}),
+            BoxCache.key("hash", 2, {"b": 2, "a": 1}),
+        )
+
+    def test_default_options_match_batch_keys(self):
+        # Keys of OBB.from_points and OBB.from_min_volume against OBB.batch.
+        self.assertEqual(
+            BoxCache.key("hash", 0, {"sampleSize": None, "seed": None}),
+            BoxCache.key("hash", 0, core.BATCH_OPTIONS.get(0)),
+        )
+        self.assertEqual(
+            BoxCache.key(
+                "hash",
+                4,
+                {
+                    "maxTime": core.MIN_VOLUME_TIME,
+                    "maxIterations": None,
+                    "edgeSearch": False,
+                },
+            ),
+            BoxCache.key("hash", 4, core.BATCH_OPTIONS.get(4)),
+        )
+        self.assertNotEqual(
+            BoxCache.key("hash", 4, {"maxTime": None}),
+            BoxCache.key("hash", 4, core.BATCH_OPTIONS.get(4)),
+        )
+
+    def test_hit_after_batch(self):
+        cache = BoxCache()
+        keys, built = boxes(2)
+
+        def build(indices):
+            return core.batch_build([random_points(50, seed=i) for i in indices])
+
+        cache.batch(keys, build)
+
+        # A single fit with default options finds the batch's box.
+        key = BoxCache.key(keys[1][0], 0, {"sampleSize": None, "seed": None})
+        box = cache.get(key)
+
+        self.assertIsNotNone(box)
+        np.testing.assert_allclose(box[1], built[1][1])
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_batch_builds_missing_once(self):
+        cache = BoxCache()
+        keys, built = boxes(3)
+        cache.put(keys[1], *built[1])
+
+        calls = []
+
+        def build(indices):
+            calls.append(indices)
+            return core.BatchResult(
+                np.array([built[i][0] for i in indices]),
+                np.array([built[i][1] for i in indices]),
+                np.array([built[i][2] for i in indices]),
+            )
+
+        result = cache.batch([keys[0], keys[1], keys[2], keys[0]], build)
+
+        self.assertEqual(calls, [[0, 2]])
+        for box, i in zip(result, (0, 1, 2, 0)):
+            np.testing.assert_array_equal(box[1], built[i][1])
+
+    def test_invalidate(self):
+        cache = BoxCache()
+        keys, built = boxes(2)
+        for key, box in zip(keys, built):
+            cache.put(key, *box)
+
+        self.assertEqual(cache.invalidate(keys[0][0]), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestSqliteBoxCache(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp(prefix="OBB_test_")
+        self.path = os.path.join(self.tempDir, "boxes.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def test_persistence(self):
+        keys, built = boxes(3)
+
+        cache = SqliteBoxCache(self.path)
+        cache.put_many(list(zip(keys, built)))
+        cache.close()
+
+        cache = SqliteBoxCache(self.path)
+        self.assertEqual(cache.stats["stored"], 3)
+        self.assertEqual(cache.prefetch([key[0] for key in keys]), 3)
+
+        for key, expected in zip(keys, built):
+            box = cache.get(key)
+            for array, expectedArray in zip(box[:3], expected):
+                np.testing.assert_array_equal(array, expectedArray)
+        cache.close()
+
+    def test_version(self):
+        keys, built = boxes(1)
+
+        cache = SqliteBoxCache(self.path)
+        cache.put(keys[0], *built[0])
+        cache.close()
+
+        cache = SqliteBoxCache(self.path)
+        cache.version = "0.0.0"
+        self.assertIsNone(cache.get(keys[0]))
+        cache.close()
+
+    def test_eviction(self):
+        keys, built = boxes(4)
+
+        cache = SqliteBoxCache(self.path, maxSize=2)
+        cache.put(keys[0], *built[0])
+        cache.put(keys[1], *built[1])
+        cache.close()
+
+        # The access time of a hit makes keys[0] the most recently used.
+        cache = SqliteBoxCache(self.path, maxSize=2)
+        cache.get(keys[0])
+        cache.flush()
+        cache.put(keys[2], *built[2])
+        cache.close()
+
+        cache = SqliteBoxCache(self.path, maxSize=2)
+        self.assertEqual(cache.stats["stored"], 2)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        cache.close()
+
+    def test_row_count(self):
+        keys, built = boxes(3)
+
+        cache = SqliteBoxCache(self.path, maxSize=2)
+        cache.put_many(list(zip(keys[:2], built[:2])))
+
+        # Replacing a stored box doesn't add a row.
+        cache.put(keys[0], *built[1])
+        self.assertEqual(cache.stats["stored"], 2)
+        np.testing.assert_array_equal(cache.get(keys[0])[1], built[1][1])
+
+        cache.put(keys[2], *built[2])
+        self.assertEqual(cache.stats["stored"], 2)
+
+        cache.invalidate(keys[2][0])
+        self.assertEqual(cache.stats["stored"], 1)
+        cache.close()
+
+        cache = SqliteBoxCache(self.path, maxSize=2)
+        self.assertEqual(cache.stats["stored"], 1)
+        cache.invalidate()
+        self.assertEqual(cache.stats["stored"], 0)
+        cache.close()
+
+    def test_batch_reads_in_bulk(self):
+        keys, built = boxes(4)
+
+        cache = SqliteBoxCache(self.path)
+        cache.put_many(list(zip(keys[:3], built[:3])))
+        cache.close()
+
+        # A small memory LRU, the batch still gets every stored box.
+        cache = SqliteBoxCache(self.path, memorySize=1)
+        statements = []
+        cache._connection().set_trace_callback(statements.append)
+
+        result = cache.batch(
+            keys, lambda indices: core.batch_build([random_points(50, seed=3)])
+        )
+
+        self.assertEqual(
+            len([sql for sql in statements if sql.startswith("SELECT")]), 1
+        )
+        self.assertEqual(cache.stats["hits"], 3)
+        for i in range(4):
+            np.testing.assert_allclose(result[i][1], built[i][1])
+        cache.close()
+
+    def test_journal_mode(self):
+        for shared, mode in ((False, "wal"), (True, "delete")):
+            path = os.path.join(self.tempDir, "%s.sqlite" % mode)
+            cache = SqliteBoxCache(path, shared=shared)
+
+            self.assertEqual(
+                cache._connection().execute("PRAGMA journal_mode").fetchone()[0],
+                mode,
+            )
+            cache.close()
+
+    def test_invalidate(self):
+        keys, built = boxes(2)
+
+        cache = SqliteBoxCache(self.path)
+        cache.put_many(list(zip(keys, built)))
+
+        self.assertEqual(cache.invalidate(keys[0][0]), 1)
+        self.assertEqual(cache.stats["stored"], 1)
+        self.assertIsNone(cache.get(keys[0]))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
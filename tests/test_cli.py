@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the headless batch command line tool.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from OBB import cli
+from OBB import core
+from tests.test_core import BoxTestCase
+from tests.test_core import random_points
+
+
+class TestCli(BoxTestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp(prefix="OBB_test_")
+        self.points = random_points(300).astype(np.float32).astype(np.float64)
+
+        os.makedirs(os.path.join(self.tempDir, "nested"))
+        self.write(
+            os.path.join("nested", "cloud.xyz"),
+            "\n".join("%r %r %r" % tuple(point) for point in self.points.tolist()),
+        )
+        self.write("broken.ply", "solid\nend\n")
+        self.write("notes.txt", "not geometry")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def write(self, name, text):
+        path = os.path.join(self.tempDir, name)
+        with open(path, "w") as stream:
+            stream.write(text)
+
+        return path
+
+    def test_find_files(self):
+        paths = cli.find_files([self.tempDir, os.path.join(self.tempDir, "*.ply")])
+
+        self.assertEqual(
+            [os.path.relpath(path, self.tempDir) for path in paths],
+            ["broken.ply", os.path.join("nested", "cloud.xyz")],
+        )
+
+    def test_failures_dont_stop_the_job(self):
+        output = os.path.join(self.tempDir, "boxes.jsonl")
+
+        code = cli.main([self.tempDir, "-m", "2", "-j", "2", "-o", output, "-q"])
+        self.assertEqual(code, 1)
+
+        with open(output) as stream:
+            records = dict(
+                (os.path.basename(record["path"]), record)
+                for record in map(json.loads, stream)
+            )
+
+        self.assertEqual(sorted(records), ["broken.ply", "cloud.xyz"])
+        self.assertIsNotNone(records["broken.ply"]["error"])
+
+        record = records["cloud.xyz"]
+        self.assertIsNone(record["error"])
+        self.assertSameBox(
+            (
+                np.array(record["axes"]),
+                np.array(record["center"]),
+                np.array(record["extents"]),
+            ),
+            core.build_from_hull(self.points),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the NumPy core.
+"""
+import unittest
+
+import numpy as np
+
+from OBB import core
+
+TOLERANCE = 1e-6
+
+
+def random_points(count=2000, seed=0):
+    """
+    Anisotropic, rotated and offset point cloud.
+    """
+    random = np.random.RandomState(seed)
+    points = random.normal(size=(count, 3)) * [3.0, 2.0, 1.0]
+
+    angle = 0.4
+    rotation = np.array(
+        [
+            [np.cos(angle), np.sin(angle), 0.0],
+            [-np.sin(angle), np.cos(angle), 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+    return np.dot(points, rotation) + [10.0, -5.0, 2.0]
+
+
+def local_points(points, box):
+    """
+    Points in the frame of a box, centered on it.
+    """
+    eigenVectors, center, extents = box
+
+    return np.dot(np.asarray(points, dtype=np.float64) - center, eigenVectors.T)
+
+
+class BoxTestCase(unittest.TestCase):
+    """
+    Assertions shared by the box tests.
+    """
+
+    def assertOrthonormal(self, eigenVectors):
+        np.testing.assert_allclose(
+            np.dot(eigenVectors, eigenVectors.T), np.eye(3), atol=TOLERANCE
+        )
+
+    def assertContains(self, box, points):
+        """
+        The box holds every point and touches the outermost ones.
+        """
+        self.assertOrthonormal(box[0])
+
+        reach = np.abs(local_points(points, box)).max(axis=0)
+        scale = max(np.abs(box[2]).max(), 1.0)
+
+        self.assertTrue((reach <= box[2] + TOLERANCE * scale).all())
+        np.testing.assert_allclose(reach, box[2], atol=TOLERANCE * scale)
+
+    def assertSameBox(self, box, other):
+        """
+        Same box, up to the order and sign of the axes.
+        """
+        np.testing.assert_allclose(box[1], other[1], atol=TOLERANCE)
+        np.testing.assert_allclose(
+            np.prod(box[2]), np.prod(other[2]), rtol=TOLERANCE
+        )
+        np.testing.assert_allclose(
+            np.abs(np.dot(box[0], other[0].T)).max(axis=1), 1.0, atol=TOLERANCE
+        )
+
+
+class TestBuild(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+        self.hullPoints, self.hullTriangles = core.convex_hull(self.points)
+
+    def test_known_box(self):
+        corners = np.array(
+            [[x, y, z] for x in (-3, 3) for y in (-2, 2) for z in (-1, 1)],
+            dtype=np.float64,
+        )
+        eigenVectors, center, extents = core.build_from_points(corners + 5.0)
+
+        np.testing.assert_allclose(center, 5.0, atol=TOLERANCE)
+        np.testing.assert_allclose(sorted(extents), [1.0, 2.0, 3.0], atol=TOLERANCE)
+
+    def test_methods_contain_points(self):
+        boxes = [
+            core.build_from_points(self.points),
+            core.build_from_triangles(self.hullPoints, self.hullTriangles),
+            core.build_from_hull(self.points),
+        ]
+
+        for box in boxes:
+            self.assertContains(box, self.points)
+
+    def test_covariance(self):
+        np.testing.assert_allclose(
+            core.points_covariance(self.points),
+            np.cov(self.points.T, bias=True),
+            atol=TOLERANCE,
+        )
+
+    def test_matrix(self):
+        box = core.build_from_points(self.points)
+        matrix = np.array(core.get_matrix(*box)).reshape(4, 4)
+
+        # Rows are the full box lengths, the center is the translation.
+        np.testing.assert_allclose(matrix[3, :3], box[1], atol=TOLERANCE)
+        np.testing.assert_allclose(
+            sorted(np.sqrt((matrix[:3, :3] ** 2).sum(axis=1))),
+            sorted(box[2] * 2.0),
+            atol=TOLERANCE,
+        )
+        self.assertGreater(np.linalg.det(matrix[:3, :3]), 0.0)
+
+    def test_unsupported_points(self):
+        with self.assertRaises(RuntimeError):
+            core.as_points(np.zeros((4, 2)))
+
+
+class TestTrianglesCovariance(unittest.TestCase):
+    def setUp(self):
+        # Surface of the [-1, 1] cube, 12 outward facing triangles.
+        self.points = np.array(
+            [[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)],
+            dtype=np.float64,
+        )
+        self.triangles = np.array(
+            [
+                [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5],
+                [0, 4, 5], [0, 5, 1], [2, 3, 7], [2, 7, 6],
+                [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+            ]
+        )
+
+    def test_cube_surface(self):
+        # Two faces at x = +-1 and four with x uniform in [-1, 1]:
+        # E[x^2] = (8 * 1 + 16 / 3) / 24 = 5 / 9.
+        np.testing.assert_allclose(
+            core.triangles_covariance(self.points, self.triangles),
+            np.eye(3) * 5.0 / 9.0,
+            atol=1e-12,
+        )
+
+    def test_chunks_and_offset(self):
+        expected = core.triangles_covariance(self.points, self.triangles)
+
+        for chunkSize in (1, 5, None):
+            np.testing.assert_allclose(
+                core.triangles_covariance(
+                    self.points + 1e6, self.triangles, chunkSize=chunkSize
+                ),
+                expected,
+                atol=1e-9,
+            )
+
+    def test_no_area(self):
+        with self.assertRaises(RuntimeError):
+            core.triangles_covariance(self.points, [[0, 1, 1]])
+
+
+class TestHull(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_compact_mesh(self):
+        hullPoints, hullTriangles = core.convex_hull(self.points)
+
+        self.assertLess(len(hullPoints), len(self.points))
+        np.testing.assert_array_equal(
+            np.unique(hullTriangles), np.arange(len(hullPoints))
+        )
+        self.assertTrue(set(map(tuple, hullPoints)) <= set(map(tuple, self.points)))
+
+    def test_extents_over_hull_vertices(self):
+        hullPoints, hullTriangles = core.convex_hull(self.points)
+        cvMatrix = core.triangles_covariance(hullPoints, hullTriangles)
+
+        self.assertSameBox(
+            core.build_from_hull(self.points),
+            core.build_from_covariance_matrix(cvMatrix, self.points),
+        )
+
+
+class TestDito(BoxTestCase):
+    def test_never_looser_than_points(self):
+        for seed in range(4):
+            points = random_points(seed=seed)
+            box = core.build_from_dito(points)
+
+            self.assertContains(box, points)
+            self.assertLessEqual(
+                np.prod(box[2]),
+                np.prod(core.build_from_points(points)[2]) * (1.0 + TOLERANCE),
+            )
+
+    def test_rotated_cube(self):
+        # The covariance of a filled cube is isotropic, its axes are
+        # arbitrary while the corners give DiTO the exact box.
+        random = np.random.RandomState(1)
+        rotation = np.linalg.qr(random.normal(size=(3, 3)))[0]
+
+        cube = random.uniform(-1.0, 1.0, size=(5000, 3))
+        cube[:8] = [[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+        points = np.dot(cube, rotation)
+
+        box = core.build_from_dito(points)
+
+        self.assertContains(box, points)
+        np.testing.assert_allclose(box[2], 1.0, atol=TOLERANCE)
+
+
+class TestMinVolume(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_is_smallest(self):
+        box = core.build_from_min_volume(self.points)
+        self.assertContains(box, self.points)
+
+        for build in (
+            core.build_from_points,
+            core.build_from_hull,
+            core.build_from_dito,
+        ):
+            self.assertLessEqual(
+                np.prod(box[2]),
+                np.prod(build(self.points)[2]) * (1.0 + TOLERANCE),
+            )
+
+    def test_budget(self):
+        dito = core.build_from_dito(self.points)
+
+        for budget in ({"maxTime": 0.0}, {"maxIterations": 1}):
+            box = core.build_from_min_volume(self.points, edgeSearch=True, **budget)
+
+            self.assertContains(box, self.points)
+            self.assertLessEqual(
+                np.prod(box[2]), np.prod(dito[2]) * (1.0 + TOLERANCE)
+            )
+
+
+class TestSampled(BoxTestCase):
+    def setUp(self):
+        self.points = random_points(20000)
+
+    def test_sample_points(self):
+        for stratified in (True, False):
+            sample = core.sample_points(
+                self.points, 500, stratified=stratified, seed=1
+            )
+
+            self.assertEqual(len(sample), 500)
+            self.assertEqual(len(set(map(tuple, sample))), 500)
+
+        self.assertIs(core.sample_points(self.points, len(self.points)), self.points)
+
+    def test_sampled_box_contains_points(self):
+        box = core.build_from_sampled_points(self.points, sampleSize=500, seed=1)
+
+        self.assertContains(box, self.points)
+        np.testing.assert_allclose(
+            np.abs(np.dot(box[0], core.build_from_points(self.points)[0].T)).max(
+                axis=1
+            ),
+            1.0,
+            atol=1e-2,
+        )
+
+    def test_progressive_last_box_is_exact(self):
+        boxes = list(core.iter_progressive(self.points, initialSize=256, seed=1))
+
+        self.assertGreater(len(boxes), 1)
+        self.assertFalse(any(box[4] for box in boxes[:-1]))
+        self.assertTrue(boxes[-1][4])
+        self.assertContains(boxes[-1][:3], self.points)
+
+    def test_progressive_tolerance(self):
+        boxes = list(
+            core.iter_progressive(
+                self.points, initialSize=256, tolerance=np.inf, seed=1
+            )
+        )
+
+        self.assertEqual(len(boxes), 1)
+        self.assertContains(boxes[0][:3], self.points)
+
+    def test_progressive_matrix(self):
+        matrix = np.eye(4)
+        matrix[:3, :3] = [[0.0, 2.0, 0.0], [-2.0, 0.0, 0.0], [0.0, 0.0, 2.0]]
+        matrix[3, :3] = [1.0, 2.0, 3.0]
+
+        world = np.dot(self.points, matrix[:3, :3]) + matrix[3, :3]
+
+        boxes = core.iter_progressive(
+            self.points, initialSize=256, seed=1, matrix=matrix
+        )
+        expected = core.iter_progressive(world, initialSize=256, seed=1)
+
+        for box, other in zip(boxes, expected):
+            for array, otherArray in zip(box[:3], other[:3]):
+                np.testing.assert_allclose(array, otherArray, atol=TOLERANCE)
+
+
+class TestVoxelDecimate(BoxTestCase):
+    def brute_force(self, points, cellSize):
+        cells = np.floor((points - points.min(axis=0)) / cellSize).astype(int)
+
+        kept = set()
+        for cell in np.unique(cells, axis=0):
+            indices = np.flatnonzero((cells == cell).all(axis=1))
+            for axis in range(3):
+                for index in (
+                    points[indices, axis].argmin(),
+                    points[indices, axis].argmax(),
+                ):
+                    kept.add(tuple(points[indices[index]]))
+
+        return kept
+
+    def test_cell_extremes(self):
+        points = random_points(5000)
+        decimated = core.voxel_decimate(points, 3.0)
+
+        self.assertEqual(set(map(tuple, decimated)), self.brute_force(points, 3.0))
+
+    def test_hashed_cells_are_a_subset(self):
+        points = random_points(500)
+        decimated = core.voxel_decimate(points, 0.01)
+
+        self.assertTrue(set(map(tuple, decimated)) <= set(map(tuple, points)))
+
+    def test_hull_contains_points(self):
+        points = random_points()
+        box = core.build_from_hull(points, voxelSize=0.5)
+
+        self.assertContains(box, points)
+
+    def test_cell_size(self):
+        with self.assertRaises(RuntimeError):
+            core.voxel_decimate(random_points(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the temporal, rigid and incremental fitters.
+"""
+import unittest
+
+import numpy as np
+
+from OBB import core
+from tests.test_core import BoxTestCase
+from tests.test_core import random_points
+
+
+class TestTemporalFitter(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_axes_follow_the_frames(self):
+        fitter = core.TemporalFitter()
+
+        previous = None
+        for frame in range(5):
+            angle = 0.05 * frame
+            rotation = np.array(
+                [
+                    [np.cos(angle), 0.0, np.sin(angle)],
+                    [0.0, 1.0, 0.0],
+                    [-np.sin(angle), 0.0, np.cos(angle)],
+                ]
+            )
+            framePoints = np.dot(self.points, rotation) * (1.0 + 0.05 * frame)
+            box = fitter.fit(framePoints)
+
+            self.assertContains(box, framePoints)
+            self.assertSameBox(box, core.build_from_points(framePoints))
+
+            # No axis flips or swaps between frames.
+            if previous is not None:
+                self.assertTrue(
+                    (np.einsum("ij,ij->i", box[0], previous) > 0.9).all()
+                )
+            previous = box[0]
+
+        self.assertEqual(fitter.solves, 5)
+
+    def test_static_frames_skip_the_solve(self):
+        fitter = core.TemporalFitter(method=2)
+        result = fitter.fit_frames([self.points + frame for frame in range(4)])
+
+        self.assertEqual((fitter.solves, fitter.skips), (1, 3))
+        for box, frame in zip(result, range(4)):
+            self.assertContains(box, self.points + frame)
+
+    def test_needs_a_covariance_method(self):
+        with self.assertRaises(RuntimeError):
+            core.TemporalFitter(method=3)
+
+        with self.assertRaises(RuntimeError):
+            core.TemporalFitter(method=1)
+
+
+class TestRigidFitter(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+        self.rotation = np.eye(4)
+        self.rotation[:3, :3] = [[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        self.rotation[3, :3] = [4.0, 5.0, 6.0]
+
+        self.shear = np.eye(4)
+        self.shear[:3, :3] = [[1.0, 0.5, 0.0], [0.0, 1.0, 0.0], [0.0, 0.2, 2.0]]
+
+    def transformed(self, matrix):
+        return np.dot(self.points, matrix[:3, :3]) + matrix[3, :3]
+
+    def test_fit_matrices(self):
+        for method in (0, 2, 3):
+            fitter = core.RigidFitter(self.points, method=method)
+            result = fitter.fit_matrices(np.array([self.rotation, self.shear]))
+
+            for box, matrix in zip(result, (self.rotation, self.shear)):
+                self.assertContains(box, self.transformed(matrix))
+
+        # Rotations carry the object space box over exactly.
+        result = core.RigidFitter(self.points).fit_matrices(self.rotation)
+        self.assertSameBox(
+            result[0], core.build_from_points(self.transformed(self.rotation))
+        )
+
+    def test_transform_boxes(self):
+        axes, center, extents = core.build_from_points(self.points)
+        scaled = self.rotation.copy()
+        scaled[:3, :3] *= 2.0
+
+        result, similar = core.transform_boxes(
+            axes[None],
+            center[None],
+            extents[None],
+            np.array([self.rotation, scaled, self.shear]),
+        )
+
+        np.testing.assert_array_equal(similar, [True, True, False])
+        for i, matrix in enumerate((self.rotation, scaled)):
+            self.assertSameBox(
+                result[i], core.build_from_points(self.transformed(matrix))
+            )
+
+        # Boxes that aren't carried over are handed back as they were.
+        np.testing.assert_allclose(result[2][0], axes, atol=1e-12)
+        np.testing.assert_allclose(result[2][2], extents, atol=1e-12)
+
+
+class TestIncrementalFitter(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_edits(self):
+        fitter = core.IncrementalFitter(self.points)
+
+        random = np.random.RandomState(2)
+        for step in range(20):
+            indices = random.choice(len(self.points), 10, replace=False)
+            self.points[indices] += random.normal(size=(10, 3)) * 3.0
+            fitter.update(indices, self.points[indices])
+
+            self.assertContains(fitter.box, self.points)
+
+        np.testing.assert_allclose(
+            fitter.covariance, np.cov(self.points.T, bias=True), atol=1e-9
+        )
+
+    def test_small_edits_skip_the_solve(self):
+        fitter = core.IncrementalFitter(self.points)
+        index = np.abs(self.points - self.points.mean(axis=0)).sum(axis=1).argmin()
+
+        fitter.update([index], self.points[index] + 1e-3)
+
+        self.assertEqual((fitter.solves, fitter.scans), (1, 1))
+
+    def test_no_points(self):
+        with self.assertRaises(RuntimeError):
+            core.IncrementalFitter(np.empty((0, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the mergeable moment summaries.
+"""
+import unittest
+
+import numpy as np
+
+from OBB import core
+from OBB.moments import AREA_WEIGHTED
+from OBB.moments import POINT_WEIGHTED
+from OBB.moments import MomentAccumulator
+from OBB.moments import Moments
+from tests.test_core import BoxTestCase
+from tests.test_core import TOLERANCE
+from tests.test_core import random_points
+
+
+class TestMoments(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_merge_matches_whole(self):
+        chunks = np.array_split(self.points, 5)
+        parts = [Moments.from_points(chunk) for chunk in chunks]
+
+        merged = Moments.merge(parts)
+        whole = Moments.from_points(self.points)
+
+        self.assertEqual(merged.kind, POINT_WEIGHTED)
+        np.testing.assert_allclose(merged.weight, whole.weight)
+        np.testing.assert_allclose(merged.mean, whole.mean, atol=TOLERANCE)
+        np.testing.assert_allclose(
+            merged.covariance, whole.covariance, atol=TOLERANCE
+        )
+
+        self.assertContains(core.build_from_moments(merged), self.points)
+        self.assertSameBox(
+            core.build_from_moments(parts[0] + parts[1]),
+            core.build_from_points(np.concatenate(chunks[:2])),
+        )
+
+    def test_triangles_match_covariance(self):
+        hullPoints, hullTriangles = core.convex_hull(self.points)
+        moments = Moments.from_triangles(hullPoints, hullTriangles)
+
+        self.assertEqual(moments.kind, AREA_WEIGHTED)
+        np.testing.assert_allclose(
+            moments.covariance,
+            core.triangles_covariance(hullPoints, hullTriangles),
+            atol=TOLERANCE,
+        )
+
+    def test_kinds_dont_mix(self):
+        hullPoints, hullTriangles = core.convex_hull(self.points)
+
+        points = Moments.from_points(hullPoints)
+        area = Moments.from_triangles(hullPoints, hullTriangles)
+
+        with self.assertRaises(RuntimeError):
+            Moments.merge([points, area])
+
+        accumulator = MomentAccumulator()
+        accumulator.add_points(hullPoints)
+        with self.assertRaises(RuntimeError):
+            accumulator.add_triangles(hullPoints, hullTriangles)
+
+    def test_nothing_to_merge(self):
+        with self.assertRaises(RuntimeError):
+            Moments.merge([])
+
+
+class TestAccumulator(BoxTestCase):
+    def setUp(self):
+        self.points = random_points()
+
+    def test_point_chunks(self):
+        for chunkSize in (1, 37, None):
+            accumulator = MomentAccumulator(withSupport=False)
+            accumulator.add_points(self.points, chunkSize=chunkSize)
+
+            np.testing.assert_allclose(
+                accumulator.moments.covariance,
+                np.cov(self.points.T, bias=True),
+                atol=TOLERANCE,
+            )
+
+    def test_triangle_chunks(self):
+        hullPoints, hullTriangles = core.convex_hull(self.points)
+        expected = core.triangles_covariance(hullPoints, hullTriangles)
+
+        for chunkSize in (1, 37, None):
+            accumulator = MomentAccumulator()
+            accumulator.add_triangles(hullPoints, hullTriangles, chunkSize=chunkSize)
+
+            np.testing.assert_allclose(
+                accumulator.moments.covariance, expected, atol=TOLERANCE
+            )
+            self.assertContains(
+                core.build_from_moments(accumulator.moments), hullPoints
+            )
+
+    def test_float32_far_from_origin(self):
+        # Summing raw float32 squares this far out loses every digit.
+        points = (self.points + 1e5).astype(np.float32)
+        expected = np.cov(points.astype(np.float64).T, bias=True)
+
+        np.testing.assert_allclose(
+            core.points_covariance(points), expected, rtol=1e-6, atol=1e-9
+        )
+        np.testing.assert_allclose(
+            Moments.from_points(points, chunkSize=100).covariance,
+            expected,
+            rtol=1e-6,
+            atol=1e-9,
+        )
+        self.assertContains(core.build_from_points(points), points)
+
+    def test_batch_covariance_far_from_origin(self):
+        meshes = [
+            core.convex_hull(random_points(count, seed=i) + 1e5)
+            for i, count in enumerate((50, 300, 2000))
+        ]
+        points, offsets, triangles, triangleOffsets = core.concatenate(
+            [hullPoints for hullPoints, _ in meshes],
+            [hullTriangles for _, hullTriangles in meshes],
+        )
+
+        pointsCovariances = core.batch_points_covariance(points, offsets)
+        trianglesCovariances = core.batch_triangles_covariance(
+            points, offsets, triangles, triangleOffsets
+        )
+
+        for i, (hullPoints, hullTriangles) in enumerate(meshes):
+            np.testing.assert_allclose(
+                pointsCovariances[i],
+                np.cov(hullPoints.T, bias=True),
+                atol=TOLERANCE,
+            )
+            np.testing.assert_allclose(
+                trianglesCovariances[i],
+                Moments.from_triangles(hullPoints, hullTriangles).covariance,
+                atol=TOLERANCE,
+            )
+
+    def test_nothing_accumulated(self):
+        with self.assertRaises(RuntimeError):
+            MomentAccumulator().moments
+
+
+if __name__ == "__main__":
+    unittest.main()
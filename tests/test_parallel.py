@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the process and thread pool batch fitting.
+"""
+import unittest
+
+from OBB import core
+from OBB import parallel
+from tests.test_core import BoxTestCase
+from tests.test_core import random_points
+
+
+class TestParallel(BoxTestCase):
+    def setUp(self):
+        self.pointsList = [
+            random_points(count, seed=i)
+            for i, count in enumerate((50, 4000, 90, 7, 60, 3000, 5, 8))
+        ]
+
+    def assertSameBatch(self, result, expected):
+        self.assertEqual(len(result), len(expected))
+
+        for box, other in zip(result, expected):
+            self.assertSameBox(box, other)
+
+    def test_process(self):
+        expected = core.batch_build(self.pointsList)
+
+        for chunkSize in (1, 3, None):
+            self.assertSameBatch(
+                parallel.batch_build(
+                    self.pointsList, workers=2, chunkSize=chunkSize, executor="process"
+                ),
+                expected,
+            )
+
+    def test_thread(self):
+        expected = core.batch_build(self.pointsList, method=2)
+
+        self.assertSameBatch(
+            parallel.batch_build(
+                self.pointsList, method=2, workers=3, executor="thread"
+            ),
+            expected,
+        )
+
+        future = parallel.batch_build_async(self.pointsList, method=2, chunkSize=2)
+        self.assertSameBatch(future.result(), expected)
+
+    def test_chunks_balance_points(self):
+        tasks, workers = parallel._prepare(self.pointsList, 0, None, 2, None)
+
+        ranges = [task[5:] for task in tasks]
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(self.pointsList))
+        for (_, last), (first, _) in zip(ranges[:-1], ranges[1:]):
+            self.assertEqual(last, first)
+
+        # The two big meshes don't share a task.
+        self.assertGreater(len(tasks), 2)
+        self.assertTrue(all(first < last for first, last in ranges))
+
+    def test_fit_error(self):
+        buffers = []
+        points, offsets = core.concatenate(self.pointsList)[:2]
+
+        def fail(*args, **kwargs):
+            raise ValueError("fit failed")
+
+        original = core.batch_build_segments
+        core.batch_build_segments = fail
+        try:
+            task = (parallel._share(points, buffers), offsets, None, None, 0, 0, 2)
+
+            with self.assertRaises(ValueError):
+                parallel._fit_segments(task)
+
+        finally:
+            core.batch_build_segments = original
+
+            for buffer in buffers:
+                buffer.close()
+                buffer.unlink()
+
+    def test_unsupported_executor(self):
+        with self.assertRaises(RuntimeError):
+            parallel.batch_build(self.pointsList, executor="cluster")
+
+    def test_empty(self):
+        self.assertEqual(len(parallel.batch_build([], workers=2)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
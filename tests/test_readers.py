@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the streaming geometry file readers.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from OBB import core
+from OBB import readers
+from tests.test_core import BoxTestCase
+from tests.test_core import random_points
+
+# Small enough for every file to be read in several chunks.
+CHUNK_SIZE = 7
+
+
+class ReaderTestCase(BoxTestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp(prefix="OBB_test_")
+
+        self.points, self.triangles = core.convex_hull(random_points(200))
+        self.points = self.points.astype(np.float32).astype(np.float64)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def write(self, name, data):
+        path = os.path.join(self.tempDir, name)
+        with open(path, "wb") as stream:
+            stream.write(data)
+
+        return path
+
+    def ply_header(self, fmt, withFaces=True, faceProperties=None):
+        lines = [
+            "ply",
+            "format %s 1.0" % fmt,
+            "comment written by the tests",
+            "element vertex %d" % len(self.points),
+            "property float x",
+            "property float y",
+            "property float z",
+            "property uchar red",
+        ]
+        if withFaces:
+            lines += ["element face %d" % len(self.triangles)]
+            lines += faceProperties or ["property list uchar int vertex_indices"]
+        lines.append("end_header")
+
+        return ("\n".join(lines) + "\n").encode("ascii")
+
+    def assertReads(self, path, triangles=True):
+        """
+        Every method on the file gives the box of the arrays.
+        """
+        with readers.open_reader(path, chunkSize=CHUNK_SIZE) as reader:
+            np.testing.assert_allclose(reader.points, self.points, rtol=1e-6)
+            if triangles:
+                np.testing.assert_array_equal(reader.triangles, self.triangles)
+
+        expected = {
+            0: core.build_from_points(self.points),
+            2: core.build_from_hull(self.points),
+            3: core.build_from_dito(self.points),
+        }
+        if triangles:
+            expected[1] = core.build_from_triangles(self.points, self.triangles)
+
+        for method, box in expected.items():
+            self.assertSameBox(
+                readers.build_from_file(path, method=method, chunkSize=CHUNK_SIZE),
+                box,
+            )
+
+        self.assertContains(
+            readers.build_from_file(path, method=4, chunkSize=CHUNK_SIZE), self.points
+        )
+
+
+class TestPly(ReaderTestCase):
+    def test_ascii(self):
+        lines = ["%r %r %r 255" % tuple(point) for point in self.points.tolist()]
+        lines += ["3 %d %d %d" % tuple(triangle) for triangle in self.triangles]
+
+        path = self.write(
+            "mesh.ply", self.ply_header("ascii") + "\n".join(lines).encode("ascii")
+        )
+        self.assertReads(path)
+
+    def test_binary(self):
+        for fmt, order in (("binary_little_endian", "<"), ("binary_big_endian", ">")):
+            vertices = np.zeros(
+                len(self.points),
+                dtype=[("x", order + "f4"), ("y", order + "f4"), ("z", order + "f4"),
+                       ("red", "u1")],
+            )
+            vertices["x"], vertices["y"], vertices["z"] = self.points.T
+
+            faces = np.zeros(
+                len(self.triangles),
+                dtype=[("count", "u1"), ("indices", order + "i4", (3,))],
+            )
+            faces["count"] = 3
+            faces["indices"] = self.triangles
+
+            path = self.write(
+                "%s.ply" % fmt,
+                self.ply_header(fmt) + vertices.tobytes() + faces.tobytes(),
+            )
+            self.assertReads(path)
+
+    def test_binary_mixed_lists(self):
+        # Triangles and quads, a scalar before the indices and a second list
+        # after them, so the records have no fixed width.
+        polygons = [
+            triangle + triangle[:1] if i % 3 == 2 else triangle
+            for i, triangle in enumerate(self.triangles.tolist())
+        ]
+        expected = np.array(
+            [
+                [polygon[0], polygon[i], polygon[i + 1]]
+                for polygon in polygons
+                for i in range(1, len(polygon) - 1)
+            ]
+        )
+        faceProperties = [
+            "property uchar flags",
+            "property list uchar int vertex_indices",
+            "property list ushort float texcoord",
+        ]
+
+        for fmt, order in (("binary_little_endian", "<"), ("binary_big_endian", ">")):
+            vertices = np.zeros(
+                len(self.points),
+                dtype=[("x", order + "f4"), ("y", order + "f4"), ("z", order + "f4"),
+                       ("red", "u1")],
+            )
+            vertices["x"], vertices["y"], vertices["z"] = self.points.T
+
+            faces = b"".join(
+                np.array([i % 5, len(polygon)], dtype="u1").tobytes()
+                + np.array(polygon, dtype=order + "i4").tobytes()
+                + np.array([i % 4], dtype=order + "u2").tobytes()
+                + np.zeros(i % 4, dtype=order + "f4").tobytes()
+                for i, polygon in enumerate(polygons)
+            )
+
+            header = self.ply_header(fmt, faceProperties=faceProperties)
+            path = self.write("%s.ply" % fmt, header + vertices.tobytes() + faces)
+
+            with readers.open_reader(path, chunkSize=CHUNK_SIZE) as reader:
+                np.testing.assert_array_equal(reader.triangles, expected)
+
+            self.assertSameBox(
+                readers.build_from_file(path, method=1, chunkSize=CHUNK_SIZE),
+                core.build_from_triangles(self.points, self.triangles),
+            )
+
+            with self.assertRaises(RuntimeError):
+                readers.open_reader(
+                    self.write("cut.ply", header + vertices.tobytes() + faces[:-5])
+                )
+
+    def test_not_ply(self):
+        path = self.write("broken.ply", b"solid\nend\n")
+
+        with self.assertRaises(RuntimeError):
+            readers.build_from_file(path)
+
+
+class TestObj(ReaderTestCase):
+    def test_relative_indices(self):
+        lines = ["v %r %r %r" % tuple(point) for point in self.points.tolist()]
+
+        # Half the faces with relative indices, after all the vertices.
+        count = len(self.points)
+        for i, (a, b, c) in enumerate(self.triangles.tolist()):
+            if i % 2:
+                lines.append("f %d %d %d" % (a - count, b - count, c - count))
+            else:
+                lines.append("f %d/1/1 %d/1/1 %d/1/1" % (a + 1, b + 1, c + 1))
+
+        path = self.write("mesh.obj", "\n".join(lines).encode("ascii"))
+        self.assertReads(path)
+
+    def test_polygons_are_fanned(self):
+        lines = [
+            "v 0 0 0",
+            "v 2 0 0",
+            "v 2 1 0",
+            "v 0 1 0",
+            "v 0 0 3",
+            "f 1 2 3 4",
+            "f 1 2 5",
+        ]
+        path = self.write("quad.obj", "\n".join(lines).encode("ascii"))
+
+        with readers.open_reader(path, chunkSize=2) as reader:
+            np.testing.assert_array_equal(
+                reader.triangles, [[0, 1, 2], [0, 2, 3], [0, 1, 4]]
+            )
+            points = np.array(reader.points)
+
+        self.assertSameBox(
+            readers.build_from_file(path, method=1),
+            core.build_from_triangles(points, [[0, 1, 2], [0, 2, 3], [0, 1, 4]]),
+        )
+
+    def test_tab_separated(self):
+        lines = ["v\t%r\t%r\t%r" % tuple(point) for point in self.points.tolist()]
+        lines += [
+            "f\t%d %d\t%d" % (a + 1, b + 1, c + 1)
+            for a, b, c in self.triangles.tolist()
+        ]
+
+        path = self.write("tabs.obj", "\n".join(lines).encode("ascii"))
+        self.assertReads(path)
+
+
+class TestXyz(ReaderTestCase):
+    def test_points(self):
+        lines = ["%d" % len(self.points), "# x y z intensity"]
+        lines += ["%r, %r, %r, 0.5" % tuple(point) for point in self.points.tolist()]
+
+        path = self.write("cloud.xyz", "\n".join(lines).encode("ascii"))
+        self.assertReads(path, triangles=False)
+
+    def test_no_faces(self):
+        path = self.write("cloud.xyz", b"0 0 0\n1 1 1\n")
+
+        with self.assertRaises(RuntimeError):
+            readers.build_from_file(path, method=1)
+
+
+class TestOpen(unittest.TestCase):
+    def test_unsupported(self):
+        with self.assertRaises(RuntimeError):
+            readers.open_reader(__file__)
+
+    def test_missing(self):
+        with self.assertRaises(RuntimeError):
+            readers.open_reader("missing.obj")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the eigen solvers.
+"""
+import unittest
+
+import numpy as np
+
+from OBB.utils import batch_eigh3
+from OBB.utils import eigh
+from OBB.utils import eigh3
+
+
+def symmetric_matrices(count=500, seed=0):
+    """
+    Random symmetric matrices plus repeated and zero eigen value cases.
+    """
+    random = np.random.RandomState(seed)
+    a = random.normal(size=(count, 3, 3))
+    a = a + np.swapaxes(a, 1, 2)
+
+    rotation = np.linalg.qr(random.normal(size=(3, 3)))[0]
+    special = [
+        np.zeros((3, 3)),
+        np.eye(3) * 2.0,
+        np.dot(rotation * [1.0, 1.0, 5.0], rotation.T),
+        np.dot(rotation * [0.0, 3.0, 3.0], rotation.T),
+        np.diag([1e-8, 1.0, 1e8]),
+    ]
+
+    return np.concatenate([a, special])
+
+
+class TestEigh(unittest.TestCase):
+    def assertDecomposes(self, a, eigenValues, eigenVectors):
+        scale = max(np.abs(a).max(), 1.0)
+
+        np.testing.assert_allclose(
+            np.dot(eigenVectors.T, eigenVectors), np.eye(3), atol=1e-6
+        )
+        np.testing.assert_allclose(
+            np.dot(a, eigenVectors), eigenVectors * eigenValues, atol=1e-6 * scale
+        )
+
+    def test_batch(self):
+        a = symmetric_matrices()
+        eigenValues, eigenVectors = batch_eigh3(a)
+
+        np.testing.assert_allclose(
+            eigenValues, np.linalg.eigvalsh(a), atol=1e-6 * np.abs(a).max()
+        )
+        for matrix, values, vectors in zip(a, eigenValues, eigenVectors):
+            self.assertDecomposes(matrix, values, vectors)
+
+    def test_single(self):
+        a = symmetric_matrices(1)[0]
+        eigenValues, eigenVectors = eigh3(a)
+
+        self.assertTrue((np.diff(eigenValues) >= 0.0).all())
+        self.assertDecomposes(a, eigenValues, eigenVectors)
+
+    def test_jacobi(self):
+        a = symmetric_matrices(1)[0]
+
+        values, vectors = eigh(a.tolist())
+        self.assertDecomposes(a, np.array(values), np.array(vectors))
+
+    def test_jacobi_warm_start(self):
+        a = symmetric_matrices(1)[0]
+        values, vectors = eigh3(a)
+
+        # Started from the solution, the result doesn't move.
+        warmValues, warmVectors = eigh(a.tolist(), vectors=vectors)
+        self.assertDecomposes(a, np.array(warmValues), np.array(warmVectors))
+        np.testing.assert_allclose(
+            np.abs(np.dot(np.array(warmVectors).T, vectors)).max(axis=1),
+            1.0,
+            atol=1e-6,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()